@@ -0,0 +1,142 @@
+"""Tablas de amortización y acumulación período a período.
+
+Cada columna se calcula con expresiones cerradas sobre el vector de períodos,
+sin recorrer el saldo período a período, y se guarda en arreglos contiguos.
+Las tablas largas pueden escribirse por bloques en un archivo sin construirlas
+completas en memoria.
+"""
+
+import numpy as np
+
+from calculos import FRECUENCIAS, DIVISORES_TIEMPO
+
+COLUMNAS = ("periodo", "saldo_inicial", "interes", "pago", "saldo_final")
+# Tipos de tabla: cuota fija (francés), amortización constante (alemán)
+# o acumulación sin pagos intermedios (el interés se capitaliza)
+TIPOS = ("frances", "aleman", "acumulacion")
+# A partir de este número de filas la interfaz escribe la tabla en archivo
+UMBRAL_FILAS = 5000
+
+def numero_periodos(tiempo, capitalizacion, unidad_tiempo="Años"):
+    """Número entero de períodos de capitalización del plazo.
+
+    Un plazo que no cubre un número entero de períodos (p. ej. 18 meses con
+    capitalización anual) se rechaza en lugar de redondearse, para que la
+    tabla no cambie el plazo en silencio.
+    """
+    n = FRECUENCIAS[capitalizacion]
+    exactos = n * tiempo / DIVISORES_TIEMPO[unidad_tiempo]
+    # Tolerancia solo para errores de representación (p. ej. 365 días · 12 / 365)
+    periodos = round(exactos)
+    if abs(exactos - periodos) > 1e-9 * max(1.0, abs(exactos)):
+        raise ValueError(
+            f"{tiempo:g} {unidad_tiempo.lower()} con capitalización {capitalizacion.lower()} son {exactos:.4g} "
+            "períodos: el plazo debe cubrir un número entero de períodos de capitalización"
+        )
+    if periodos < 1:
+        raise ValueError("El plazo debe cubrir al menos un período de capitalización")
+    return periodos
+
+def cuota_periodica(principal, tasa_anual, periodos, capitalizacion):
+    """Cuota fija por período de un préstamo francés (vectorizada)"""
+    principal = np.asarray(principal, dtype=float)
+    periodos = np.asarray(periodos, dtype=float)
+    i = np.asarray(tasa_anual, dtype=float) / FRECUENCIAS[capitalizacion]
+
+    # A = P·i / (1 - (1 + i)^-N); con tasa cero la cuota es P/N
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cuota = principal * i / -np.expm1(-periodos * np.log1p(i))
+    return np.where(i == 0, principal / periodos, cuota)
+
+def _saldos(principal, i, cuota, periodos, tipo, k):
+    """Saldo al final de los períodos `k` según el tipo de tabla"""
+    if tipo == "acumulacion":
+        return principal * np.power(1 + i, k)
+    if tipo == "aleman":
+        return principal * (1 - k / periodos)
+    # Francés: B_k = P(1+i)^k - A((1+i)^k - 1)/i
+    if i == 0:
+        return principal - cuota * k
+    factor = np.power(1 + i, k)
+    return principal * factor - cuota * (factor - 1) / i
+
+def bloques_amortizacion(principal, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años",
+                         tipo="frances", tamano_bloque=UMBRAL_FILAS):
+    """Genera la tabla en bloques de `tamano_bloque` períodos.
+
+    Cada bloque es un diccionario columna -> arreglo. Como los saldos tienen
+    forma cerrada, cualquier bloque se calcula sin depender de los anteriores.
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de tabla no válido: '{tipo}' (use {', '.join(TIPOS)})")
+    periodos = numero_periodos(tiempo, capitalizacion, unidad_tiempo)
+    i = tasa_anual / FRECUENCIAS[capitalizacion]
+    cuota = float(cuota_periodica(principal, tasa_anual, periodos, capitalizacion))
+
+    for inicio in range(0, periodos, tamano_bloque):
+        fin = min(inicio + tamano_bloque, periodos)
+        # Saldos de los cortes inicio..fin: el inicial de cada fila es el final de la anterior
+        saldos = _saldos(principal, i, cuota, periodos, tipo, np.arange(inicio, fin + 1, dtype=float))
+        if fin == periodos and tipo != "acumulacion":
+            saldos[-1] = 0.0  # evita residuos de redondeo en el último período
+
+        datos = np.empty((4, fin - inicio))
+        saldo_inicial, interes, pago, saldo_final = datos
+        saldo_inicial[:] = saldos[:-1]
+        saldo_final[:] = saldos[1:]
+        np.multiply(saldo_inicial, i, out=interes)
+        if tipo == "acumulacion":
+            pago[:] = 0.0
+        else:
+            # Pago = interés + amortización del capital
+            np.subtract(saldo_inicial, saldo_final, out=pago)
+            pago += interes
+
+        yield {
+            "periodo": np.arange(inicio + 1, fin + 1, dtype=np.int64),
+            "saldo_inicial": saldo_inicial,
+            "interes": interes,
+            "pago": pago,
+            "saldo_final": saldo_final,
+        }
+
+def tabla_amortizacion(principal, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años", tipo="frances"):
+    """Calcula la tabla completa en memoria como diccionario columna -> arreglo"""
+    periodos = numero_periodos(tiempo, capitalizacion, unidad_tiempo)
+    bloque, = bloques_amortizacion(principal, tasa_anual, tiempo, capitalizacion, unidad_tiempo, tipo,
+                                   tamano_bloque=periodos)
+    return bloque
+
+def guardar_tabla_amortizacion(destino, principal, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años",
+                               tipo="frances", tamano_bloque=UMBRAL_FILAS):
+    """Escribe la tabla como CSV en un archivo de texto abierto, bloque a bloque.
+
+    Devuelve el número de filas escritas.
+    """
+    destino.write(",".join(COLUMNAS) + "\n")
+    filas = 0
+    for bloque in bloques_amortizacion(principal, tasa_anual, tiempo, capitalizacion, unidad_tiempo, tipo,
+                                       tamano_bloque):
+        valores = np.column_stack([bloque[columna] for columna in COLUMNAS[1:]])
+        np.savetxt(destino, np.column_stack([bloque["periodo"], valores]),
+                   fmt=["%d"] + ["%.2f"] * len(COLUMNAS[1:]), delimiter=",")
+        filas += len(bloque["periodo"])
+    return filas
+
+def resumen_amortizacion(principal, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años", tipo="frances"):
+    """Primer pago, total pagado e interés total en forma cerrada, sin construir la tabla"""
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo de tabla no válido: '{tipo}' (use {', '.join(TIPOS)})")
+    periodos = numero_periodos(tiempo, capitalizacion, unidad_tiempo)
+    i = tasa_anual / FRECUENCIAS[capitalizacion]
+
+    if tipo == "acumulacion":
+        # Un único pago al vencimiento: P(1 + i)^N
+        total = principal * (1 + i) ** periodos
+        return 0.0, total, total - principal
+    if tipo == "aleman":
+        # Intereses sobre saldos que bajan linealmente: i·P·(N + 1)/2
+        interes = i * principal * (periodos + 1) / 2
+        return principal / periodos + principal * i, principal + interes, interes
+    cuota = float(cuota_periodica(principal, tasa_anual, periodos, capitalizacion))
+    return cuota, cuota * periodos, cuota * periodos - principal
@@ -1,10 +1,69 @@
+import datetime
+import gzip
+import os
+import sys
+import tempfile
+import threading
+import uuid
+from collections import Counter
+
+# `python -m ariane batch ...` procesa solicitudes JSONL y `python -m ariane serve`
+# arranca el servicio HTTP, ambos sin cargar la interfaz. Se ejecuta el módulo
+# como principal para que los procesos de trabajo (incluso con el método
+# "spawn") no vuelvan a ejecutar este script.
+COMANDOS = {"batch": "lotes", "serve": "servicio"}
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in COMANDOS:
+    import runpy
+    
+    comando = sys.argv[1]
+    sys.argv = [f"python -m ariane {comando}", *sys.argv[2:]]
+    runpy.run_module(COMANDOS[comando], run_name="__main__", alter_sys=True)
+
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import math
+
+import escenarios
+import instrumentacion
+import memoria
+import reportes
+from instrumentacion import instrumentar, medir
+from calculos import (
+    FRECUENCIAS,
+    interes_simple_vf,
+    interes_simple_vp,
+    interes_compuesto_vf,
+    interes_compuesto_vp,
+    anualidad_vf,
+    anualidad_simple_vf_lote,
+    total_aportado_lote,
+    tasa_implicita_simple,
+    tasa_implicita_compuesta,
+    tiempo_requerido_simple,
+    tiempo_requerido_compuesto,
+)
+from graficos import (
+    PUNTOS_POR_ANO,
+    PUNTOS_SENSIBILIDAD,
+    agregar_abanico,
+    calcular_sensibilidad,
+    calcular_series_comparacion,
+    construir_tabla_comparacion,
+    crear_grafico_comparacion,
+    crear_mapa_sensibilidad,
+)
+from montecarlo import MODELOS, UMBRAL_PROCESOS, simular_tasas
+from convenciones import ANO_MAX, ANO_MIN, CONVENCIONES, dias_computables, fraccion_anual
+
+# Sin ARIANE_PERFILADO, instrumentar devuelve las mismas funciones
+interes_simple_vf = instrumentar("calculos.interes_simple_vf")(interes_simple_vf)
+interes_simple_vp = instrumentar("calculos.interes_simple_vp")(interes_simple_vp)
+interes_compuesto_vf = instrumentar("calculos.interes_compuesto_vf")(interes_compuesto_vf)
+interes_compuesto_vp = instrumentar("calculos.interes_compuesto_vp")(interes_compuesto_vp)
+crear_grafico_comparacion = instrumentar("graficos.crear_grafico_comparacion")(crear_grafico_comparacion)
+simular_tasas = instrumentar("montecarlo.simular_tasas")(simular_tasas)
+
+if instrumentacion.ACTIVA:
+    instrumentacion.iniciar_ejecucion()
 
 # --- Configuración de la Página ---
 st.set_page_config(
@@ -46,499 +105,1526 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- Funciones de Cálculo ---
-
-def interes_simple_vf(capital, tasa_anual, tiempo, unidad_tiempo="Años"):
-    """Calcula el Valor Futuro con Interés Simple"""
-    # Convertir tiempo a años
-    if unidad_tiempo == "Meses":
-        tiempo_anos = tiempo / 12
-    elif unidad_tiempo == "Días":
-        tiempo_anos = tiempo / 365
-    else:
-        tiempo_anos = tiempo
-    
-    # VF = C(1 + rt)
-    valor_futuro = capital * (1 + tasa_anual * tiempo_anos)
-    interes_ganado = valor_futuro - capital
-    return valor_futuro, interes_ganado
-
-def interes_simple_vp(valor_futuro, tasa_anual, tiempo, unidad_tiempo="Años"):
-    """Calcula el Valor Presente con Interés Simple"""
-    # Convertir tiempo a años
-    if unidad_tiempo == "Meses":
-        tiempo_anos = tiempo / 12
-    elif unidad_tiempo == "Días":
-        tiempo_anos = tiempo / 365
-    else:
-        tiempo_anos = tiempo
-    
-    # VP = VF / (1 + rt)
-    valor_presente = valor_futuro / (1 + tasa_anual * tiempo_anos)
-    interes_total = valor_futuro - valor_presente
-    return valor_presente, interes_total
-
-def interes_compuesto_vf(capital, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años"):
-    """Calcula el Valor Futuro con Interés Compuesto"""
-    # Convertir tiempo a años
-    if unidad_tiempo == "Meses":
-        tiempo_anos = tiempo / 12
-    elif unidad_tiempo == "Días":
-        tiempo_anos = tiempo / 365
-    else:
-        tiempo_anos = tiempo
-    
-    # Frecuencia de capitalización
-    n_map = {"Anual": 1, "Semestral": 2, "Trimestral": 4, "Mensual": 12, "Diario": 365}
-    n = n_map[capitalizacion]
-    
-    # VF = C(1 + r/n)^(nt)
-    valor_futuro = capital * (1 + tasa_anual/n)**(n * tiempo_anos)
-    interes_ganado = valor_futuro - capital
-    return valor_futuro, interes_ganado
-
-def interes_compuesto_vp(valor_futuro, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años"):
-    """Calcula el Valor Presente con Interés Compuesto"""
-    # Convertir tiempo a años
-    if unidad_tiempo == "Meses":
-        tiempo_anos = tiempo / 12
-    elif unidad_tiempo == "Días":
-        tiempo_anos = tiempo / 365
-    else:
-        tiempo_anos = tiempo
-    
-    # Frecuencia de capitalización
-    n_map = {"Anual": 1, "Semestral": 2, "Trimestral": 4, "Mensual": 12, "Diario": 365}
-    n = n_map[capitalizacion]
-    
-    # VP = VF / (1 + r/n)^(nt)
-    valor_presente = valor_futuro / (1 + tasa_anual/n)**(n * tiempo_anos)
-    interes_total = valor_futuro - valor_presente
-    return valor_presente, interes_total
-
-def crear_grafico_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual"):
-    """Crea gráfico comparativo interactivo"""
-    periodos = np.arange(0, tiempo_max + 1, 1)
-    
-    # Calcular valores para cada período
-    valores_simple = []
-    valores_compuesto = []
-    
-    for t in periodos:
-        if t == 0:
-            valores_simple.append(capital)
-            valores_compuesto.append(capital)
-        else:
-            vf_simple, _ = interes_simple_vf(capital, tasa, t)
-            vf_compuesto, _ = interes_compuesto_vf(capital, tasa, t, capitalizacion)
-            valores_simple.append(vf_simple)
-            valores_compuesto.append(vf_compuesto)
-    
-    # Crear gráfico con Plotly
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=periodos, 
-        y=valores_simple,
-        mode='lines+markers',
-        name='Interés Simple',
-        line=dict(color='#ff7f0e', width=3),
-        marker=dict(size=6)
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=periodos, 
-        y=valores_compuesto,
-        mode='lines+markers',
-        name='Interés Compuesto',
-        line=dict(color='#1f77b4', width=3),
-        marker=dict(size=6)
-    ))
-    
-    fig.update_layout(
-        title=f'Comparación de Crecimiento: Simple vs Compuesto',
-        xaxis_title='Tiempo (Años)',
-        yaxis_title='Valor ($)',
-        hovermode='x unified',
-        template='plotly_white',
-        height=500
-    )
+# --- Funciones de la Interfaz ---
+
+# Aportes periódicos de la comparación: (aporte, crecimiento anual, anticipada)
+APORTES_NULOS = (0.0, 0.0, False)
+
+@instrumentar("pandas.tabla_comparacion")
+def crear_tabla_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual", resolucion="Anual", completa=False, aportes=APORTES_NULOS):
+    """Crea la tabla comparativa con columnas numéricas; el formato se aplica al mostrarla"""
+    series = series_comparacion(capital, tasa, tiempo_max, capitalizacion, resolucion, aportes)
+    return construir_tabla_comparacion(series, tiempo_max, resolucion, completa)
+
+def id_sesion():
+    """Identificador corto y estable de la sesión del navegador"""
+    return st.session_state.setdefault("sesion_id", uuid.uuid4().hex[:8])
+
+@st.cache_resource
+def _registro_memoria():
+    """Objetos propios de cada sesión, con su presupuesto de memoria"""
+    return memoria.crear_registro()
+
+def retenido(tipo, entradas, calcular):
+    """Objeto propio de la sesión: se reutiliza si las entradas no cambiaron, si no se calcula y se retiene"""
+    registro, sesion = _registro_memoria(), id_sesion()
+    valor = memoria.recuperar(registro, sesion, tipo, entradas)
+    if valor is None:
+        valor = memoria.retener(registro, sesion, tipo, entradas, calcular())
+    return valor
+
+# --- Caché de Resultados ---
+
+# Límites de la caché compartida entre sesiones
+CACHE_TTL_SEGUNDOS = 3600
+CACHE_MAX_ENTRADAS = 256
+ETIQUETAS_CACHE = {"series": "Series", "grafico": "Gráfico", "tabla": "Tabla", "simulacion": "Simulación", "sensibilidad": "Sensibilidad"}
+# Cada malla de sensibilidad ocupa unos 10 MB: se guardan menos entradas
+CACHE_MAX_MALLAS = 16
+
+@st.cache_resource
+def _estadisticas_cache():
+    """Contadores de aciertos y fallos compartidos por todas las sesiones"""
+    return {"lock": threading.Lock(), "llamadas": Counter(), "fallos": Counter()}
+
+def _registrar_cache(tipo, campo):
+    """Incrementa un contador de la caché de forma segura entre hilos"""
+    estadisticas = _estadisticas_cache()
+    with estadisticas["lock"]:
+        estadisticas[campo][tipo] += 1
+
+def resumen_cache():
+    """Devuelve aciertos, fallos y llamadas por tipo de resultado"""
+    estadisticas = _estadisticas_cache()
+    with estadisticas["lock"]:
+        return {
+            tipo: {
+                "aciertos": llamadas - estadisticas["fallos"][tipo],
+                "fallos": estadisticas["fallos"][tipo],
+                "llamadas": llamadas,
+            }
+            for tipo, llamadas in estadisticas["llamadas"].items()
+        }
+
+def normalizar_entradas(capital, tasa, tiempo, capitalizacion):
+    """Normaliza las entradas para que valores equivalentes compartan la misma clave"""
+    return round(float(capital), 2), round(float(tasa), 10), int(tiempo), str(capitalizacion)
+
+def normalizar_aportes(aportes):
+    """Normaliza (aporte, crecimiento, anticipada); sin aporte, las demás opciones no cambian nada"""
+    aporte, crecimiento, anticipada = aportes
+    if not aporte:
+        return APORTES_NULOS
+    return round(float(aporte), 2), round(float(crecimiento), 10), bool(anticipada)
+
+# El cuerpo de las funciones cacheadas solo se ejecuta en un fallo de caché
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def _series_comparacion_cache(capital, tasa, tiempo_max, capitalizacion, resolucion, aportes):
+    _registrar_cache("series", "fallos")
+    return calcular_series_comparacion(capital, tasa, tiempo_max, capitalizacion, resolucion, *aportes)
+
+# Las figuras se comparten sin copiarlas: quien las use no debe modificarlas
+@st.cache_resource(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def _grafico_comparacion_cache(capital, tasa, tiempo_max, capitalizacion, resolucion, aportes):
+    _registrar_cache("grafico", "fallos")
+    aporte, crecimiento, anticipada = aportes
+    return crear_grafico_comparacion(capital, tasa, tiempo_max, capitalizacion, resolucion,
+                                     aporte=aporte, crecimiento=crecimiento, anticipada=anticipada)
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def _tabla_comparacion_cache(capital, tasa, tiempo_max, capitalizacion, resolucion, completa, aportes):
+    _registrar_cache("tabla", "fallos")
+    return crear_tabla_comparacion(capital, tasa, tiempo_max, capitalizacion, resolucion, completa, aportes)
+
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def _simulacion_cache(capital, tasa, tiempo_max, capitalizacion, volatilidad, modelo, trayectorias):
+    _registrar_cache("simulacion", "fallos")
+    procesos = None if trayectorias >= UMBRAL_PROCESOS else 1
+    return simular_tasas(capital, tasa, tiempo_max, capitalizacion, volatilidad, modelo, trayectorias, procesos=procesos)
+
+# Una sola evaluación vectorizada cubre todas las capitalizaciones de la malla
+@st.cache_data(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_MALLAS, show_spinner=False)
+def _sensibilidad_cache(monto, tasa_min, tasa_max, tiempo_min, tiempo_max, calculo, puntos):
+    _registrar_cache("sensibilidad", "fallos")
+    tasas = np.linspace(tasa_min, tasa_max, puntos)
+    tiempos = np.linspace(tiempo_min, tiempo_max, puntos)
+    return tasas, tiempos, calcular_sensibilidad(monto, tasas, tiempos, calculo)
+
+@st.cache_resource(ttl=CACHE_TTL_SEGUNDOS, max_entries=CACHE_MAX_MALLAS, show_spinner=False)
+def _mapa_sensibilidad_cache(monto, tasa_min, tasa_max, tiempo_min, tiempo_max, calculo, puntos, capitalizacion, vista):
+    tasas, tiempos, valores = _sensibilidad_cache(monto, tasa_min, tasa_max, tiempo_min, tiempo_max, calculo, puntos)
+    return crear_mapa_sensibilidad(tasas, tiempos, valores[list(FRECUENCIAS).index(capitalizacion)], calculo, vista)
+
+def series_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual", resolucion="Anual", aportes=APORTES_NULOS):
+    """Series de valor futuro simple y compuesto, desde la caché"""
+    _registrar_cache("series", "llamadas")
+    return _series_comparacion_cache(*normalizar_entradas(capital, tasa, tiempo_max, capitalizacion), resolucion,
+                                     normalizar_aportes(aportes))
+
+def grafico_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual", resolucion="Anual", aportes=APORTES_NULOS):
+    """Gráfico comparativo compartido entre sesiones, desde la caché"""
+    _registrar_cache("grafico", "llamadas")
+    return _grafico_comparacion_cache(*normalizar_entradas(capital, tasa, tiempo_max, capitalizacion), resolucion,
+                                      normalizar_aportes(aportes))
+
+def tabla_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual", resolucion="Anual", completa=False, aportes=APORTES_NULOS):
+    """Tabla comparativa detallada, desde la caché"""
+    _registrar_cache("tabla", "llamadas")
+    return _tabla_comparacion_cache(*normalizar_entradas(capital, tasa, tiempo_max, capitalizacion), resolucion, bool(completa),
+                                    normalizar_aportes(aportes))
+
+def mapa_sensibilidad(monto, tasas, tiempos, calculo, capitalizacion, vista="mapa", puntos=PUNTOS_SENSIBILIDAD):
+    """Mapa de sensibilidad de una malla (tasas y tiempos como rangos), desde la caché"""
+    _registrar_cache("sensibilidad", "llamadas")
+    (tasa_min, tasa_max), (tiempo_min, tiempo_max) = sorted(tasas), sorted(tiempos)
+    return _mapa_sensibilidad_cache(round(float(monto), 2), round(tasa_min, 10), round(tasa_max, 10),
+                                    round(tiempo_min, 10), round(tiempo_max, 10), str(calculo), int(puntos),
+                                    str(capitalizacion), str(vista))
+
+def simulacion_tasas(capital, tasa, tiempo_max, capitalizacion, volatilidad, modelo="normal", trayectorias=100_000):
+    """Percentiles del valor futuro con tasas estocásticas, desde la caché"""
+    _registrar_cache("simulacion", "llamadas")
+    return _simulacion_cache(*normalizar_entradas(capital, tasa, tiempo_max, capitalizacion),
+                             round(float(volatilidad), 10), str(modelo), int(trayectorias))
+
+# --- Secciones de la Calculadora ---
+# Cada sección es un fragmento: al cambiar uno de sus widgets solo se vuelve
+# a ejecutar esa sección y no el script completo. Los widgets usan
+# persist_state="page" para conservar su valor mientras su pestaña está cerrada.
+# Con la instrumentación activa, cada ejecución de la sección (también las
+# del fragmento solo) se mide bajo "seccion.<nombre>".
+
+@st.fragment
+@instrumentar("seccion.ic_vf")
+def seccion_ic_vf():
+    """Sub-pestaña de Interés Compuesto - Valor Futuro"""
+    st.markdown("### Interés Compuesto - Valor Futuro")
+    st.markdown("*Calcula cuánto valdrá tu inversión en el futuro*")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        ic_vf_capital = st.number_input("Capital Inicial ($):", min_value=0.0, value=10000.0, step=500.0, key="ic_vf_c", persist_state="page")
+        ic_vf_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="ic_vf_r", persist_state="page")
+    
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            ic_vf_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="ic_vf_t", persist_state="page")
+        with col_t2:
+            ic_vf_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="ic_vf_u", persist_state="page")
+    
+        ic_vf_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="ic_vf_cap", persist_state="page")
     
-    return fig
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if ic_vf_capital > 0 and ic_vf_tasa > 0 and ic_vf_tiempo > 0:
+            tasa_decimal = ic_vf_tasa / 100
+            vf, interes = interes_compuesto_vf(ic_vf_capital, tasa_decimal, ic_vf_tiempo, ic_vf_cap, ic_vf_unidad)
+    
+            st.metric("💰 Valor Futuro", f"${vf:,.2f}", delta=f"+${interes:,.2f}")
+            st.metric("📈 Interés Ganado", f"${interes:,.2f}")
+            st.metric("📊 Rendimiento %", f"{((vf/ic_vf_capital - 1) * 100):.2f}%")
+    
+            # Fórmula utilizada
+            st.markdown(f"""
+            <div class="formula-box">
+            <b>Fórmula:</b> VF = ${ic_vf_capital:,.2f} × (1 + {tasa_decimal:.4f}/{ic_vf_cap})^({ic_vf_cap} × {ic_vf_tiempo})
+            <br><b>Resultado:</b> ${vf:,.2f}
+            </div>
+            """, unsafe_allow_html=True)
 
-# --- Interfaz Principal ---
-st.markdown('<h1 class="main-header">💰 Calculadora Financiera Completa</h1>', unsafe_allow_html=True)
-st.markdown("---")
+@st.fragment
+@instrumentar("seccion.ic_vp")
+def seccion_ic_vp():
+    """Sub-pestaña de Interés Compuesto - Valor Presente"""
+    st.markdown("### Interés Compuesto - Valor Presente")
+    st.markdown("*Calcula cuánto debes invertir hoy para obtener un monto futuro*")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        ic_vp_vf = st.number_input("Valor Futuro Deseado ($):", min_value=0.0, value=15000.0, step=500.0, key="ic_vp_vf", persist_state="page")
+        ic_vp_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="ic_vp_r", persist_state="page")
+    
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            ic_vp_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="ic_vp_t", persist_state="page")
+        with col_t2:
+            ic_vp_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="ic_vp_u", persist_state="page")
+    
+        ic_vp_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="ic_vp_cap", persist_state="page")
+    
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if ic_vp_vf > 0 and ic_vp_tasa > 0 and ic_vp_tiempo > 0:
+            tasa_decimal = ic_vp_tasa / 100
+            vp, interes_total = interes_compuesto_vp(ic_vp_vf, tasa_decimal, ic_vp_tiempo, ic_vp_cap, ic_vp_unidad)
+    
+            st.metric("🏦 Valor Presente (Inversión Hoy)", f"${vp:,.2f}")
+            st.metric("💰 Valor Futuro", f"${ic_vp_vf:,.2f}", delta=f"+${interes_total:,.2f}")
+            st.metric("📈 Interés Total a Ganar", f"${interes_total:,.2f}")
+    
+            # Fórmula utilizada
+            st.markdown(f"""
+            <div class="formula-box">
+            <b>Fórmula:</b> VP = ${ic_vp_vf:,.2f} ÷ (1 + {tasa_decimal:.4f}/{ic_vp_cap})^({ic_vp_cap} × {ic_vp_tiempo})
+            <br><b>Resultado:</b> ${vp:,.2f}
+            </div>
+            """, unsafe_allow_html=True)
 
-# --- SIDEBAR para navegación ---
-with st.sidebar:
-    st.image("https://via.placeholder.com/200x100/1f77b4/ffffff?text=Finanzas", width=200)
-    st.markdown("### 📊 Navegación")
+@st.fragment
+@instrumentar("seccion.is_vf")
+def seccion_is_vf():
+    """Sub-pestaña de Interés Simple - Valor Futuro"""
+    st.markdown("### Interés Simple - Valor Futuro")
+    st.markdown("*Cálculo lineal de crecimiento de capital*")
     
-    # Información contextual
-    with st.expander("ℹ️ Información"):
-        st.markdown("""
-        **Fórmulas utilizadas:**
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        is_vf_capital = st.number_input("Capital Inicial ($):", min_value=0.0, value=10000.0, step=500.0, key="is_vf_c", persist_state="page")
+        is_vf_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="is_vf_r", persist_state="page")
+    
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            is_vf_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="is_vf_t", persist_state="page")
+        with col_t2:
+            is_vf_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="is_vf_u", persist_state="page")
+    
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if is_vf_capital > 0 and is_vf_tasa > 0 and is_vf_tiempo > 0:
+            tasa_decimal = is_vf_tasa / 100
+            vf, interes = interes_simple_vf(is_vf_capital, tasa_decimal, is_vf_tiempo, is_vf_unidad)
+    
+            st.metric("💰 Valor Futuro", f"${vf:,.2f}", delta=f"+${interes:,.2f}")
+            st.metric("📈 Interés Ganado", f"${interes:,.2f}")
+            st.metric("📊 Rendimiento %", f"{((vf/is_vf_capital - 1) * 100):.2f}%")
+    
+            # Fórmula utilizada
+            st.markdown(f"""
+            <div class="formula-box">
+            <b>Fórmula:</b> VF = ${is_vf_capital:,.2f} × (1 + {tasa_decimal:.4f} × {is_vf_tiempo})
+            <br><b>Resultado:</b> ${vf:,.2f}
+            </div>
+            """, unsafe_allow_html=True)
+
+@st.fragment
+@instrumentar("seccion.is_vp")
+def seccion_is_vp():
+    """Sub-pestaña de Interés Simple - Valor Presente"""
+    st.markdown("### Interés Simple - Valor Presente")
+    st.markdown("*Calcula la inversión inicial necesaria con interés simple*")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        is_vp_vf = st.number_input("Valor Futuro Deseado ($):", min_value=0.0, value=15000.0, step=500.0, key="is_vp_vf", persist_state="page")
+        is_vp_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="is_vp_r", persist_state="page")
+    
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            is_vp_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="is_vp_t", persist_state="page")
+        with col_t2:
+            is_vp_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="is_vp_u", persist_state="page")
+    
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if is_vp_vf > 0 and is_vp_tasa > 0 and is_vp_tiempo > 0:
+            tasa_decimal = is_vp_tasa / 100
+            vp, interes_total = interes_simple_vp(is_vp_vf, tasa_decimal, is_vp_tiempo, is_vp_unidad)
+    
+            st.metric("🏦 Valor Presente (Inversión Hoy)", f"${vp:,.2f}")
+            st.metric("💰 Valor Futuro", f"${is_vp_vf:,.2f}", delta=f"+${interes_total:,.2f}")
+            st.metric("📈 Interés Total a Ganar", f"${interes_total:,.2f}")
+    
+            # Fórmula utilizada
+            st.markdown(f"""
+            <div class="formula-box">
+            <b>Fórmula:</b> VP = ${is_vp_vf:,.2f} ÷ (1 + {tasa_decimal:.4f} × {is_vp_tiempo})
+            <br><b>Resultado:</b> ${vp:,.2f}
+            </div>
+            """, unsafe_allow_html=True)
+
+@st.fragment
+@instrumentar("seccion.tasa_tiempo")
+def seccion_tasa_tiempo():
+    """Sub-pestaña de tasa implícita y tiempo requerido entre VP y VF"""
+    st.markdown("### Tasa Implícita y Tiempo Requerido")
+    st.markdown("*¿Qué tasa necesito o cuánto tiempo tardaré en alcanzar mi objetivo?*")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        inv_incognita = st.radio("Calcular:", ("Tasa", "Tiempo"), horizontal=True, key="inv_x", persist_state="page")
+        inv_vp = st.number_input("Valor Presente ($):", min_value=0.0, value=10000.0, step=500.0, key="inv_vp", persist_state="page")
+        inv_vf = st.number_input("Valor Futuro Deseado ($):", min_value=0.0, value=15000.0, step=500.0, key="inv_vf", persist_state="page")
         
-        **Interés Simple:**
-        - VF = C(1 + rt)
-        - VP = VF/(1 + rt)
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            if inv_incognita == "Tasa":
+                inv_dato = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="inv_t", persist_state="page")
+            else:
+                inv_dato = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="inv_r", persist_state="page")
+        with col_t2:
+            inv_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="inv_u", persist_state="page")
         
-        **Interés Compuesto:**
-        - VF = C(1 + r/n)^(nt)
-        - VP = VF/(1 + r/n)^(nt)
-        """)
+        inv_tipo = st.selectbox("Tipo de Interés:", ("Compuesto", "Simple"), key="inv_tipo", persist_state="page")
+        inv_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="inv_cap", persist_state="page", disabled=inv_tipo == "Simple")
+    
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if inv_vp > 0 and inv_vf > 0 and inv_dato > 0:
+            if inv_incognita == "Tasa":
+                if inv_tipo == "Simple":
+                    tasa, valido = tasa_implicita_simple(inv_vp, inv_vf, inv_dato, inv_unidad)
+                else:
+                    tasa, valido = tasa_implicita_compuesta(inv_vp, inv_vf, inv_dato, inv_cap, inv_unidad)
+                if valido:
+                    st.metric("🎯 Tasa Anual Necesaria", f"{float(tasa) * 100:.4f}%")
+                    st.metric("📈 Crecimiento Total", f"{(inv_vf / inv_vp - 1) * 100:.2f}%")
+                else:
+                    st.warning("No existe una tasa que lleve el valor presente al valor futuro indicado")
+            else:
+                tasa_decimal = inv_dato / 100
+                if inv_tipo == "Simple":
+                    tiempo, valido = tiempo_requerido_simple(inv_vp, inv_vf, tasa_decimal, inv_unidad)
+                else:
+                    tiempo, valido = tiempo_requerido_compuesto(inv_vp, inv_vf, tasa_decimal, inv_cap, inv_unidad)
+                if valido:
+                    st.metric("⏱️ Tiempo Necesario", f"{float(tiempo):,.2f} {inv_unidad.lower()}")
+                    st.metric("📈 Crecimiento Total", f"{(inv_vf / inv_vp - 1) * 100:.2f}%")
+                else:
+                    st.warning("Con esta tasa el valor presente no alcanza el valor futuro indicado")
 
-# --- PESTAÑAS PRINCIPALES ---
-tab1, tab2, tab3 = st.tabs([
-    "🧮 **Calculadora de Interés**",
-    "📊 **Análisis Comparativo**", 
-    "📚 **Ejemplos Prácticos**"
-])
+# Rango de fechas seleccionable: el cubierto por la tabla de días
+FECHA_MIN, FECHA_MAX = datetime.date(ANO_MIN, 1, 1), datetime.date(ANO_MAX, 12, 31)
 
-# === PESTAÑA 1: CALCULADORA DE INTERÉS ===
-with tab1:
-    st.markdown('<h2 class="sub-header">Calculadora de Interés: Valor Futuro y Presente</h2>', unsafe_allow_html=True)
-    
-    # Sub-pestañas para diferentes tipos de cálculo
-    subtab1, subtab2, subtab3, subtab4 = st.tabs([
-        "🚀 Interés Compuesto VF",
-        "🏦 Interés Compuesto VP", 
-        "📈 Interés Simple VF",
-        "💵 Interés Simple VP"
-    ])
-    
-    # --- INTERÉS COMPUESTO VALOR FUTURO ---
-    with subtab1:
-        st.markdown("### Interés Compuesto - Valor Futuro")
-        st.markdown("*Calcula cuánto valdrá tu inversión en el futuro*")
+@st.fragment
+@instrumentar("seccion.fechas")
+def seccion_fechas():
+    """Sub-pestaña de cálculo por fechas con convención de conteo de días"""
+    st.markdown("### Interés por Fechas")
+    st.markdown("*Calcula con fechas de inicio y fin según la convención de conteo de días del contrato*")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        fe_tipo = st.radio("Tipo de Interés:", ("Compuesto", "Simple"), horizontal=True, key="fe_tipo", persist_state="page")
+        fe_calculo = st.radio("Calcular:", ("VF", "VP"), horizontal=True, key="fe_calculo", persist_state="page")
+        etiqueta_monto = "Capital Inicial ($):" if fe_calculo == "VF" else "Valor Futuro Deseado ($):"
+        fe_monto = st.number_input(etiqueta_monto, min_value=0.0, value=10000.0, step=500.0, key="fe_monto", persist_state="page")
+        fe_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="fe_r", persist_state="page")
         
-        col1, col2 = st.columns([1, 1])
+        col_f1, col_f2 = st.columns(2)
+        with col_f1:
+            fe_inicio = st.date_input("Fecha de Inicio:", value=datetime.date.today(), min_value=FECHA_MIN, max_value=FECHA_MAX, key="fe_inicio", persist_state="page")
+        with col_f2:
+            fe_fin = st.date_input("Fecha de Fin:", value=datetime.date.today() + datetime.timedelta(days=180), min_value=FECHA_MIN, max_value=FECHA_MAX, key="fe_fin", persist_state="page")
         
-        with col1:
-            st.markdown("#### 📝 Datos de Entrada")
-            ic_vf_capital = st.number_input("Capital Inicial ($):", min_value=0.0, value=10000.0, step=500.0, key="ic_vf_c")
-            ic_vf_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="ic_vf_r")
-            
-            col_t1, col_t2 = st.columns([2, 1])
-            with col_t1:
-                ic_vf_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="ic_vf_t")
-            with col_t2:
-                ic_vf_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="ic_vf_u")
+        fe_convencion = st.selectbox("Convención de Días:", CONVENCIONES, index=1, key="fe_conv", persist_state="page")
+        fe_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="fe_cap", persist_state="page", disabled=fe_tipo == "Simple")
+    
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if fe_fin <= fe_inicio:
+            st.warning("La fecha de fin debe ser posterior a la de inicio")
+            return
+        if fe_monto > 0 and fe_tasa > 0:
+            dias = int(dias_computables(fe_inicio, fe_fin, fe_convencion))
+            anos = float(fraccion_anual(fe_inicio, fe_fin, fe_convencion))
+            tasa_decimal = fe_tasa / 100
             
-            ic_vf_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="ic_vf_cap")
-        
-        with col2:
-            st.markdown("#### 📊 Resultados")
-            if ic_vf_capital > 0 and ic_vf_tasa > 0 and ic_vf_tiempo > 0:
-                tasa_decimal = ic_vf_tasa / 100
-                vf, interes = interes_compuesto_vf(ic_vf_capital, tasa_decimal, ic_vf_tiempo, ic_vf_cap, ic_vf_unidad)
-                
-                st.metric("💰 Valor Futuro", f"${vf:,.2f}", delta=f"+${interes:,.2f}")
-                st.metric("📈 Interés Ganado", f"${interes:,.2f}")
-                st.metric("📊 Rendimiento %", f"{((vf/ic_vf_capital - 1) * 100):.2f}%")
-                
-                # Fórmula utilizada
-                st.markdown(f"""
-                <div class="formula-box">
-                <b>Fórmula:</b> VF = ${ic_vf_capital:,.2f} × (1 + {tasa_decimal:.4f}/{ic_vf_cap})^({ic_vf_cap} × {ic_vf_tiempo})
-                <br><b>Resultado:</b> ${vf:,.2f}
-                </div>
-                """, unsafe_allow_html=True)
-    
-    # --- INTERÉS COMPUESTO VALOR PRESENTE ---
-    with subtab2:
-        st.markdown("### Interés Compuesto - Valor Presente")
-        st.markdown("*Calcula cuánto debes invertir hoy para obtener un monto futuro*")
-        
-        col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            st.markdown("#### 📝 Datos de Entrada")
-            ic_vp_vf = st.number_input("Valor Futuro Deseado ($):", min_value=0.0, value=15000.0, step=500.0, key="ic_vp_vf")
-            ic_vp_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="ic_vp_r")
+            if fe_tipo == "Simple":
+                funcion = interes_simple_vf if fe_calculo == "VF" else interes_simple_vp
+                valor, interes = funcion(fe_monto, tasa_decimal, anos)
+            else:
+                funcion = interes_compuesto_vf if fe_calculo == "VF" else interes_compuesto_vp
+                valor, interes = funcion(fe_monto, tasa_decimal, anos, fe_cap)
             
-            col_t1, col_t2 = st.columns([2, 1])
-            with col_t1:
-                ic_vp_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="ic_vp_t")
-            with col_t2:
-                ic_vp_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="ic_vp_u")
+            st.metric("📅 Días Computables", f"{dias:,}")
+            st.metric("⏱️ Fracción de Año", f"{anos:.6f}")
+            if fe_calculo == "VF":
+                st.metric("💰 Valor Futuro", f"${valor:,.2f}", delta=f"+${interes:,.2f}")
+            else:
+                st.metric("🏦 Valor Presente (Inversión Hoy)", f"${valor:,.2f}")
+                st.metric("📈 Interés Total a Ganar", f"${interes:,.2f}")
             
-            ic_vp_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="ic_vp_cap")
-        
-        with col2:
-            st.markdown("#### 📊 Resultados")
-            if ic_vp_vf > 0 and ic_vp_tasa > 0 and ic_vp_tiempo > 0:
-                tasa_decimal = ic_vp_tasa / 100
-                vp, interes_total = interes_compuesto_vp(ic_vp_vf, tasa_decimal, ic_vp_tiempo, ic_vp_cap, ic_vp_unidad)
-                
-                st.metric("🏦 Valor Presente (Inversión Hoy)", f"${vp:,.2f}")
-                st.metric("💰 Valor Futuro", f"${ic_vp_vf:,.2f}", delta=f"+${interes_total:,.2f}")
-                st.metric("📈 Interés Total a Ganar", f"${interes_total:,.2f}")
-                
-                # Fórmula utilizada
-                st.markdown(f"""
-                <div class="formula-box">
-                <b>Fórmula:</b> VP = ${ic_vp_vf:,.2f} ÷ (1 + {tasa_decimal:.4f}/{ic_vp_cap})^({ic_vp_cap} × {ic_vp_tiempo})
-                <br><b>Resultado:</b> ${vp:,.2f}
-                </div>
-                """, unsafe_allow_html=True)
-    
-    # --- INTERÉS SIMPLE VALOR FUTURO ---
-    with subtab3:
-        st.markdown("### Interés Simple - Valor Futuro")
-        st.markdown("*Cálculo lineal de crecimiento de capital*")
+            # Comparación rápida entre convenciones para las mismas fechas
+            st.caption(" · ".join(
+                f"{convencion}: {float(fraccion_anual(fe_inicio, fe_fin, convencion)):.6f}" for convencion in CONVENCIONES
+            ))
+
+# Nombres visibles de los tipos de tabla de amortización
+ETIQUETAS_AMORTIZACION = {"frances": "Cuota fija (francés)", "aleman": "Amortización constante (alemán)", "acumulacion": "Acumulación (pago al vencimiento)"}
+
+@st.fragment
+@instrumentar("seccion.amortizacion")
+def seccion_amortizacion():
+    """Sub-pestaña de tablas de amortización y acumulación"""
+    # Importación diferida: solo se carga al abrir esta sub-pestaña
+    import amortizacion
+    import pandas as pd
+    
+    st.markdown("### Tabla de Amortización")
+    st.markdown("*Calendario de pagos período a período de un préstamo*")
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.markdown("#### 📝 Datos de Entrada")
+        am_principal = st.number_input("Monto del Préstamo ($):", min_value=0.0, value=20000.0, step=1000.0, key="am_p", persist_state="page")
+        am_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=5.0, step=0.1, key="am_r", persist_state="page")
         
-        col1, col2 = st.columns([1, 1])
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            am_tiempo = st.number_input("Tiempo:", min_value=0.0, value=3.0, step=0.5, key="am_t", persist_state="page")
+        with col_t2:
+            am_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="am_u", persist_state="page")
         
-        with col1:
-            st.markdown("#### 📝 Datos de Entrada")
-            is_vf_capital = st.number_input("Capital Inicial ($):", min_value=0.0, value=10000.0, step=500.0, key="is_vf_c")
-            is_vf_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="is_vf_r")
+        am_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual", "Diario"), key="am_cap", persist_state="page")
+        am_tipo = st.selectbox("Tipo de Tabla:", amortizacion.TIPOS, format_func=ETIQUETAS_AMORTIZACION.get, key="am_tipo", persist_state="page")
+    
+    with col2:
+        st.markdown("#### 📊 Resultados")
+        if am_principal > 0 and am_tiempo > 0:
+            parametros = (am_principal, am_tasa / 100, am_tiempo, am_cap, am_unidad, am_tipo)
+            try:
+                periodos = amortizacion.numero_periodos(am_tiempo, am_cap, am_unidad)
+            except ValueError as error:
+                st.warning(str(error))
+                return
             
-            col_t1, col_t2 = st.columns([2, 1])
-            with col_t1:
-                is_vf_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="is_vf_t")
-            with col_t2:
-                is_vf_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="is_vf_u")
-        
-        with col2:
-            st.markdown("#### 📊 Resultados")
-            if is_vf_capital > 0 and is_vf_tasa > 0 and is_vf_tiempo > 0:
-                tasa_decimal = is_vf_tasa / 100
-                vf, interes = interes_simple_vf(is_vf_capital, tasa_decimal, is_vf_tiempo, is_vf_unidad)
-                
-                st.metric("💰 Valor Futuro", f"${vf:,.2f}", delta=f"+${interes:,.2f}")
-                st.metric("📈 Interés Ganado", f"${interes:,.2f}")
-                st.metric("📊 Rendimiento %", f"{((vf/is_vf_capital - 1) * 100):.2f}%")
-                
-                # Fórmula utilizada
-                st.markdown(f"""
-                <div class="formula-box">
-                <b>Fórmula:</b> VF = ${is_vf_capital:,.2f} × (1 + {tasa_decimal:.4f} × {is_vf_tiempo})
-                <br><b>Resultado:</b> ${vf:,.2f}
-                </div>
-                """, unsafe_allow_html=True)
-    
-    # --- INTERÉS SIMPLE VALOR PRESENTE ---
-    with subtab4:
-        st.markdown("### Interés Simple - Valor Presente")
-        st.markdown("*Calcula la inversión inicial necesaria con interés simple*")
-        
-        col1, col2 = st.columns([1, 1])
-        
-        with col1:
-            st.markdown("#### 📝 Datos de Entrada")
-            is_vp_vf = st.number_input("Valor Futuro Deseado ($):", min_value=0.0, value=15000.0, step=500.0, key="is_vp_vf")
-            is_vp_tasa = st.number_input("Tasa de Interés Anual (%):", min_value=0.0, value=8.0, step=0.1, key="is_vp_r")
+            primer_pago, total_pagado, interes_total = amortizacion.resumen_amortizacion(*parametros)
+            col_m1, col_m2, col_m3 = st.columns(3)
+            col_m1.metric("💳 Primer Pago", f"${primer_pago:,.2f}")
+            col_m2.metric("💰 Total Pagado", f"${total_pagado:,.2f}")
+            col_m3.metric("📈 Interés Total", f"${interes_total:,.2f}")
             
-            col_t1, col_t2 = st.columns([2, 1])
-            with col_t1:
-                is_vp_tiempo = st.number_input("Tiempo:", min_value=0.0, value=5.0, step=0.1, key="is_vp_t")
-            with col_t2:
-                is_vp_unidad = st.selectbox("Unidad:", ("Años", "Meses", "Días"), key="is_vp_u")
-        
-        with col2:
-            st.markdown("#### 📊 Resultados")
-            if is_vp_vf > 0 and is_vp_tasa > 0 and is_vp_tiempo > 0:
-                tasa_decimal = is_vp_tasa / 100
-                vp, interes_total = interes_simple_vp(is_vp_vf, tasa_decimal, is_vp_tiempo, is_vp_unidad)
-                
-                st.metric("🏦 Valor Presente (Inversión Hoy)", f"${vp:,.2f}")
-                st.metric("💰 Valor Futuro", f"${is_vp_vf:,.2f}", delta=f"+${interes_total:,.2f}")
-                st.metric("📈 Interés Total a Ganar", f"${interes_total:,.2f}")
-                
-                # Fórmula utilizada
-                st.markdown(f"""
-                <div class="formula-box">
-                <b>Fórmula:</b> VP = ${is_vp_vf:,.2f} ÷ (1 + {tasa_decimal:.4f} × {is_vp_tiempo})
-                <br><b>Resultado:</b> ${vp:,.2f}
-                </div>
-                """, unsafe_allow_html=True)
+            if periodos <= amortizacion.UMBRAL_FILAS:
+                with medir("pandas.tabla_amortizacion"):
+                    tabla = pd.DataFrame(amortizacion.tabla_amortizacion(*parametros))
+                st.dataframe(
+                    tabla,
+                    hide_index=True,
+                    width="stretch",
+                    column_config={
+                        columna: st.column_config.NumberColumn(format="$%.2f")
+                        for columna in amortizacion.COLUMNAS[1:]
+                    },
+                )
+            else:
+                # Las tablas largas se escriben por bloques en un archivo temporal
+                st.info(f"La tabla tiene **{periodos:,}** períodos; se genera como archivo CSV por bloques.")
+                resultado = st.session_state.get("am_resultado")
+                if resultado is None or resultado["parametros"] != parametros:
+                    if st.button("📄 Generar Tabla Completa", key="am_generar"):
+                        _limpiar_archivo_temporal("am_resultado")
+                        descriptor, ruta = tempfile.mkstemp(prefix="amortizacion_", suffix=".csv.gz")
+                        os.close(descriptor)
+                        with gzip.open(ruta, "wt", newline="") as destino:
+                            amortizacion.guardar_tabla_amortizacion(destino, *parametros)
+                        resultado = {"ruta": ruta, "parametros": parametros}
+                        st.session_state["am_resultado"] = resultado
+                if resultado is not None and resultado["parametros"] == parametros:
+                    st.download_button(
+                        "⬇️ Descargar Tabla (CSV comprimido)",
+                        data=lambda: _leer_archivo(resultado["ruta"]),
+                        file_name="tabla_amortizacion.csv.gz",
+                        mime="application/gzip",
+                    )
 
-# === PESTAÑA 2: ANÁLISIS COMPARATIVO ===
-with tab2:
-    st.markdown('<h2 class="sub-header">Análisis Comparativo: Simple vs Compuesto</h2>', unsafe_allow_html=True)
-    
+# Formato de visualización de la tabla comparativa (los datos siguen siendo numéricos)
+FILAS_POR_PAGINA = 500
+FORMATO_TABLA_COMPARACION = {
+    "Interés Simple": st.column_config.NumberColumn(format="dollar"),
+    "Interés Compuesto": st.column_config.NumberColumn(format="dollar"),
+    "Diferencia": st.column_config.NumberColumn(format="dollar"),
+    "Ventaja": st.column_config.NumberColumn("Ventaja %", format="percent"),
+}
+
+@st.fragment
+@instrumentar("seccion.comparacion")
+def seccion_comparacion():
+    """Pestaña de análisis comparativo entre interés simple y compuesto"""
     # Configuración para comparación
     col_config1, col_config2, col_graph = st.columns([1, 1, 2])
     
     with col_config1:
         st.markdown("#### ⚙️ Configuración")
-        comp_capital = st.number_input("Capital Inicial ($):", min_value=0.0, value=10000.0, step=1000.0, key="comp_c")
-        comp_tasa = st.number_input("Tasa Anual (%):", min_value=0.0, value=8.0, step=0.5, key="comp_r")
-        comp_tiempo = st.slider("Tiempo (Años):", 1, 20, 10, key="comp_t")
-        comp_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual"), key="comp_cap")
+        comp_capital = st.number_input("Capital Inicial ($):", min_value=0.0, value=10000.0, step=1000.0, key="comp_c", persist_state="page")
+        comp_tasa = st.number_input("Tasa Anual (%):", min_value=0.0, value=8.0, step=0.5, key="comp_r", persist_state="page")
+        comp_largo = st.toggle("🔭 Horizonte largo", key="comp_largo", persist_state="page", help="Hasta 100 años con resolución mensual o diaria")
+        if comp_largo:
+            comp_tiempo = st.slider("Tiempo (Años):", 1, 100, 40, key="comp_t_largo", persist_state="page")
+            comp_resolucion = st.selectbox("Resolución:", ("Mensual", "Diaria"), key="comp_res", persist_state="page")
+        else:
+            comp_tiempo = st.slider("Tiempo (Años):", 1, 20, 10, key="comp_t", persist_state="page")
+            comp_resolucion = "Anual"
+        comp_cap = st.selectbox("Capitalización:", ("Anual", "Semestral", "Trimestral", "Mensual"), key="comp_cap", persist_state="page")
+        comp_aporte = st.number_input("Aporte por Período ($):", value=0.0, step=100.0, key="comp_aporte", persist_state="page",
+                                      help="Aporte al cierre de cada período de capitalización; negativo para retiros")
+        comp_aportes = APORTES_NULOS
+        if comp_aporte:
+            comp_anticipada = st.toggle("Aportes al inicio del período", key="comp_anticipada", persist_state="page")
+            comp_crecimiento = st.number_input("Crecimiento anual del aporte (%):", value=0.0, step=0.5, key="comp_crec", persist_state="page")
+            comp_aportes = (comp_aporte, comp_crecimiento / 100, comp_anticipada)
+        # La simulación de tasas cubre el capital inicial, no los aportes
+        comp_estocastica = st.toggle("🎲 Tasas estocásticas", key="comp_mc", persist_state="page", disabled=bool(comp_aporte),
+                                     help="Simula la incertidumbre de la tasa en cada período y muestra bandas de percentiles") and not comp_aporte
+        if comp_estocastica:
+            comp_modelo = st.selectbox("Choques:", MODELOS, format_func=str.capitalize, key="comp_mc_modelo", persist_state="page",
+                                       help="Normal: la tasa anual varía ± la volatilidad en puntos porcentuales. Lognormal: varía en proporción y nunca es negativa.")
+            comp_volatilidad = st.number_input("Volatilidad de la tasa (%):", min_value=0.0, value=2.0, step=0.5, key="comp_mc_vol", persist_state="page")
+            comp_trayectorias = st.select_slider("Trayectorias:", (10_000, 100_000, 1_000_000), value=100_000, format_func="{:,}".format, key="comp_mc_n", persist_state="page")
     
     with col_config2:
         st.markdown("#### 📊 Resumen de Resultados")
         if comp_capital > 0 and comp_tasa > 0:
             tasa_dec = comp_tasa / 100
-            
+    
             # Calcular valores finales
             vf_simple, int_simple = interes_simple_vf(comp_capital, tasa_dec, comp_tiempo)
             vf_compuesto, int_compuesto = interes_compuesto_vf(comp_capital, tasa_dec, comp_tiempo, comp_cap)
+            if comp_aporte:
+                aporte, crecimiento, anticipada = comp_aportes
+                vf_simple += float(anualidad_simple_vf_lote(aporte, tasa_dec, comp_tiempo, comp_cap, crecimiento, anticipada)[0])
+                vf_compuesto += anualidad_vf(aporte, tasa_dec, comp_tiempo, comp_cap, crecimiento, anticipada)[0]
+                aportado = float(total_aportado_lote(aporte, comp_tiempo, comp_cap, crecimiento))
+                st.metric("🔁 Total Aportado", f"${comp_capital + aportado:,.2f}",
+                          help=f"Capital inicial más {comp_tiempo * FRECUENCIAS[comp_cap]:,} aportes")
             diferencia = vf_compuesto - vf_simple
-            
+    
             st.metric("📈 Simple - Valor Final", f"${vf_simple:,.2f}")
             st.metric("🚀 Compuesto - Valor Final", f"${vf_compuesto:,.2f}", delta=f"+${diferencia:,.2f}")
             st.metric("💡 Ventaja del Compuesto", f"${diferencia:,.2f}")
-            
+    
             # Porcentaje de ventaja
             if vf_simple > 0:
                 ventaja_pct = (diferencia / vf_simple) * 100
                 st.success(f"**Ventaja:** {ventaja_pct:.2f}% más rentable")
+            
+            # Distribución del valor final con tasas estocásticas
+            simulacion = None
+            if comp_estocastica:
+                with st.spinner("Simulando trayectorias..."):
+                    simulacion = simulacion_tasas(comp_capital, tasa_dec, comp_tiempo, comp_cap,
+                                                  comp_volatilidad / 100, comp_modelo, comp_trayectorias)
+                bandas = simulacion["bandas"][:, -1]
+                st.metric("🎲 Mediana Simulada", f"${bandas[len(bandas) // 2]:,.2f}",
+                          delta=f"{bandas[len(bandas) // 2] - vf_compuesto:+,.2f} vs tasa fija")
+                st.caption(f"P{simulacion['percentiles'][0]}–P{simulacion['percentiles'][-1]}: "
+                           f"${bandas[0]:,.2f} – ${bandas[-1]:,.2f} · media ${simulacion['media'][-1]:,.2f}")
     
     with col_graph:
         st.markdown("#### 📈 Gráfico Comparativo")
         if comp_capital > 0 and comp_tasa > 0:
-            fig = crear_grafico_comparacion(comp_capital, tasa_dec, comp_tiempo, comp_cap)
-            st.plotly_chart(fig, use_container_width=True)
+            fig = grafico_comparacion(comp_capital, tasa_dec, comp_tiempo, comp_cap, comp_resolucion, comp_aportes)
+            if simulacion is not None:
+                # La figura con abanico es una copia propia de la sesión
+                entradas = (comp_capital, tasa_dec, comp_tiempo, comp_cap, comp_resolucion, comp_volatilidad, comp_modelo, comp_trayectorias)
+                fig = retenido("comparacion.abanico", entradas, lambda: agregar_abanico(fig, simulacion))
+            with medir("st.plotly_chart"):
+                st.plotly_chart(fig, width="stretch")
     
     # Tabla comparativa detallada
     if comp_capital > 0 and comp_tasa > 0:
         st.markdown("#### 📋 Tabla Comparativa Detallada")
         
-        # Crear datos para la tabla
-        años = list(range(0, comp_tiempo + 1, max(1, comp_tiempo // 10)))
-        datos_tabla = []
+        comp_completa = st.toggle("Mostrar todos los períodos", key="comp_completa", persist_state="page")
+        # La caché devuelve una copia en cada llamada: al paginar se reutiliza la de la sesión
+        entradas = (comp_capital, tasa_dec, comp_tiempo, comp_cap, comp_resolucion, comp_completa, comp_aportes)
+        df = retenido("comparacion.tabla", entradas,
+                      lambda: tabla_comparacion(comp_capital, tasa_dec, comp_tiempo, comp_cap, comp_resolucion, comp_completa, comp_aportes))
         
-        for año in años:
-            if año == 0:
-                simple = compuesto = comp_capital
-            else:
-                simple, _ = interes_simple_vf(comp_capital, tasa_dec, año)
-                compuesto, _ = interes_compuesto_vf(comp_capital, tasa_dec, año, comp_cap)
-            
-            diferencia = compuesto - simple
-            datos_tabla.append({
-                "Año": año,
-                "Interés Simple": f"${simple:,.2f}",
-                "Interés Compuesto": f"${compuesto:,.2f}",
-                "Diferencia": f"${diferencia:,.2f}",
-                "Ventaja %": f"{(diferencia/simple*100):.2f}%" if simple > 0 else "0.00%"
-            })
+        # Paginación en el servidor: solo se envía al navegador la página visible
+        paginas = max(1, -(-len(df) // FILAS_POR_PAGINA))
+        if paginas > 1:
+            col_pagina, col_info = st.columns([1, 3])
+            with col_pagina:
+                # La clave depende del tamaño para reiniciar la página al cambiar la tabla
+                pagina = st.number_input("Página:", min_value=1, max_value=paginas, value=1, step=1, key=f"comp_pagina_{len(df)}")
+            with col_info:
+                st.caption(f"{len(df):,} filas · página {pagina} de {paginas}")
+        else:
+            pagina = 1
+        
+        inicio = (pagina - 1) * FILAS_POR_PAGINA
+        with medir("st.dataframe"):
+            st.dataframe(
+                df.iloc[inicio:inicio + FILAS_POR_PAGINA],
+                hide_index=True,
+                width="stretch",
+                column_config=FORMATO_TABLA_COMPARACION,
+            )
         
-        df = pd.DataFrame(datos_tabla)
-        st.dataframe(df, use_container_width=True)
+        # Las exportaciones usan los valores numéricos sin formato
+        col_csv, col_parquet, _ = st.columns([1, 1, 2])
+        with col_csv:
+            st.download_button(
+                "⬇️ CSV",
+                data=lambda: df.to_csv(index=False).encode("utf-8"),
+                file_name="comparacion.csv",
+                mime="text/csv",
+                key="comp_descarga_csv",
+            )
+        with col_parquet:
+            st.download_button(
+                "⬇️ Parquet",
+                data=lambda: df.to_parquet(index=False),
+                file_name="comparacion.parquet",
+                mime="application/vnd.apache.parquet",
+                key="comp_descarga_parquet",
+            )
 
-# === PESTAÑA 3: EJEMPLOS PRÁCTICOS ===
-with tab3:
-    st.markdown('<h2 class="sub-header">Ejemplos Prácticos y Casos de Uso</h2>', unsafe_allow_html=True)
+# --- Escenarios Guardados ---
+
+# Filas de la comparación lado a lado y su formato
+FILAS_ESCENARIO = {
+    "capital": ("Capital inicial", "${:,.2f}"),
+    "tasa": ("Tasa anual", "{:.2%}"),
+    "tiempo": ("Tiempo (años)", "{:g}"),
+    "capitalizacion": ("Capitalización", "{}"),
+    "aporte": ("Aporte por período", "${:,.2f}"),
+    "crecimiento": ("Crecimiento del aporte", "{:.2%}"),
+    "anticipada": ("Aportes al inicio", "{}"),
+    "total_aportado": ("Total aportado", "${:,.2f}"),
+    "volatilidad": ("Volatilidad", "{:.2%}"),
+    "modelo": ("Choques", "{}"),
+    "trayectorias": ("Trayectorias", "{:,.0f}"),
+    "vf_simple": ("Simple - Valor final", "${:,.2f}"),
+    "vf_compuesto": ("Compuesto - Valor final", "${:,.2f}"),
+    "diferencia": ("Ventaja del compuesto", "${:,.2f}"),
+    "p5": ("P5 simulado", "${:,.2f}"),
+    "p50": ("Mediana simulada", "${:,.2f}"),
+    "p95": ("P95 simulado", "${:,.2f}"),
+    "media_simulada": ("Media simulada", "${:,.2f}"),
+}
+
+def _entradas_escenario():
+    """Entradas actuales de la comparación, con los mismos nombres que escenarios.calcular_comparacion"""
+    estado = st.session_state
+    largo = estado.get("comp_largo", False)
+    entradas = {
+        "capital": estado.get("comp_c", 10000.0),
+        "tasa": estado.get("comp_r", 8.0) / 100,
+        "tiempo": estado.get("comp_t_largo", 40) if largo else estado.get("comp_t", 10),
+        "capitalizacion": estado.get("comp_cap", "Anual"),
+    }
+    # Sin aporte no se guardan sus opciones: el escenario conserva el mismo hash
+    if estado.get("comp_aporte", 0.0):
+        entradas["aporte"] = estado["comp_aporte"]
+        entradas["crecimiento"] = estado.get("comp_crec", 0.0) / 100
+        entradas["anticipada"] = estado.get("comp_anticipada", False)
+    elif estado.get("comp_mc", False):
+        entradas["volatilidad"] = estado.get("comp_mc_vol", 2.0) / 100
+        entradas["modelo"] = estado.get("comp_mc_modelo", MODELOS[0])
+        entradas["trayectorias"] = estado.get("comp_mc_n", 100_000)
+    return entradas
+
+def _cargar_escenario():
+    """Lleva las entradas del escenario elegido a los controles de la comparación"""
+    escenario = escenarios.cargar_escenario(st.session_state["esc_elegido"])
+    if escenario is None:
+        return
+    _, entradas = escenario
+    estado = st.session_state
+    estado["comp_c"] = entradas["capital"]
+    estado["comp_r"] = entradas["tasa"] * 100
+    estado["comp_largo"] = entradas["tiempo"] > 20
+    estado["comp_t_largo" if estado["comp_largo"] else "comp_t"] = int(entradas["tiempo"])
+    estado["comp_cap"] = entradas["capitalizacion"]
+    estado["comp_aporte"] = entradas.get("aporte", 0.0)
+    if "aporte" in entradas:
+        estado["comp_crec"] = entradas["crecimiento"] * 100
+        estado["comp_anticipada"] = entradas["anticipada"]
+    estado["comp_mc"] = "volatilidad" in entradas
+    if estado["comp_mc"]:
+        estado["comp_mc_vol"] = entradas["volatilidad"] * 100
+        estado["comp_mc_modelo"] = entradas["modelo"]
+        estado["comp_mc_n"] = int(entradas["trayectorias"])
+    # La comparación está fuera de este fragmento: hace falta una ejecución completa
+    estado["esc_recargar"] = True
+
+def _eliminar_escenario():
+    """Elimina el escenario elegido"""
+    escenarios.eliminar_escenario(st.session_state["esc_elegido"])
+
+@st.fragment
+@instrumentar("seccion.escenarios")
+def seccion_escenarios():
+    """Escenarios con nombre de la comparación: guardar, cargar y comparar lado a lado"""
+    if st.session_state.pop("esc_recargar", False):
+        st.rerun()
     
-    # Ejemplos basados en los documentos proporcionados
-    ejemplo_col1, ejemplo_col2 = st.columns(2)
+    st.markdown("#### 💾 Escenarios Guardados")
+    st.markdown("*Los escenarios se comparten entre sesiones y sus resultados se guardan: "
+                "un escenario ya calculado por cualquiera se sirve sin repetir el cálculo.*")
     
-    with ejemplo_col1:
-        st.markdown("### 🏭 Casos Empresariales")
-        
-        with st.expander("💼 Financiamiento de Inventario - Salsa de Tomate"):
-            st.markdown("**Empresa necesita financiar materia prima**")
-            st.markdown("""
-            - **Capital:** $10,000
-            - **Tasa:** 10% anual  
-            - **Tiempo:** 3 meses
-            - **Tipo:** Interés Simple
-            """)
-            
-            vf_ej1, int_ej1 = interes_simple_vf(10000, 0.10, 3, "Meses")
-            st.success(f"**Interés a pagar:** ${int_ej1:.2f}")
-            st.info(f"**Total a devolver:** ${vf_ej1:.2f}")
-        
-        with st.expander("👟 Importación de Tenis New Balance"):
-            st.markdown("**Financiamiento para compra en EE.UU.**")
-            st.markdown("""
-            - **Capital:** $10,000
-            - **Tasa:** 5% anual
-            - **Tiempo:** 3 meses  
-            - **Tipo:** Interés Simple
-            """)
-            
-            vf_ej2, int_ej2 = interes_simple_vf(10000, 0.05, 3, "Meses")
-            st.success(f"**Costo de financiamiento:** ${int_ej2:.2f}")
-            st.info(f"**Total a pagar:** ${vf_ej2:.2f}")
-        
-        with st.expander("📄 Cuentas por Cobrar - Interés por Mora"):
-            st.markdown("**Interés sobre facturas vencidas**")
-            st.markdown("""
-            - **Factura:** $500
-            - **Tasa:** 2% mensual
-            - **Retraso:** 15 días
-            - **Tipo:** Interés Simple
-            """)
-            
-            vf_ej3, int_ej3 = interes_simple_vf(500, 0.02, 15, "Días")
-            st.success(f"**Interés por mora:** ${int_ej3:.2f}")
-            st.info(f"**Total a cobrar:** ${vf_ej3:.2f}")
+    col_guardar, col_gestion = st.columns([1, 2])
     
-    with ejemplo_col2:
-        st.markdown("### 💰 Casos de Inversión")
-        
-        with st.expander("📈 Ahorros para Expansión - Interés Compuesto"):
-            st.markdown("**Inversión a largo plazo para crecimiento**")
-            st.markdown("""
-            - **Inversión:** $10,000
-            - **Tasa:** 8% anual
-            - **Tiempo:** 5 años
-            - **Capitalización:** Anual
-            """)
-            
-            vf_ej4, int_ej4 = interes_compuesto_vf(10000, 0.08, 5, "Anual")
-            st.success(f"**Valor final:** ${vf_ej4:.2f}")
-            st.info(f"**Ganancia total:** ${int_ej4:.2f}")
-        
-        with st.expander("🏦 Préstamo para Crecimiento"):
-            st.markdown("**Préstamo con interés compuesto**")
-            st.markdown("""
-            - **Préstamo:** $20,000
-            - **Tasa:** 5% anual
-            - **Tiempo:** 3 años
-            - **Capitalización:** Anual
-            """)
-            
-            vf_ej5, int_ej5 = interes_compuesto_vf(20000, 0.05, 3, "Anual")
-            st.warning(f"**Total a pagar:** ${vf_ej5:.2f}")
-            st.error(f"**Interés total:** ${int_ej5:.2f}")
-        
-        with st.expander("💡 Valor Presente - Planificación"):
-            st.markdown("**¿Cuánto invertir hoy para tener $20,000 en 2 años?**")
-            st.markdown("""
-            - **Objetivo:** $20,000
-            - **Tasa:** 6% anual
-            - **Tiempo:** 2 años
-            - **Tipo:** Interés Compuesto
-            """)
-            
-            vp_ej6, _ = interes_compuesto_vp(20000, 0.06, 2, "Anual")
-            st.success(f"**Inversión necesaria hoy:** ${vp_ej6:.2f}")
+    with col_guardar:
+        esc_nombre = st.text_input("Nombre:", key="esc_nombre", placeholder="Ej.: Plan conservador")
+        if st.button("💾 Guardar configuración actual", key="esc_guardar", disabled=not esc_nombre.strip()):
+            entradas = _entradas_escenario()
+            escenarios.guardar_escenario(esc_nombre, "comparacion", entradas)
+            with st.spinner("Calculando escenario..."):
+                _, reutilizado = escenarios.obtener_o_calcular("comparacion", entradas)
+            st.success(f"Escenario '{esc_nombre.strip()}' guardado" + (" (resultado ya calculado)" if reutilizado else ""))
+    
+    nombres = escenarios.listar_escenarios("comparacion")
+    with col_gestion:
+        if not nombres:
+            st.info("Aún no hay escenarios guardados")
+            return
+        col_elegido, col_cargar, col_eliminar = st.columns([2, 1, 1])
+        with col_elegido:
+            st.selectbox("Escenario:", nombres, key="esc_elegido")
+        with col_cargar:
+            st.button("📂 Cargar", on_click=_cargar_escenario, key="esc_boton_cargar", width="stretch")
+        with col_eliminar:
+            st.button("🗑️ Eliminar", on_click=_eliminar_escenario, key="esc_boton_eliminar", width="stretch")
+    
+    # Los escenarios eliminados desde otra sesión dejan de ser opciones válidas
+    if "esc_comparar" in st.session_state:
+        st.session_state["esc_comparar"] = [nombre for nombre in st.session_state["esc_comparar"] if nombre in nombres]
+    esc_comparar = st.multiselect("Comparar lado a lado:", nombres, key="esc_comparar", max_selections=6)
+    if esc_comparar:
+        import pandas as pd
+        filas = escenarios.comparar_escenarios(esc_comparar)
+        tabla = pd.DataFrame({
+            fila["nombre"]: {
+                etiqueta: formato.format(fila[campo]) if campo in fila else "—"
+                for campo, (etiqueta, formato) in FILAS_ESCENARIO.items()
+            }
+            for fila in filas
+        })
+        with medir("st.dataframe"):
+            st.dataframe(tabla, width="stretch")
+
+# --- Reportes en Segundo Plano ---
+
+# Intervalo de actualización del estado de los reportes en la barra lateral
+INTERVALO_REPORTES = "2s"
+ESTADOS_REPORTE = {"en cola": "⏳ En cola", "generando": "⚙️ Generando", "listo": "✅ Listo", "error": "❌ Error"}
+
+@st.cache_resource
+def _cola_reportes():
+    """Grupo de procesos y registro de reportes compartidos por todas las sesiones"""
+    return reportes.crear_cola()
+
+def _escenarios_reporte(nombres):
+    """Escenarios guardados en el formato de reportes.generar_reporte"""
+    lote = []
+    for nombre in nombres:
+        escenario = escenarios.cargar_escenario(nombre)
+        if escenario is not None:
+            _, entradas = escenario
+            lote.append({"nombre": nombre, "capital": entradas["capital"], "tasa": entradas["tasa"],
+                         "tiempo": int(entradas["tiempo"]), "capitalizacion": entradas["capitalizacion"],
+                         "aporte": entradas.get("aporte", 0.0), "crecimiento": entradas.get("crecimiento", 0.0),
+                         "anticipada": entradas.get("anticipada", False)})
+    return lote
+
+@st.fragment
+@instrumentar("seccion.reportes")
+def seccion_reportes():
+    """Generación de reportes de lotes de escenarios en segundo plano"""
+    st.markdown("#### 📤 Exportar Reportes")
+    st.markdown("*Libro con el resumen y la tabla comparativa de cada escenario, más su gráfico como imagen. "
+                "Se genera en segundo plano: el estado y la descarga aparecen en la barra lateral.*")
+    
+    col_origen, col_opciones = st.columns([2, 1])
+    
+    with col_origen:
+        rep_origen = st.radio("Escenarios:", ("guardados", "archivo"), horizontal=True, key="rep_origen",
+                              format_func={"guardados": "💾 Guardados", "archivo": "📁 Archivo CSV o Parquet"}.get)
+        lote, descripcion = [], ""
+        if rep_origen == "guardados":
+            nombres = escenarios.listar_escenarios("comparacion")
+            if "rep_guardados" in st.session_state:
+                st.session_state["rep_guardados"] = [nombre for nombre in st.session_state["rep_guardados"] if nombre in nombres]
+            rep_guardados = st.multiselect("Escenarios guardados:", nombres, key="rep_guardados", placeholder="Todos")
+            lote = _escenarios_reporte(rep_guardados or nombres)
+            descripcion = f"{len(lote)} escenarios guardados"
+        else:
+            st.caption(f"Columnas: {', '.join(reportes.COLUMNAS_ESCENARIOS)} (tasa en decimal) y opcionales nombre, "
+                       f"capitalizacion, aporte, crecimiento y anticipada. Hasta {reportes.MAXIMO_ESCENARIOS:,} escenarios.")
+            archivo = st.file_uploader("Archivo de escenarios:", type=["csv", "parquet"], key="rep_archivo")
+            if archivo is not None:
+                # Importación diferida: cartera carga pandas y pyarrow
+                import cartera
+                import pandas as pd
+                try:
+                    formato = cartera.detectar_formato(archivo.name)
+                    lote = reportes.leer_escenarios(pd.read_parquet(archivo) if formato == "parquet" else pd.read_csv(archivo))
+                except ValueError as error:
+                    st.error(f"❌ {error}")
+                descripcion = archivo.name
+    
+    with col_opciones:
+        rep_formato = st.selectbox("Formato:", reportes.formatos_disponibles(), key="rep_formato",
+                                   format_func={"xlsx": "Excel (.xlsx)", "csv": "CSV"}.get)
+        rep_imagenes = st.checkbox("Incluir gráficos (PNG)", value=reportes.imagenes_disponibles(), key="rep_imagenes",
+                                   disabled=not reportes.imagenes_disponibles(), help="Requiere kaleido")
+        if st.button("📤 Generar reporte", type="primary", key="rep_generar", disabled=not lote):
+            try:
+                reportes.enviar_reporte(_cola_reportes(), id_sesion(), descripcion, lote, rep_formato, rep_imagenes)
+            except RuntimeError as error:
+                st.warning(f"⚠️ {error}")
+            else:
+                # La barra lateral está fuera de este fragmento
+                st.rerun()
+
+@st.fragment(run_every=INTERVALO_REPORTES)
+def panel_reportes():
+    """Estado de los reportes de la sesión, con su descarga cuando terminan"""
+    cola = _cola_reportes()
+    for trabajo in reportes.trabajos_sesion(cola, id_sesion()):
+        st.markdown(f"**{trabajo['descripcion']}** · {ESTADOS_REPORTE[trabajo['estado']]}")
+        col_descarga, col_descartar = st.columns([3, 1])
+        with col_descarga:
+            if trabajo["estado"] == "listo":
+                # Datos diferidos: el ZIP solo se envía al navegador al pulsar
+                st.download_button("⬇️ Descargar", data=lambda datos=trabajo["datos"]: datos,
+                                   file_name=f"reporte_{trabajo['id']}.zip", mime="application/zip",
+                                   key=f"rep_descarga_{trabajo['id']}")
+                for aviso in trabajo["avisos"]:
+                    st.caption(f"⚠️ {aviso}")
+            elif trabajo["estado"] == "error":
+                st.caption(trabajo["error"])
+            else:
+                st.caption(f"{trabajo['escenarios']:,} escenarios · {trabajo['formato'].upper()}")
+        with col_descartar:
+            st.button("✖️", key=f"rep_descartar_{trabajo['id']}", on_click=reportes.descartar, args=(cola, trabajo["id"]),
+                      help="Descartar")
+
+# Rango completo de la malla de sensibilidad: tasa anual (%) y tiempo (años)
+RANGO_TASAS_SENSIBILIDAD = (0.0, 30.0)
+RANGO_TIEMPOS_SENSIBILIDAD = (0.0, 50.0)
+
+def _ajustar_rango(valores, rango, decimales):
+    """Ordena, recorta al rango permitido y redondea un par (mínimo, máximo) no vacío"""
+    bajo, alto = (min(max(round(float(valor), decimales), rango[0]), rango[1]) for valor in sorted(valores))
+    paso = 10 ** -decimales
+    if alto - bajo < paso:
+        alto = min(bajo + paso, rango[1])
+        bajo = alto - paso
+    return bajo, alto
+
+def _zoom_sensibilidad():
+    """Refina la malla sobre la región seleccionada con la herramienta de caja"""
+    cajas = (st.session_state.get("sens_mapa") or {}).get("selection", {}).get("box", [])
+    if cajas:
+        st.session_state["sens_tiempos"] = _ajustar_rango(cajas[-1]["x"], RANGO_TIEMPOS_SENSIBILIDAD, 2)
+        st.session_state["sens_tasas"] = _ajustar_rango(cajas[-1]["y"], RANGO_TASAS_SENSIBILIDAD, 2)
+
+def _restablecer_sensibilidad():
+    """Vuelve a la malla completa"""
+    st.session_state["sens_tasas"] = RANGO_TASAS_SENSIBILIDAD
+    st.session_state["sens_tiempos"] = RANGO_TIEMPOS_SENSIBILIDAD
+
+@st.fragment
+@instrumentar("seccion.sensibilidad")
+def seccion_sensibilidad():
+    """Mapa de sensibilidad del valor a la tasa y el tiempo"""
+    st.markdown("#### 🌡️ Sensibilidad Tasa × Tiempo")
+    st.markdown(f"*{PUNTOS_SENSIBILIDAD} tasas × {PUNTOS_SENSIBILIDAD} plazos para cada capitalización en un solo cálculo. "
+                "Selecciona una región del mapa con la herramienta de caja para refinarla.*")
+    
+    st.session_state.setdefault("sens_tasas", RANGO_TASAS_SENSIBILIDAD)
+    st.session_state.setdefault("sens_tiempos", RANGO_TIEMPOS_SENSIBILIDAD)
+    
+    col_config, col_mapa = st.columns([1, 3])
+    
+    with col_config:
+        sens_calculo = st.radio("Calcular:", ("VF", "VP"), horizontal=True, key="sens_calculo", persist_state="page")
+        etiqueta_monto = "Capital Inicial ($):" if sens_calculo == "VF" else "Valor Futuro Deseado ($):"
+        sens_monto = st.number_input(etiqueta_monto, min_value=0.0, value=10000.0, step=1000.0, key="sens_monto", persist_state="page")
+        sens_cap = st.selectbox("Capitalización:", tuple(FRECUENCIAS), index=3, key="sens_cap", persist_state="page")
+        sens_vista = st.radio("Vista:", ("mapa", "superficie"), format_func={"mapa": "Mapa de calor", "superficie": "Superficie 3D"}.get, horizontal=True, key="sens_vista", persist_state="page")
+        sens_tasas = st.slider("Tasa Anual (%):", *RANGO_TASAS_SENSIBILIDAD, step=0.01, key="sens_tasas", persist_state="page")
+        sens_tiempos = st.slider("Tiempo (Años):", *RANGO_TIEMPOS_SENSIBILIDAD, step=0.01, key="sens_tiempos", persist_state="page")
+        st.button("🔄 Restablecer zoom", on_click=_restablecer_sensibilidad, key="sens_restablecer")
+        st.caption(f"Resolución: {(sens_tasas[1] - sens_tasas[0]) / (PUNTOS_SENSIBILIDAD - 1):.4f} pp de tasa · "
+                   f"{(sens_tiempos[1] - sens_tiempos[0]) / (PUNTOS_SENSIBILIDAD - 1) * 12:.3f} meses")
     
-    # Calculadora rápida integrada
+    with col_mapa:
+        if sens_monto > 0:
+            fig = mapa_sensibilidad(sens_monto, [tasa / 100 for tasa in sens_tasas], sens_tiempos, sens_calculo, sens_cap, sens_vista)
+            with medir("st.plotly_chart"):
+                if sens_vista == "mapa":
+                    st.plotly_chart(fig, width="stretch", key="sens_mapa", on_select=_zoom_sensibilidad, selection_mode="box")
+                else:
+                    st.plotly_chart(fig, width="stretch")
+
+@st.fragment
+@instrumentar("seccion.calculadora_rapida")
+def seccion_calculadora_rapida():
+    """Calculadora rápida de la pestaña de ejemplos"""
     st.markdown("---")
     st.markdown("### 🧮 Calculadora Rápida")
     
     calc_col1, calc_col2, calc_col3 = st.columns(3)
     
     with calc_col1:
-        calc_capital = st.number_input("Capital ($):", value=5000.0, key="calc_c")
-        calc_tasa = st.number_input("Tasa (%):", value=7.0, key="calc_r")
+        calc_capital = st.number_input("Capital ($):", value=5000.0, key="calc_c", persist_state="page")
+        calc_tasa = st.number_input("Tasa (%):", value=7.0, key="calc_r", persist_state="page")
     
     with calc_col2:
-        calc_tiempo = st.number_input("Tiempo:", value=2.0, key="calc_t")
-        calc_unidad = st.selectbox("Unidad:", ("Años", "Meses"), key="calc_u")
+        calc_tiempo = st.number_input("Tiempo:", value=2.0, key="calc_t", persist_state="page")
+        calc_unidad = st.selectbox("Unidad:", ("Años", "Meses"), key="calc_u", persist_state="page")
     
     with calc_col3:
         if st.button("🚀 Calcular Ambos", type="primary"):
             tasa_d = calc_tasa / 100
-            
+    
             # Interés Simple
             vf_s, int_s = interes_simple_vf(calc_capital, tasa_d, calc_tiempo, calc_unidad)
-            
+    
             # Interés Compuesto (mensual)
             vf_c, int_c = interes_compuesto_vf(calc_capital, tasa_d, calc_tiempo, "Mensual", calc_unidad)
-            
+    
             st.metric("Simple VF", f"${vf_s:,.2f}")
             st.metric("Compuesto VF", f"${vf_c:,.2f}", delta=f"+${vf_c-vf_s:,.2f}")
 
+@st.fragment
+@instrumentar("seccion.carga_masiva")
+def seccion_carga_masiva():
+    """Pestaña de valoración masiva de carteras desde CSV o Parquet"""
+    # Importación diferida: cartera carga pandas y pyarrow
+    import cartera
+    
+    st.markdown("""
+    Sube un archivo **CSV** o **Parquet** con una posición por fila. Columnas:
+    
+    - **monto** *(obligatoria)*: capital inicial (VF) o valor futuro deseado (VP)
+    - **tasa** *(obligatoria)*: tasa anual en decimal (0.08 = 8%)
+    - **tiempo** *(obligatoria)*: duración en la unidad indicada
+    - **unidad**: Años, Meses o Días *(por defecto Años)*
+    - **capitalizacion**: Anual, Semestral, Trimestral, Mensual o Diario *(por defecto Anual)*
+    - **tipo**: simple o compuesto *(por defecto compuesto)*
+    - **calculo**: VF o VP *(por defecto VF)*
+    """)
+    
+    col_archivo, col_opciones = st.columns([2, 1])
+    
+    with col_archivo:
+        archivo = st.file_uploader("Archivo de posiciones:", type=["csv", "parquet"], key="masiva_archivo")
+    
+    with col_opciones:
+        tamano_bloque = st.number_input("Filas por bloque:", min_value=1000, value=cartera.TAMANO_BLOQUE, step=10000, key="masiva_bloque", persist_state="page")
+        valorar = st.button("📥 Valorar Cartera", type="primary", disabled=archivo is None)
+    
+    if valorar and archivo is not None:
+        _limpiar_archivo_temporal("masiva_resultado")
+        barra = st.progress(0.0, text="Valorando posiciones...")
+        
+        def progreso(filas, avance):
+            barra.progress(avance, text=f"{filas:,} posiciones valoradas")
+        
+        # El resultado se escribe comprimido en disco, bloque a bloque
+        descriptor, ruta = tempfile.mkstemp(prefix="cartera_", suffix=".csv.gz")
+        os.close(descriptor)
+        try:
+            with gzip.open(ruta, "wt", newline="") as destino:
+                filas = cartera.valorar_archivo(
+                    archivo, destino, cartera.detectar_formato(archivo.name), int(tamano_bloque), progreso
+                )
+        except (ValueError, KeyError) as error:
+            os.remove(ruta)
+            barra.empty()
+            st.error(f"No se pudo valorar el archivo: {error}")
+            return
+        
+        barra.progress(1.0, text=f"✅ {filas:,} posiciones valoradas")
+        st.session_state["masiva_resultado"] = {"ruta": ruta, "filas": filas, "nombre": archivo.name}
+    
+    resultado = st.session_state.get("masiva_resultado")
+    if resultado and os.path.exists(resultado["ruta"]):
+        nombre_base = os.path.splitext(resultado["nombre"])[0]
+        st.success(f"**{resultado['filas']:,}** posiciones de *{resultado['nombre']}* valoradas")
+        # El archivo solo se lee al pulsar el botón, en un hilo aparte
+        st.download_button(
+            "⬇️ Descargar Resultados (CSV comprimido)",
+            data=lambda: _leer_archivo(resultado["ruta"]),
+            file_name=f"{nombre_base}_valorado.csv.gz",
+            mime="application/gzip",
+        )
+
+def _errores_archivo():
+    """Errores esperables al leer y procesar un archivo subido: mal formado, no UTF-8 o Parquet dañado"""
+    # Importación diferida: pandas y pyarrow solo se cargan al procesar un archivo
+    import pandas as pd
+    import pyarrow as pa
+    
+    return (ValueError, KeyError, TypeError, pd.errors.ParserError, UnicodeDecodeError, pa.ArrowInvalid)
+
+def _facturas_ejemplo():
+    """Libro de ejemplo para el interés por mora (tasa vacía = tasa de mora general)"""
+    import pandas as pd
+    
+    hoy = datetime.date.today()
+    return pd.DataFrame({
+        "factura": ["F-001", "F-002", "F-003"],
+        "monto": [500.0, 1200.0, 800.0],
+        "vencimiento": [hoy - datetime.timedelta(days=15), hoy - datetime.timedelta(days=45), hoy + datetime.timedelta(days=10)],
+        "pago": [None, hoy - datetime.timedelta(days=5), None],
+        "tasa": [None, 0.18, None],
+    })
+
+FILAS_VISTA_MORA = 1000
+
+@st.fragment
+@instrumentar("seccion.mora")
+def seccion_mora():
+    """Interés por mora sobre un libro de facturas con convención de días"""
+    import cartera
+    import pandas as pd
+    
+    st.markdown("### 🧾 Interés por Mora de Facturas")
+    st.markdown("""
+    Edita el libro o sube un archivo **CSV** o **Parquet** con columnas **monto** y **vencimiento** *(obligatorias)*,
+    **pago** *(fecha de pago; vacía = pendiente a la fecha de corte)* y **tasa** *(anual en decimal; vacía = tasa de mora general)*.
+    """)
+    
+    col_datos, col_opciones = st.columns([2, 1])
+    
+    with col_opciones:
+        mora_corte = st.date_input("Fecha de Corte:", value=datetime.date.today(), min_value=FECHA_MIN, max_value=FECHA_MAX, key="mora_corte", persist_state="page")
+        mora_tasa = st.number_input("Tasa de Mora Anual (%):", min_value=0.0, value=24.0, step=1.0, key="mora_r", persist_state="page")
+        mora_convencion = st.selectbox("Convención de Días:", CONVENCIONES, index=1, key="mora_conv", persist_state="page")
+        archivo = st.file_uploader("Libro de facturas:", type=["csv", "parquet"], key="mora_archivo")
+    
+    with col_datos:
+        if archivo is not None:
+            aviso_archivo = st.empty()
+        else:
+            facturas = st.data_editor(
+                _facturas_ejemplo(),
+                num_rows="dynamic",
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    "monto": st.column_config.NumberColumn(format="dollar"),
+                    "vencimiento": st.column_config.DateColumn(),
+                    "pago": st.column_config.DateColumn(),
+                    "tasa": st.column_config.NumberColumn(format="percent"),
+                },
+                key="mora_editor",
+            )
+    
+    try:
+        # El archivo se lee aquí para que uno mal formado se informe como error y no rompa la sección
+        if archivo is not None:
+            formato = cartera.detectar_formato(archivo.name)
+            facturas = pd.read_parquet(archivo) if formato == "parquet" else pd.read_csv(archivo)
+            aviso_archivo.caption(f"*{archivo.name}*: {len(facturas):,} facturas")
+        # Las filas nuevas del editor llegan vacías
+        if "monto" in facturas.columns:
+            facturas = facturas.dropna(subset=["monto"])
+        resultado = cartera.valorar_mora(facturas, mora_corte, mora_tasa / 100, mora_convencion)
+    except _errores_archivo() as error:
+        st.error(f"No se pudo calcular la mora: {error}")
+        return
+    
+    vencidas = int((resultado["dias_mora"] > 0).sum())
+    col_m1, col_m2, col_m3 = st.columns(3)
+    col_m1.metric("📄 Facturas en Mora", f"{vencidas:,} de {len(resultado):,}")
+    col_m2.metric("💸 Interés por Mora", f"${resultado['interes_mora'].sum():,.2f}")
+    col_m3.metric("💰 Total a Cobrar", f"${resultado['total'].sum():,.2f}")
+    
+    if len(resultado) > FILAS_VISTA_MORA:
+        st.caption(f"Se muestran las primeras {FILAS_VISTA_MORA:,} facturas; la descarga incluye todas.")
+    st.dataframe(
+        resultado.head(FILAS_VISTA_MORA),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "monto": st.column_config.NumberColumn(format="dollar"),
+            "tasa": st.column_config.NumberColumn(format="percent"),
+            "fraccion_anual": st.column_config.NumberColumn(format="%.6f"),
+            "interes_mora": st.column_config.NumberColumn(format="dollar"),
+            "total": st.column_config.NumberColumn(format="dollar"),
+        },
+    )
+    st.download_button(
+        "⬇️ Descargar Libro con Mora (CSV)",
+        data=lambda: resultado.to_csv(index=False).encode("utf-8"),
+        file_name="interes_mora.csv",
+        mime="text/csv",
+        key="mora_descarga",
+    )
+
+def _flujos_ejemplo():
+    """Flujos de ejemplo: dos proyectos con fechas irregulares"""
+    import pandas as pd
+    
+    hoy = datetime.date.today()
+    return pd.DataFrame({
+        "proyecto": ["Planta solar"] * 4 + ["Local comercial"] * 3,
+        "fecha": [hoy, hoy + datetime.timedelta(days=200), hoy + datetime.timedelta(days=550), hoy + datetime.timedelta(days=900),
+                  hoy, hoy + datetime.timedelta(days=365), hoy + datetime.timedelta(days=730)],
+        "monto": [-50000.0, 12000.0, 25000.0, 30000.0, -20000.0, 11000.0, 11000.0],
+    })
+
+FILAS_VISTA_FLUJOS = 1000
+
+@st.fragment
+@instrumentar("seccion.flujos")
+def seccion_flujos():
+    """XVPN y XTIR de un lote de proyectos con flujos de caja fechados"""
+    import cartera
+    import flujos
+    import pandas as pd
+    
+    st.markdown("""
+    Edita los flujos o sube un archivo **CSV** o **Parquet** con una fila por flujo y columnas **proyecto**, **fecha** y
+    **monto** *(negativo para inversiones)*. Cada proyecto se descuenta desde su primera fecha.
+    """)
+    
+    col_datos, col_opciones = st.columns([2, 1])
+    
+    with col_opciones:
+        fl_tasa = st.number_input("Tasa de Descuento Anual (%):", value=8.0, step=0.5, key="fl_r", persist_state="page")
+        fl_convencion = st.selectbox("Convención de Días:", CONVENCIONES, index=1, key="fl_conv", persist_state="page")
+        archivo = st.file_uploader("Archivo de flujos:", type=["csv", "parquet"], key="fl_archivo")
+    
+    with col_datos:
+        if archivo is not None:
+            st.caption(f"*{archivo.name}*")
+        else:
+            datos = st.data_editor(
+                _flujos_ejemplo(),
+                num_rows="dynamic",
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    "fecha": st.column_config.DateColumn(),
+                    "monto": st.column_config.NumberColumn(format="dollar"),
+                },
+                key="fl_editor",
+            )
+    
+    def evaluar():
+        if archivo is not None:
+            formato = cartera.detectar_formato(archivo.name)
+            tabla = pd.read_parquet(archivo) if formato == "parquet" else pd.read_csv(archivo)
+        else:
+            # Las filas nuevas del editor llegan vacías
+            tabla = datos.dropna(subset=["monto"]) if "monto" in datos.columns else datos
+        return flujos.evaluar_flujos(tabla, fl_tasa / 100, fl_convencion)
+    
+    try:
+        with st.spinner("Evaluando proyectos..."):
+            if archivo is not None:
+                # Un archivo grande solo se lee y evalúa de nuevo si cambian el archivo o las opciones
+                resultado = retenido("flujos.resultado", (archivo.file_id, fl_tasa, fl_convencion), evaluar)
+            else:
+                resultado = evaluar()
+    except _errores_archivo() as error:
+        st.error(f"No se pudieron evaluar los flujos: {error}")
+        return
+    
+    sin_tir = int((~resultado["convergio"]).sum())
+    col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+    col_m1.metric("📁 Proyectos", f"{len(resultado):,}", help=f"{int(resultado['flujos'].sum()):,} flujos")
+    col_m2.metric("✅ Con XVPN Positivo", f"{int((resultado['xvpn'] > 0).sum()):,}")
+    col_m3.metric("💰 XVPN Total", f"${resultado['xvpn'].sum():,.2f}")
+    col_m4.metric("📈 XTIR Mediana", f"{resultado['xtir'].median():.2%}" if sin_tir < len(resultado) else "—")
+    if sin_tir:
+        st.warning(f"{sin_tir:,} proyectos sin XTIR: sus flujos no cambian de signo o la tasa queda fuera de "
+                   f"{flujos.TIR_MINIMA:.0%} a {flujos.TIR_MAXIMA:.0%}")
+    
+    if len(resultado) > FILAS_VISTA_FLUJOS:
+        st.caption(f"Se muestran los primeros {FILAS_VISTA_FLUJOS:,} proyectos; la descarga incluye todos.")
+    st.dataframe(
+        resultado.head(FILAS_VISTA_FLUJOS),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "invertido": st.column_config.NumberColumn(format="dollar"),
+            "recibido": st.column_config.NumberColumn(format="dollar"),
+            "xvpn": st.column_config.NumberColumn("XVPN", format="dollar"),
+            "xtir": st.column_config.NumberColumn("XTIR", format="percent"),
+        },
+    )
+    st.download_button(
+        "⬇️ Descargar Resultados (CSV)",
+        data=lambda: resultado.to_csv(index=False).encode("utf-8"),
+        file_name="flujos_evaluados.csv",
+        mime="text/csv",
+        key="fl_descarga",
+    )
+
+def _leer_archivo(ruta):
+    """Lee un archivo binario completo para servirlo como descarga"""
+    with open(ruta, "rb") as archivo:
+        return archivo.read()
+
+def _limpiar_archivo_temporal(clave):
+    """Elimina el archivo temporal guardado en la sesión bajo `clave`"""
+    resultado = st.session_state.pop(clave, None)
+    if resultado and os.path.exists(resultado["ruta"]):
+        os.remove(resultado["ruta"])
+
+# --- Perfilado ---
+
+def mostrar_perfilado(sesion, detalle):
+    """Panel de depuración con los tiempos de la ejecución y del registro compartido"""
+    datos = instrumentacion.instantanea()
+    st.caption(f"Sesión `{sesion}` · {datos['ejecuciones_por_sesion'].get(sesion, 0)} ejecuciones completas")
+    
+    st.markdown("**Última ejecución**")
+    orden = sorted(detalle, key=detalle.get, reverse=True)
+    st.dataframe(
+        {"Sección": orden, "ms": [detalle[nombre] * 1000 for nombre in orden]},
+        hide_index=True,
+        column_config={"ms": st.column_config.NumberColumn(format="%.2f")},
+    )
+    
+    st.markdown("**Acumulado (todas las sesiones)**")
+    secciones = datos["secciones"]
+    orden = sorted(secciones, key=lambda nombre: secciones[nombre]["segundos"], reverse=True)
+    st.dataframe(
+        {
+            "Sección": orden,
+            "Llamadas": [secciones[nombre]["llamadas"] for nombre in orden],
+            "Promedio ms": [secciones[nombre]["promedio_s"] * 1000 for nombre in orden],
+            "Máximo ms": [secciones[nombre]["maximo_s"] * 1000 for nombre in orden],
+        },
+        hide_index=True,
+        column_config={
+            "Promedio ms": st.column_config.NumberColumn(format="%.2f"),
+            "Máximo ms": st.column_config.NumberColumn(format="%.2f"),
+        },
+    )
+    
+    col_json, col_prom = st.columns(2)
+    with col_json:
+        st.download_button("⬇️ JSON", data=lambda: instrumentacion.a_json(datos), file_name="perfilado.json", mime="application/json", key="perfil_json")
+    with col_prom:
+        st.download_button("⬇️ Prometheus", data=lambda: instrumentacion.a_prometheus(datos), file_name="ariane.prom", mime="text/plain", key="perfil_prom")
+    st.button("🗑️ Reiniciar", on_click=instrumentacion.reiniciar, key="perfil_reiniciar")
+
+# --- Interfaz Principal ---
+st.markdown('<h1 class="main-header">💰 Calculadora Financiera Completa</h1>', unsafe_allow_html=True)
+st.markdown("---")
+
+# Actividad de la sesión; las sesiones inactivas liberan sus objetos y sus reportes
+for sesion_inactiva in memoria.tocar(_registro_memoria(), id_sesion()):
+    reportes.descartar_sesion(_cola_reportes(), sesion_inactiva)
+
+# --- SIDEBAR para navegación ---
+with st.sidebar:
+    st.image("https://via.placeholder.com/200x100/1f77b4/ffffff?text=Finanzas", width=200)
+    st.markdown("### 📊 Navegación")
+    
+    # Información contextual
+    with st.expander("ℹ️ Información"):
+        st.markdown("""
+        **Fórmulas utilizadas:**
+        
+        **Interés Simple:**
+        - VF = C(1 + rt)
+        - VP = VF/(1 + rt)
+        
+        **Interés Compuesto:**
+        - VF = C(1 + r/n)^(nt)
+        - VP = VF/(1 + r/n)^(nt)
+        """)
+    
+    # Estado de la caché compartida: solo se consulta (incluida la base de escenarios) con el panel abierto
+    panel_cache = st.expander("📦 Caché de Resultados", key="barra_cache", on_change="rerun")
+    with panel_cache:
+        if panel_cache.open:
+            estadisticas = resumen_cache()
+            if estadisticas:
+                for tipo, valores in estadisticas.items():
+                    st.markdown(f"**{ETIQUETAS_CACHE.get(tipo, tipo)}:** {valores['aciertos']} aciertos · {valores['fallos']} fallos")
+            else:
+                st.caption("Sin consultas todavía")
+            st.markdown(f"**Memoria de la sesión:** {memoria.uso(_registro_memoria()).get(id_sesion(), 0) / 2**20:,.1f} MB "
+                        f"de {memoria.PRESUPUESTO_BYTES / 2**20:,.0f} MB")
+            almacen = escenarios.estadisticas()
+            st.markdown(f"**Escenarios:** {almacen['escenarios']} guardados · {almacen['resultados']} resultados "
+                        f"({almacen['bytes'] / 1024:,.0f} KB, {almacen['usos']} usos)")
+    
+    # Reportes de esta sesión: solo se consulta su estado mientras haya alguno
+    if reportes.trabajos_sesion(_cola_reportes(), id_sesion()):
+        with st.expander("📤 Reportes", expanded=True):
+            panel_reportes()
+    
+    # Panel de depuración: se completa al final del script con los tiempos de esta ejecución
+    if instrumentacion.ACTIVA:
+        panel_perfilado = st.expander("🩺 Perfilado")
+
+# --- PESTAÑAS PRINCIPALES ---
+# on_change="rerun" hace que solo se ejecute el contenido de la pestaña abierta
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    "🧮 **Calculadora de Interés**",
+    "📊 **Análisis Comparativo**", 
+    "📚 **Ejemplos Prácticos**",
+    "📂 **Carga Masiva**",
+    "💸 **Flujos de Caja**"
+], key="pestana_principal", on_change="rerun")
+
+# === PESTAÑA 1: CALCULADORA DE INTERÉS ===
+with tab1:
+    if tab1.open:
+        with medir("pestana.calculadora"):
+            st.markdown('<h2 class="sub-header">Calculadora de Interés: Valor Futuro y Presente</h2>', unsafe_allow_html=True)
+        
+            # Sub-pestañas para diferentes tipos de cálculo
+            subtab1, subtab2, subtab3, subtab4, subtab5, subtab6, subtab7 = st.tabs([
+                "🚀 Interés Compuesto VF",
+                "🏦 Interés Compuesto VP", 
+                "📈 Interés Simple VF",
+                "💵 Interés Simple VP",
+                "📅 Tabla de Amortización",
+                "🎯 Tasa y Tiempo",
+                "📆 Por Fechas"
+            ], key="pestana_calculadora", on_change="rerun")
+        
+            # --- INTERÉS COMPUESTO VALOR FUTURO ---
+            with subtab1:
+                if subtab1.open:
+                    seccion_ic_vf()
+        
+            # --- INTERÉS COMPUESTO VALOR PRESENTE ---
+            with subtab2:
+                if subtab2.open:
+                    seccion_ic_vp()
+        
+            # --- INTERÉS SIMPLE VALOR FUTURO ---
+            with subtab3:
+                if subtab3.open:
+                    seccion_is_vf()
+        
+            # --- INTERÉS SIMPLE VALOR PRESENTE ---
+            with subtab4:
+                if subtab4.open:
+                    seccion_is_vp()
+        
+            # --- TABLA DE AMORTIZACIÓN ---
+            with subtab5:
+                if subtab5.open:
+                    seccion_amortizacion()
+        
+            # --- TASA IMPLÍCITA Y TIEMPO REQUERIDO ---
+            with subtab6:
+                if subtab6.open:
+                    seccion_tasa_tiempo()
+            
+            # --- CÁLCULO POR FECHAS ---
+            with subtab7:
+                if subtab7.open:
+                    seccion_fechas()
+
+# === PESTAÑA 2: ANÁLISIS COMPARATIVO ===
+with tab2:
+    if tab2.open:
+        with medir("pestana.comparacion"):
+            st.markdown('<h2 class="sub-header">Análisis Comparativo: Simple vs Compuesto</h2>', unsafe_allow_html=True)
+        
+            seccion_comparacion()
+            
+            st.markdown("---")
+            seccion_escenarios()
+            
+            st.markdown("---")
+            seccion_reportes()
+            
+            st.markdown("---")
+            seccion_sensibilidad()
+
+# === PESTAÑA 3: EJEMPLOS PRÁCTICOS ===
+with tab3:
+    if tab3.open:
+        with medir("pestana.ejemplos"):
+            st.markdown('<h2 class="sub-header">Ejemplos Prácticos y Casos de Uso</h2>', unsafe_allow_html=True)
+    
+            # Ejemplos basados en los documentos proporcionados
+            ejemplo_col1, ejemplo_col2 = st.columns(2)
+    
+            with ejemplo_col1:
+                st.markdown("### 🏭 Casos Empresariales")
+        
+                with st.expander("💼 Financiamiento de Inventario - Salsa de Tomate"):
+                    st.markdown("**Empresa necesita financiar materia prima**")
+                    st.markdown("""
+                    - **Capital:** $10,000
+                    - **Tasa:** 10% anual  
+                    - **Tiempo:** 3 meses
+                    - **Tipo:** Interés Simple
+                    """)
+            
+                    vf_ej1, int_ej1 = interes_simple_vf(10000, 0.10, 3, "Meses")
+                    st.success(f"**Interés a pagar:** ${int_ej1:.2f}")
+                    st.info(f"**Total a devolver:** ${vf_ej1:.2f}")
+        
+                with st.expander("👟 Importación de Tenis New Balance"):
+                    st.markdown("**Financiamiento para compra en EE.UU.**")
+                    st.markdown("""
+                    - **Capital:** $10,000
+                    - **Tasa:** 5% anual
+                    - **Tiempo:** 3 meses  
+                    - **Tipo:** Interés Simple
+                    """)
+            
+                    vf_ej2, int_ej2 = interes_simple_vf(10000, 0.05, 3, "Meses")
+                    st.success(f"**Costo de financiamiento:** ${int_ej2:.2f}")
+                    st.info(f"**Total a pagar:** ${vf_ej2:.2f}")
+        
+                with st.expander("📄 Cuentas por Cobrar - Interés por Mora"):
+                    st.markdown("**Interés sobre facturas vencidas**")
+                    st.markdown("""
+                    - **Factura:** $500
+                    - **Tasa:** 2% mensual
+                    - **Retraso:** 15 días
+                    - **Tipo:** Interés Simple
+                    """)
+            
+                    vf_ej3, int_ej3 = interes_simple_vf(500, 0.02, 15, "Días")
+                    st.success(f"**Interés por mora:** ${int_ej3:.2f}")
+                    st.info(f"**Total a cobrar:** ${vf_ej3:.2f}")
+    
+            with ejemplo_col2:
+                st.markdown("### 💰 Casos de Inversión")
+        
+                with st.expander("📈 Ahorros para Expansión - Interés Compuesto"):
+                    st.markdown("**Inversión a largo plazo para crecimiento**")
+                    st.markdown("""
+                    - **Inversión:** $10,000
+                    - **Tasa:** 8% anual
+                    - **Tiempo:** 5 años
+                    - **Capitalización:** Anual
+                    """)
+            
+                    vf_ej4, int_ej4 = interes_compuesto_vf(10000, 0.08, 5, "Anual")
+                    st.success(f"**Valor final:** ${vf_ej4:.2f}")
+                    st.info(f"**Ganancia total:** ${int_ej4:.2f}")
+        
+                with st.expander("🏦 Préstamo para Crecimiento"):
+                    st.markdown("**Préstamo con interés compuesto**")
+                    st.markdown("""
+                    - **Préstamo:** $20,000
+                    - **Tasa:** 5% anual
+                    - **Tiempo:** 3 años
+                    - **Capitalización:** Anual
+                    """)
+            
+                    vf_ej5, int_ej5 = interes_compuesto_vf(20000, 0.05, 3, "Anual")
+                    st.warning(f"**Total a pagar:** ${vf_ej5:.2f}")
+                    st.error(f"**Interés total:** ${int_ej5:.2f}")
+                
+                    # Acumulación año a año hasta el pago al vencimiento
+                    import amortizacion
+                    import pandas as pd
+                
+                    st.dataframe(pd.DataFrame(amortizacion.tabla_amortizacion(20000, 0.05, 3, "Anual", tipo="acumulacion")), hide_index=True)
+        
+                with st.expander("💡 Valor Presente - Planificación"):
+                    st.markdown("**¿Cuánto invertir hoy para tener $20,000 en 2 años?**")
+                    st.markdown("""
+                    - **Objetivo:** $20,000
+                    - **Tasa:** 6% anual
+                    - **Tiempo:** 2 años
+                    - **Tipo:** Interés Compuesto
+                    """)
+            
+                    vp_ej6, _ = interes_compuesto_vp(20000, 0.06, 2, "Anual")
+                    st.success(f"**Inversión necesaria hoy:** ${vp_ej6:.2f}")
+    
+            # Calculadora rápida integrada
+            seccion_calculadora_rapida()
+
+# === PESTAÑA 4: CARGA MASIVA ===
+with tab4:
+    if tab4.open:
+        with medir("pestana.carga_masiva"):
+            st.markdown('<h2 class="sub-header">Carga Masiva: Valoración de Carteras</h2>', unsafe_allow_html=True)
+        
+            seccion_carga_masiva()
+            
+            st.markdown("---")
+            seccion_mora()
+
+# === PESTAÑA 5: FLUJOS DE CAJA ===
+with tab5:
+    if tab5.open:
+        with medir("pestana.flujos"):
+            st.markdown('<h2 class="sub-header">Flujos de Caja: VPN y TIR de Proyectos</h2>', unsafe_allow_html=True)
+        
+            seccion_flujos()
+
 # --- FOOTER ---
 st.markdown("---")
 st.markdown("""
@@ -547,3 +1633,11 @@ st.markdown("""
     <p><em>Herramienta educativa para cálculos de interés simple y compuesto</em></p>
 </div>
 """, unsafe_allow_html=True)
+
+# --- PERFILADO ---
+if instrumentacion.ACTIVA:
+    sesion = id_sesion()
+    detalle = instrumentacion.finalizar_ejecucion(sesion)
+    instrumentacion.exportar()
+    with panel_perfilado:
+        mostrar_perfilado(sesion, detalle)
@@ -0,0 +1,146 @@
+"""Prueba de carga del servicio HTTP de cálculos.
+
+Abre conexiones concurrentes con keep-alive, envía solicitudes variadas a una
+ruta y reporta las latencias p50/p90/p99 y las solicitudes por segundo.
+
+Uso:
+    python benchmarks/carga_api.py [--url http://127.0.0.1:8502] [--ruta /interes_compuesto_vf]
+        [--conexiones 64] [--solicitudes 20000] [--salida carga.json]
+
+Sin ``--url`` arranca un servicio local en un puerto libre durante la prueba.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CAPITALIZACIONES = ("Anual", "Semestral", "Trimestral", "Mensual", "Diario")
+UNIDADES = ("Años", "Meses", "Días")
+
+def cuerpo_aleatorio(ruta, aleatorio):
+    """Cuerpo JSON de una solicitud realista para `ruta`"""
+    if ruta == "/series_comparacion":
+        datos = {"capital": aleatorio.choice((5000, 10000, 25000)), "tasa": aleatorio.choice((0.05, 0.08)),
+                 "tiempo_max": aleatorio.randint(5, 30), "capitalizacion": aleatorio.choice(CAPITALIZACIONES[:4])}
+    else:
+        monto = "capital" if ruta.endswith("_vf") else "valor_futuro"
+        datos = {monto: round(aleatorio.uniform(100, 1e6), 2), "tasa_anual": round(aleatorio.uniform(0.01, 0.2), 4),
+                 "tiempo": round(aleatorio.uniform(0.5, 30), 1), "unidad_tiempo": aleatorio.choice(UNIDADES)}
+        if "compuesto" in ruta:
+            datos["capitalizacion"] = aleatorio.choice(CAPITALIZACIONES)
+    return json.dumps(datos).encode()
+
+async def cliente(host, puerto, ruta, cuotas, latencias, errores, semilla):
+    """Una conexión keep-alive que envía solicitudes mientras queden en `cuotas`"""
+    aleatorio = random.Random(semilla)
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while cuotas["restantes"] > 0:
+            cuotas["restantes"] -= 1
+            cuerpo = cuerpo_aleatorio(ruta, aleatorio)
+            inicio = time.perf_counter()
+            escritor.write(
+                f"POST {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo
+            )
+            await escritor.drain()
+            estado = int((await lector.readline()).split()[1])
+            longitud = 0
+            while (linea := await lector.readline()) not in (b"\r\n", b""):
+                if linea.lower().startswith(b"content-length:"):
+                    longitud = int(linea.split(b":")[1])
+            await lector.readexactly(longitud)
+            latencias.append(time.perf_counter() - inicio)
+            if estado != 200:
+                errores.append(estado)
+    finally:
+        escritor.close()
+
+async def probar(host, puerto, ruta, conexiones, solicitudes):
+    """Ejecuta la prueba y devuelve el informe de latencias y rendimiento"""
+    cuotas = {"restantes": solicitudes}
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        cliente(host, puerto, ruta, cuotas, latencias, errores, semilla) for semilla in range(conexiones)
+    ))
+    duracion = time.perf_counter() - inicio
+
+    cuantiles = statistics.quantiles(latencias, n=100, method="inclusive")
+    return {
+        "ruta": ruta,
+        "conexiones": conexiones,
+        "solicitudes": len(latencias),
+        "errores": len(errores),
+        "duracion_s": duracion,
+        "solicitudes_por_s": len(latencias) / duracion,
+        "p50_ms": cuantiles[49] * 1000,
+        "p90_ms": cuantiles[89] * 1000,
+        "p99_ms": cuantiles[98] * 1000,
+        "max_ms": max(latencias) * 1000,
+    }
+
+def iniciar_servicio():
+    """Arranca `python -m ariane serve` en un puerto libre y devuelve (proceso, puerto)"""
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        puerto = sock.getsockname()[1]
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "ariane", "serve", "--puerto", str(puerto)],
+        cwd=RAIZ, stderr=subprocess.PIPE, text=True,
+    )
+    # El servicio avisa por stderr cuando ya escucha
+    linea = proceso.stderr.readline()
+    if "Sirviendo" not in linea:
+        proceso.kill()
+        raise RuntimeError(f"El servicio no arrancó: {linea.strip()}")
+    return proceso, puerto
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio HTTP de cálculos.")
+    parser.add_argument("--url", default=None, help="servicio ya en marcha (por defecto se arranca uno local)")
+    parser.add_argument("--ruta", default="/interes_compuesto_vf", help="ruta a probar")
+    parser.add_argument("--conexiones", type=int, default=64, help="conexiones concurrentes (por defecto 64)")
+    parser.add_argument("--solicitudes", type=int, default=20000, help="solicitudes totales (por defecto 20000)")
+    parser.add_argument("--salida", default=None, help="guarda el informe en este archivo JSON")
+    args = parser.parse_args(argv)
+
+    proceso = None
+    if args.url:
+        direccion = urlsplit(args.url)
+        host, puerto = direccion.hostname, direccion.port or 80
+    else:
+        proceso, puerto = iniciar_servicio()
+        host = "127.0.0.1"
+
+    try:
+        informe = asyncio.run(probar(host, puerto, args.ruta, args.conexiones, args.solicitudes))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    print(f"{informe['solicitudes']:,} solicitudes a {informe['ruta']} con {informe['conexiones']} conexiones "
+          f"({informe['errores']} errores) en {informe['duracion_s']:.2f} s")
+    print(f"{informe['solicitudes_por_s']:,.0f} solicitudes/s · p50 {informe['p50_ms']:.2f} ms · "
+          f"p90 {informe['p90_ms']:.2f} ms · p99 {informe['p99_ms']:.2f} ms · máx {informe['max_ms']:.2f} ms")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+            archivo.write("\n")
+    return 1 if informe["errores"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Prueba de carga con sesiones concurrentes de la aplicación.
+
+Simula N sesiones sin navegador (``AppTest`` de Streamlit) en un mismo
+proceso, como en un servidor real: comparten las cachés y cada una cambia de
+pestaña y modifica widgets de forma realista, con una pausa entre acciones.
+Por cada nivel de carga reporta las latencias p50/p90/p99 de los reruns, el
+tiempo de CPU medio por rerun y la memoria residente por sesión.
+
+``AppTest`` instala un runtime global durante cada ejecución, así que los
+reruns de las sesiones se ejecutan de uno en uno; la latencia incluye la
+espera detrás de las demás sesiones, como en un servidor limitado por el GIL.
+
+Uso:
+    python benchmarks/carga_sesiones.py [--sesiones 1,4,16] [--interacciones 30]
+        [--pausa-ms 100] [--presupuesto-mb 64] [--inactividad-s 5] [--salida sesiones.json]
+
+Cada nivel se mide en un proceso nuevo para que la memoria de un nivel no
+contamine el siguiente. La memoria por sesión es la diferencia de memoria
+residente frente a una sesión de calentamiento, repartida entre las sesiones;
+incluye la copia del árbol de elementos que guarda el cliente de pruebas, así
+que es una cota superior del coste en el servidor. Con ``--inactividad-s``,
+tras las interacciones se espera ese tiempo y se vuelve a medir la memoria
+cuando el presupuesto por sesión ya liberó los objetos de las sesiones inactivas.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Acciones de cada pestaña: (tipo de widget, clave, valores posibles)
+ACCIONES = {
+    "🧮 **Calculadora de Interés**": [
+        ("number_input", "ic_vf_c", [5000.0, 10000.0, 25000.0, 50000.0]),
+        ("number_input", "ic_vf_t", [2.5, 5.0, 10.0, 30.0]),
+        ("selectbox", "ic_vf_cap", ["Anual", "Mensual", "Diario", "Trimestral"]),
+    ],
+    "📊 **Análisis Comparativo**": [
+        ("number_input", "comp_c", [5000.0, 10000.0, 25000.0]),
+        ("slider", "comp_t", [5, 10, 15, 20]),
+        ("selectbox", "comp_cap", ["Anual", "Semestral", "Mensual"]),
+        ("toggle", "comp_completa", [True, False]),
+        ("number_input", "sens_monto", [5000.0, 10000.0, 20000.0]),
+        ("selectbox", "sens_cap", ["Anual", "Mensual", "Diario"]),
+    ],
+    "📚 **Ejemplos Prácticos**": [
+        ("number_input", "calc_c", [1000.0, 5000.0, 8000.0]),
+        ("number_input", "calc_t", [1.0, 2.0, 5.0]),
+    ],
+    "💸 **Flujos de Caja**": [
+        ("number_input", "fl_r", [6.0, 8.0, 12.0]),
+        ("selectbox", "fl_conv", ["Actual/365", "Actual/Actual", "30/360"]),
+    ],
+}
+PROBABILIDAD_CAMBIO_PESTANA = 0.2
+
+# AppTest no admite ejecuciones simultáneas en un proceso
+_CERROJO_APPTEST = threading.Lock()
+
+def memoria_residente():
+    """Memoria residente del proceso en bytes"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as estado:
+            for linea in estado:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def tiempo_cpu():
+    """Tiempo de CPU del proceso (usuario + sistema) en segundos"""
+    tiempos = os.times()
+    return tiempos.user + tiempos.system
+
+def nueva_sesion():
+    """Abre una sesión sin navegador y ejecuta el script por primera vez"""
+    from streamlit.testing.v1 import AppTest
+
+    with _CERROJO_APPTEST:
+        return AppTest.from_file(os.path.join(RAIZ, "ariane.py"), default_timeout=120).run()
+
+def interactuar(app, pestana, aleatorio):
+    """Aplica una acción realista y devuelve la pestaña abierta después"""
+    if aleatorio.random() < PROBABILIDAD_CAMBIO_PESTANA:
+        pestana = aleatorio.choice([otra for otra in ACCIONES if otra != pestana])
+        with _CERROJO_APPTEST:
+            app.session_state["pestana_principal"] = pestana
+            app.run()
+        return pestana
+    # Algunos widgets solo existen con ciertas opciones: se prueba otra acción
+    with _CERROJO_APPTEST:
+        for tipo, clave, valores in aleatorio.sample(ACCIONES[pestana], len(ACCIONES[pestana])):
+            try:
+                widget = getattr(app, tipo)(key=clave)
+            except KeyError:
+                continue
+            widget.set_value(aleatorio.choice(valores)).run()
+            return pestana
+        app.run()
+    return pestana
+
+def simular_sesion(semilla, interacciones, pausa, latencias, errores, sesiones, inicio):
+    """Una sesión: se abre, espera a las demás y encadena interacciones con pausas"""
+    aleatorio = random.Random(semilla)
+    app = nueva_sesion()
+    sesiones.append(app)
+    inicio.wait()
+    pestana = next(iter(ACCIONES))
+    for _ in range(interacciones):
+        time.sleep(aleatorio.expovariate(1 / pausa) if pausa else 0)
+        comienzo = time.perf_counter()
+        try:
+            pestana = interactuar(app, pestana, aleatorio)
+        except Exception as error:  # se cuenta como error y la sesión sigue
+            errores.append(f"{type(error).__name__}: {error}")
+            continue
+        latencias.append(time.perf_counter() - comienzo)
+        if app.exception:
+            errores.append(app.exception[0].message)
+
+def medir_nivel(sesiones, interacciones, pausa, inactividad=None):
+    """Mide un nivel de carga en este proceso y devuelve el informe"""
+    # Calentamiento: importaciones y cachés compartidas antes de la memoria base
+    calentamiento = nueva_sesion()
+    for pestana in ACCIONES:
+        calentamiento.session_state["pestana_principal"] = pestana
+        with _CERROJO_APPTEST:
+            calentamiento.run()
+    del calentamiento
+    gc.collect()
+    base = memoria_residente()
+
+    latencias, errores, abiertas = [], [], []
+    inicio = threading.Barrier(sesiones + 1)
+    hilos = [
+        threading.Thread(target=simular_sesion, args=(semilla, interacciones, pausa, latencias, errores, abiertas, inicio))
+        for semilla in range(sesiones)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    inicio.wait()
+    cpu = tiempo_cpu()
+    comienzo = time.perf_counter()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - comienzo
+    cpu = tiempo_cpu() - cpu
+    gc.collect()
+    residente = memoria_residente()
+
+    cuantiles = statistics.quantiles(latencias, n=100, method="inclusive") if len(latencias) > 1 else latencias * 99
+    informe = {
+        "sesiones": sesiones,
+        "reruns": len(latencias),
+        "errores": len(errores),
+        "duracion_s": duracion,
+        "p50_ms": cuantiles[49] * 1000,
+        "p90_ms": cuantiles[89] * 1000,
+        "p99_ms": cuantiles[98] * 1000,
+        "max_ms": max(latencias) * 1000,
+        "cpu_ms_por_rerun": cpu / len(latencias) * 1000,
+        "rss_base_mb": base / 2**20,
+        "rss_mb": residente / 2**20,
+        "rss_por_sesion_mb": (residente - base) / sesiones / 2**20,
+    }
+
+    if inactividad is not None:
+        # Tras la inactividad, un rerun de una sesión dispara la liberación de las demás
+        time.sleep(inactividad + 0.5)
+        with _CERROJO_APPTEST:
+            abiertas[0].run()
+        gc.collect()
+        informe["rss_tras_inactividad_mb"] = memoria_residente() / 2**20
+    if errores:
+        informe["primer_error"] = errores[0]
+    return informe
+
+def medir_en_proceso(sesiones, args):
+    """Ejecuta un nivel en un proceso nuevo y devuelve su informe"""
+    entorno = dict(os.environ)
+    if args.presupuesto_mb is not None:
+        entorno["ARIANE_MEMORIA_SESION_MB"] = str(args.presupuesto_mb)
+    if args.inactividad_s is not None:
+        entorno["ARIANE_INACTIVIDAD_SESION_S"] = str(args.inactividad_s)
+    comando = [sys.executable, os.path.abspath(__file__), "--nivel", str(sesiones),
+               "--interacciones", str(args.interacciones), "--pausa-ms", str(args.pausa_ms)]
+    if args.inactividad_s is not None:
+        comando += ["--inactividad-s", str(args.inactividad_s)]
+    # Los avisos de Streamlit van a stderr: solo se muestran si el nivel falla
+    proceso = subprocess.run(comando, cwd=RAIZ, env=entorno, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"El nivel de {sesiones} sesiones falló:\n{proceso.stderr[-2000:]}")
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes de la aplicación.")
+    parser.add_argument("--sesiones", default="1,4,16", help="niveles de sesiones concurrentes (por defecto 1,4,16)")
+    parser.add_argument("--interacciones", type=int, default=30, help="interacciones por sesión (por defecto 30)")
+    parser.add_argument("--pausa-ms", type=float, default=100, help="pausa media entre interacciones (por defecto 100)")
+    parser.add_argument("--presupuesto-mb", type=float, default=None, help="presupuesto de memoria por sesión de la aplicación")
+    parser.add_argument("--inactividad-s", type=float, default=None, help="inactividad tras la que se liberan los objetos de una sesión")
+    parser.add_argument("--salida", default=None, help="guarda los informes en este archivo JSON")
+    parser.add_argument("--nivel", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.nivel is not None:
+        sys.path.insert(0, RAIZ)
+        informe = medir_nivel(args.nivel, args.interacciones, args.pausa_ms / 1000, args.inactividad_s)
+        print(json.dumps(informe))
+        return 0
+
+    informes = []
+    for sesiones in (int(nivel) for nivel in args.sesiones.split(",")):
+        informe = medir_en_proceso(sesiones, args)
+        informes.append(informe)
+        linea = (f"{sesiones:>4} sesiones · {informe['reruns']:,} reruns ({informe['errores']} errores) · "
+                 f"p50 {informe['p50_ms']:.0f} ms · p90 {informe['p90_ms']:.0f} ms · p99 {informe['p99_ms']:.0f} ms · "
+                 f"CPU {informe['cpu_ms_por_rerun']:.1f} ms/rerun · {informe['rss_por_sesion_mb']:.1f} MB/sesión")
+        if "rss_tras_inactividad_mb" in informe:
+            linea += f" · RSS {informe['rss_mb']:.0f} → {informe['rss_tras_inactividad_mb']:.0f} MB tras inactividad"
+        print(linea, flush=True)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informes, archivo, indent=2, ensure_ascii=False)
+            archivo.write("\n")
+    return 1 if any(informe["errores"] for informe in informes) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Suite de rendimiento de la Calculadora Financiera.
+
+Mide cinco niveles y guarda los resultados en JSON:
+
+1. ``escalar``: llamadas individuales a las cuatro funciones ``interes_*``.
+2. ``lote``: valoración vectorizada de arreglos grandes.
+3. ``grafico``: ``crear_grafico_comparacion`` en distintos horizontes.
+4. ``flujos``: VPN y TIR de un libro de proyectos con flujos fechados.
+5. ``app``: re-ejecuciones completas de ``ariane.py`` con el arnés de pruebas
+   de Streamlit (``AppTest``) y cambios de widgets realistas.
+
+Uso:
+    python benchmarks/rendimiento.py [--salida resultados.json]
+        [--linea-base benchmarks/linea_base.json] [--umbral 0.25]
+        [--niveles escalar lote grafico flujos app] [--guardar-linea-base]
+
+Con ``--linea-base`` compara cada medición con la almacenada y termina con
+código 1 si alguna es más lenta que ``1 + umbral`` veces la línea base. La
+línea base solo es comparable en la misma máquina: regenérela con
+``--guardar-linea-base`` al cambiar de equipo.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from calculos import (  # noqa: E402
+    FRECUENCIAS,
+    interes_simple_vf,
+    interes_simple_vp,
+    interes_compuesto_vf,
+    interes_compuesto_vp,
+    interes_simple_vf_lote,
+    interes_compuesto_vf_lote,
+    interes_compuesto_vp_lote,
+)
+
+NIVELES = ("escalar", "lote", "grafico", "flujos", "app")
+LINEA_BASE = os.path.join(RAIZ, "benchmarks", "linea_base.json")
+UMBRAL = 0.25
+
+def medir(funcion, repeticiones=15, llamadas=1):
+    """Ejecuta `funcion` y devuelve la mediana y el mínimo de segundos por llamada"""
+    funcion()  # calentamiento: importaciones diferidas y cachés de CPU
+    tiempos = []
+    # Como timeit, sin recolector de basura durante la medición
+    recolector_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            for _ in range(llamadas):
+                funcion()
+            tiempos.append((time.perf_counter() - inicio) / llamadas)
+    finally:
+        if recolector_activo:
+            gc.enable()
+    return {"mediana_s": statistics.median(tiempos), "minimo_s": min(tiempos), "repeticiones": repeticiones}
+
+def nivel_escalar():
+    """Llamadas escalares a las cuatro funciones de interés"""
+    casos = {
+        "interes_simple_vf": lambda: interes_simple_vf(10000.0, 0.08, 18, "Meses"),
+        "interes_simple_vp": lambda: interes_simple_vp(15000.0, 0.08, 5),
+        "interes_compuesto_vf": lambda: interes_compuesto_vf(10000.0, 0.08, 5, "Mensual"),
+        "interes_compuesto_vp": lambda: interes_compuesto_vp(15000.0, 0.08, 90, "Diario", "Días"),
+    }
+    return {f"escalar.{nombre}": medir(caso, llamadas=20000) for nombre, caso in casos.items()}
+
+def nivel_lote(tamano=1_000_000):
+    """Valoración vectorizada de `tamano` posiciones con parámetros mezclados"""
+    rng = np.random.default_rng(0)
+    capital = rng.uniform(100, 1e6, tamano)
+    tasa = rng.uniform(0.01, 0.25, tamano)
+    tiempo = rng.uniform(0.1, 30, tamano)
+    capitalizacion = rng.choice(list(FRECUENCIAS), tamano)
+    unidad = rng.choice(["Años", "Meses", "Días"], tamano)
+    return {
+        f"lote.simple_vf_{tamano}": medir(lambda: interes_simple_vf_lote(capital, tasa, tiempo, unidad)),
+        f"lote.compuesto_vf_{tamano}": medir(lambda: interes_compuesto_vf_lote(capital, tasa, tiempo, capitalizacion, unidad)),
+        f"lote.compuesto_vp_{tamano}_anual": medir(lambda: interes_compuesto_vp_lote(capital, tasa, tiempo, "Anual")),
+    }
+
+def nivel_grafico():
+    """Construcción y serialización del gráfico comparativo en varios horizontes"""
+    from graficos import crear_grafico_comparacion
+
+    casos = {"10a_anual": (10, "Anual"), "20a_anual": (20, "Anual"), "100a_mensual": (100, "Mensual"), "100a_diaria": (100, "Diaria")}
+    resultados = {}
+    for nombre, (anos, resolucion) in casos.items():
+        resultados[f"grafico.crear_{nombre}"] = medir(
+            lambda: crear_grafico_comparacion(10000.0, 0.08, anos, "Mensual", resolucion)
+        )
+        figura = crear_grafico_comparacion(10000.0, 0.08, anos, "Mensual", resolucion)
+        resultados[f"grafico.to_json_{nombre}"] = medir(figura.to_json)
+    return resultados
+
+def nivel_flujos(proyectos=10_000, flujos=360):
+    """VPN, XVPN, TIR y XTIR de `proyectos` proyectos con hasta `flujos` flujos cada uno"""
+    from flujos import aplanar, tiempos_fechas, tir_lote, tir_plano, vpn_lote, vpn_plano
+
+    rng = np.random.default_rng(0)
+    montos = rng.uniform(50, 150, (proyectos, flujos))
+    montos[:, 0] = -rng.uniform(5_000, 30_000, proyectos)
+    # Proyectos de largo variable: la matriz queda rellena con NaN
+    largos = rng.integers(2, flujos + 1, proyectos)
+    montos[np.arange(flujos) >= largos[:, None]] = np.nan
+    fechas = np.datetime64("2024-01-01") + np.cumsum(rng.integers(1, 40, (proyectos, flujos)), axis=1).astype("timedelta64[D]")
+    planos, fechas_planas, indptr = aplanar(montos, fechas)
+    tiempos = tiempos_fechas(fechas_planas, indptr)
+    sufijo = f"{proyectos}x{flujos}"
+    return {
+        f"flujos.vpn_{sufijo}": medir(lambda: vpn_lote(0.01, montos), repeticiones=5),
+        f"flujos.xvpn_{sufijo}": medir(lambda: vpn_plano(0.08, planos, tiempos_fechas(fechas_planas, indptr), indptr), repeticiones=5),
+        f"flujos.tir_{sufijo}": medir(lambda: tir_lote(montos), repeticiones=3),
+        f"flujos.xtir_{sufijo}": medir(lambda: tir_plano(planos, tiempos, indptr), repeticiones=3),
+    }
+
+def nivel_app(repeticiones=15):
+    """Re-ejecuciones completas de ariane.py en AppTest con cambios de widgets"""
+    from streamlit.testing.v1 import AppTest
+
+    def nueva_app():
+        return AppTest.from_file(os.path.join(RAIZ, "ariane.py"), default_timeout=60).run()
+
+    resultados = {"app.primera_ejecucion": medir(nueva_app, repeticiones=5)}
+
+    # Interacciones típicas en la pestaña abierta por defecto
+    app = nueva_app()
+    interacciones = {
+        "capital": ("number_input", "ic_vf_c", [10000.0, 25000.0, 50000.0, 7500.0]),
+        "tiempo": ("number_input", "ic_vf_t", [5.0, 10.0, 2.5, 30.0]),
+        "capitalizacion": ("selectbox", "ic_vf_cap", ["Anual", "Mensual", "Diario", "Trimestral"]),
+    }
+    for nombre, (tipo, clave, valores) in interacciones.items():
+        estado = {"i": 0}
+
+        def cambiar():
+            widget = getattr(app, tipo)(key=clave)
+            widget.set_value(valores[estado["i"] % len(valores)]).run()
+            estado["i"] += 1
+
+        resultados[f"app.rerun_{nombre}"] = medir(cambiar, repeticiones=repeticiones)
+    return resultados
+
+def comparar(resultados, linea_base, umbral):
+    """Devuelve las mediciones que superan la línea base en más de `umbral`.
+
+    Se compara el tiempo mínimo, el estimador menos sensible al ruido de la máquina.
+    """
+    regresiones = []
+    for nombre, medicion in resultados.items():
+        base = linea_base.get("resultados", {}).get(nombre)
+        if base is None:
+            continue
+        razon = medicion["minimo_s"] / base["minimo_s"]
+        medicion["razon_linea_base"] = razon
+        if razon > 1 + umbral:
+            regresiones.append((nombre, razon))
+    return regresiones
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de la Calculadora Financiera.")
+    parser.add_argument("--salida", default=os.path.join(RAIZ, "benchmarks", "resultados.json"), help="archivo JSON de resultados")
+    parser.add_argument("--linea-base", default=None, help=f"JSON de referencia para comparar (p. ej. {os.path.relpath(LINEA_BASE, RAIZ)})")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help=f"regresión tolerada como fracción (por defecto {UMBRAL})")
+    parser.add_argument("--niveles", nargs="+", choices=NIVELES, default=list(NIVELES), help="niveles a ejecutar")
+    parser.add_argument("--guardar-linea-base", action="store_true", help="guarda también los resultados como nueva línea base")
+    args = parser.parse_args(argv)
+
+    funciones = {"escalar": nivel_escalar, "lote": nivel_lote, "grafico": nivel_grafico, "flujos": nivel_flujos, "app": nivel_app}
+    resultados = {}
+    for nivel in args.niveles:
+        print(f"Nivel {nivel}...", file=sys.stderr)
+        resultados.update(funciones[nivel]())
+
+    informe = {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+        },
+        "resultados": resultados,
+    }
+
+    regresiones = []
+    if args.linea_base:
+        with open(args.linea_base, encoding="utf-8") as archivo:
+            regresiones = comparar(resultados, json.load(archivo), args.umbral)
+
+    destinos = [args.salida] + ([LINEA_BASE] if args.guardar_linea_base else [])
+    for destino in destinos:
+        with open(destino, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+            archivo.write("\n")
+
+    for nombre, medicion in resultados.items():
+        razon = medicion.get("razon_linea_base")
+        comparacion = f"  ({razon:.2f}x línea base)" if razon is not None else ""
+        print(f"{nombre:<40} {medicion['mediana_s'] * 1000:>12.4f} ms{comparacion}")
+
+    if regresiones:
+        print(f"\nRegresiones por encima del {args.umbral:.0%}:", file=sys.stderr)
+        for nombre, razon in regresiones:
+            print(f"  {nombre}: {razon:.2f}x", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
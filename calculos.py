@@ -0,0 +1,294 @@
+"""Núcleo de cálculo de la Calculadora Financiera.
+
+Solo depende de NumPy para poder importarse desde procesos de trabajo sin
+arrancar Streamlit ni cargar las bibliotecas de gráficos.
+"""
+
+import numpy as np
+
+# Frecuencias de capitalización y divisores para convertir el tiempo a años
+FRECUENCIAS = {"Anual": 1, "Semestral": 2, "Trimestral": 4, "Mensual": 12, "Diario": 365}
+DIVISORES_TIEMPO = {"Años": 1, "Meses": 12, "Días": 365}
+
+def interes_simple_vf(capital, tasa_anual, tiempo, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro con Interés Simple"""
+    # Convertir tiempo a años
+    tiempo_anos = tiempo / DIVISORES_TIEMPO.get(unidad_tiempo, 1)
+    
+    # VF = C(1 + rt)
+    valor_futuro = capital * (1 + tasa_anual * tiempo_anos)
+    interes_ganado = valor_futuro - capital
+    return valor_futuro, interes_ganado
+
+def interes_simple_vp(valor_futuro, tasa_anual, tiempo, unidad_tiempo="Años"):
+    """Calcula el Valor Presente con Interés Simple"""
+    # Convertir tiempo a años
+    tiempo_anos = tiempo / DIVISORES_TIEMPO.get(unidad_tiempo, 1)
+    
+    # VP = VF / (1 + rt)
+    valor_presente = valor_futuro / (1 + tasa_anual * tiempo_anos)
+    interes_total = valor_futuro - valor_presente
+    return valor_presente, interes_total
+
+def interes_compuesto_vf(capital, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro con Interés Compuesto"""
+    # Convertir tiempo a años
+    tiempo_anos = tiempo / DIVISORES_TIEMPO.get(unidad_tiempo, 1)
+    
+    # Frecuencia de capitalización
+    n = FRECUENCIAS[capitalizacion]
+    
+    # VF = C(1 + r/n)^(nt)
+    valor_futuro = capital * (1 + tasa_anual/n)**(n * tiempo_anos)
+    interes_ganado = valor_futuro - capital
+    return valor_futuro, interes_ganado
+
+def interes_compuesto_vp(valor_futuro, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años"):
+    """Calcula el Valor Presente con Interés Compuesto"""
+    # Convertir tiempo a años
+    tiempo_anos = tiempo / DIVISORES_TIEMPO.get(unidad_tiempo, 1)
+    
+    # Frecuencia de capitalización
+    n = FRECUENCIAS[capitalizacion]
+    
+    # VP = VF / (1 + r/n)^(nt)
+    valor_presente = valor_futuro / (1 + tasa_anual/n)**(n * tiempo_anos)
+    interes_total = valor_futuro - valor_presente
+    return valor_presente, interes_total
+
+# --- Versiones por Lote (NumPy) ---
+
+def _mapear_etiquetas(etiquetas, mapa, defecto=None):
+    """Traduce etiquetas (escalar, arreglo o Series) a valores numéricos sin iterar por fila"""
+    if isinstance(etiquetas, str):
+        return float(mapa[etiquetas] if defecto is None else mapa.get(etiquetas, defecto))
+    
+    etiquetas = np.asarray(etiquetas)
+    # Si ya vienen como números (p. ej. n = 12) se usan directamente
+    if etiquetas.dtype.kind in "iuf":
+        return etiquetas.astype(float)
+    
+    # Solo se consulta el diccionario una vez por etiqueta distinta
+    claves, inverso = np.unique(etiquetas, return_inverse=True)
+    tabla = np.array([mapa[k] if defecto is None else mapa.get(k, defecto) for k in claves], dtype=float)
+    return tabla[inverso].reshape(etiquetas.shape)
+
+def _tiempo_en_anos_lote(tiempo, unidad_tiempo):
+    """Convierte un arreglo de tiempos a años según su unidad"""
+    return np.asarray(tiempo, dtype=float) / _mapear_etiquetas(unidad_tiempo, DIVISORES_TIEMPO, defecto=1)
+
+def interes_simple_vf_lote(capital, tasa_anual, tiempo, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro con Interés Simple para arreglos de posiciones"""
+    capital = np.asarray(capital, dtype=float)
+    tiempo_anos = _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+    
+    # VF = C(1 + rt)
+    valor_futuro = capital * (1 + np.asarray(tasa_anual, dtype=float) * tiempo_anos)
+    interes_ganado = valor_futuro - capital
+    return valor_futuro, interes_ganado
+
+def interes_simple_vp_lote(valor_futuro, tasa_anual, tiempo, unidad_tiempo="Años"):
+    """Calcula el Valor Presente con Interés Simple para arreglos de posiciones"""
+    valor_futuro = np.asarray(valor_futuro, dtype=float)
+    tiempo_anos = _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+    
+    # VP = VF / (1 + rt)
+    valor_presente = valor_futuro / (1 + np.asarray(tasa_anual, dtype=float) * tiempo_anos)
+    interes_total = valor_futuro - valor_presente
+    return valor_presente, interes_total
+
+def interes_compuesto_vf_lote(capital, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro con Interés Compuesto para arreglos de posiciones"""
+    capital = np.asarray(capital, dtype=float)
+    tiempo_anos = _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+    n = _mapear_etiquetas(capitalizacion, FRECUENCIAS)
+    
+    # VF = C(1 + r/n)^(nt)
+    valor_futuro = capital * np.power(1 + np.asarray(tasa_anual, dtype=float) / n, n * tiempo_anos)
+    interes_ganado = valor_futuro - capital
+    return valor_futuro, interes_ganado
+
+def interes_compuesto_vp_lote(valor_futuro, tasa_anual, tiempo, capitalizacion, unidad_tiempo="Años"):
+    """Calcula el Valor Presente con Interés Compuesto para arreglos de posiciones"""
+    valor_futuro = np.asarray(valor_futuro, dtype=float)
+    tiempo_anos = _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+    n = _mapear_etiquetas(capitalizacion, FRECUENCIAS)
+    
+    # VP = VF / (1 + r/n)^(nt)
+    valor_presente = valor_futuro / np.power(1 + np.asarray(tasa_anual, dtype=float) / n, n * tiempo_anos)
+    interes_total = valor_futuro - valor_presente
+    return valor_presente, interes_total
+
+# --- Aportes Periódicos (Anualidades) ---
+# Un aporte por período de capitalización durante N = n·t períodos: vencido (al
+# final del período) o anticipado (al inicio). Con `crecimiento` (tasa anual
+# nominal) cada aporte es (1 + crecimiento/n) veces el anterior. Las sumas de
+# las series tienen forma cerrada, así el costo no depende del número de aportes.
+
+def _suma_geometrica(razon, periodos):
+    """Σ (1 + razon)^k para k = 0..N-1 con N = `periodos`, estable cuando razon → 0"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        suma = np.expm1(periodos * np.log1p(razon)) / razon
+    return np.where(razon == 0, periodos, suma)
+
+def _parametros_anualidad(tasa_anual, tiempo, capitalizacion, crecimiento, unidad_tiempo):
+    """Tasa y crecimiento por período y número de períodos"""
+    n = _mapear_etiquetas(capitalizacion, FRECUENCIAS)
+    tasa = np.asarray(tasa_anual, dtype=float) / n
+    crecimiento = np.asarray(crecimiento, dtype=float) / n
+    return tasa, crecimiento, n * _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+
+def total_aportado_lote(aporte, tiempo, capitalizacion, crecimiento=0.0, unidad_tiempo="Años"):
+    """Suma de los aportes de un plan, sin intereses"""
+    _, crecimiento, periodos = _parametros_anualidad(0.0, tiempo, capitalizacion, crecimiento, unidad_tiempo)
+    return np.asarray(aporte, dtype=float) * _suma_geometrica(crecimiento, periodos)
+
+def anualidad_vf_lote(aporte, tasa_anual, tiempo, capitalizacion, crecimiento=0.0, anticipada=False, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro de aportes periódicos con Interés Compuesto para arreglos de planes"""
+    tasa, crecimiento, periodos = _parametros_anualidad(tasa_anual, tiempo, capitalizacion, crecimiento, unidad_tiempo)
+    
+    # VF = A(1+i)^(N-1) Σ ((1+g)/(1+i))^k, con (1+g)/(1+i) = 1 + (g-i)/(1+i); ×(1+i) si es anticipada
+    factor = np.power(1 + tasa, periodos - 1) * _suma_geometrica((crecimiento - tasa) / (1 + tasa), periodos)
+    factor = np.where(anticipada, factor * (1 + tasa), factor)
+    valor_futuro = np.asarray(aporte, dtype=float) * factor
+    interes_ganado = valor_futuro - np.asarray(aporte, dtype=float) * _suma_geometrica(crecimiento, periodos)
+    return valor_futuro, interes_ganado
+
+def anualidad_vp_lote(aporte, tasa_anual, tiempo, capitalizacion, crecimiento=0.0, anticipada=False, unidad_tiempo="Años"):
+    """Calcula el Valor Presente de aportes (o retiros) periódicos con Interés Compuesto para arreglos de planes"""
+    tasa, crecimiento, periodos = _parametros_anualidad(tasa_anual, tiempo, capitalizacion, crecimiento, unidad_tiempo)
+    
+    # VP = VF / (1+i)^N = A Σ ((1+g)/(1+i))^k / (1+i); ×(1+i) si es anticipada
+    factor = _suma_geometrica((crecimiento - tasa) / (1 + tasa), periodos)
+    factor = np.where(anticipada, factor, factor / (1 + tasa))
+    valor_presente = np.asarray(aporte, dtype=float) * factor
+    interes_total = np.asarray(aporte, dtype=float) * _suma_geometrica(crecimiento, periodos) - valor_presente
+    return valor_presente, interes_total
+
+def anualidad_simple_vf_lote(aporte, tasa_anual, tiempo, capitalizacion, crecimiento=0.0, anticipada=False, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro de aportes periódicos con Interés Simple para arreglos de planes"""
+    tasa, crecimiento, periodos = _parametros_anualidad(tasa_anual, tiempo, capitalizacion, crecimiento, unidad_tiempo)
+    
+    # Cada aporte gana i por período restante: VF = A(S + i·R), S = Σ (1+g)^k
+    # y R = Σ (1+g)^k (N-1-k) = (S - N)/g, con límite N(N-1)/2 cuando g → 0
+    suma = _suma_geometrica(crecimiento, periodos)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        restantes = (suma - periodos) / crecimiento
+    restantes = np.where(np.abs(crecimiento * periodos) < 1e-8, periodos * (periodos - 1) / 2, restantes)
+    # Anticipada: cada aporte gana un período más
+    restantes = np.where(anticipada, restantes + suma, restantes)
+    aporte = np.asarray(aporte, dtype=float)
+    valor_futuro = aporte * (suma + tasa * restantes)
+    interes_ganado = valor_futuro - aporte * suma
+    return valor_futuro, interes_ganado
+
+def anualidad_vf(aporte, tasa_anual, tiempo, capitalizacion, crecimiento=0.0, anticipada=False, unidad_tiempo="Años"):
+    """Calcula el Valor Futuro de aportes periódicos con Interés Compuesto"""
+    valor_futuro, interes_ganado = anualidad_vf_lote(aporte, tasa_anual, tiempo, capitalizacion, crecimiento, anticipada, unidad_tiempo)
+    return float(valor_futuro), float(interes_ganado)
+
+def anualidad_vp(aporte, tasa_anual, tiempo, capitalizacion, crecimiento=0.0, anticipada=False, unidad_tiempo="Años"):
+    """Calcula el Valor Presente de aportes (o retiros) periódicos con Interés Compuesto"""
+    valor_presente, interes_total = anualidad_vp_lote(aporte, tasa_anual, tiempo, capitalizacion, crecimiento, anticipada, unidad_tiempo)
+    return float(valor_presente), float(interes_total)
+
+# --- Solucionadores Inversos (Tasa y Tiempo) ---
+# Devuelven (valor, valido): `valido` marca las posiciones con solución; el
+# resto queda en NaN (montos no positivos, plazos nulos o crecimiento imposible).
+
+def _razon_crecimiento(valor_presente, valor_futuro):
+    """VF/VP como arreglo, con NaN donde algún monto no es positivo"""
+    valor_presente = np.asarray(valor_presente, dtype=float)
+    valor_futuro = np.asarray(valor_futuro, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        razon = valor_futuro / valor_presente
+    return np.where((valor_presente > 0) & (valor_futuro > 0), razon, np.nan)
+
+def _resultado_valido(valor):
+    """Reemplaza infinitos por NaN y devuelve (valor, máscara de validez)"""
+    valor = np.where(np.isfinite(valor), valor, np.nan)
+    return valor, ~np.isnan(valor)
+
+def tasa_implicita_simple(valor_presente, valor_futuro, tiempo, unidad_tiempo="Años"):
+    """Tasa anual que lleva VP a VF con Interés Simple: r = (VF/VP - 1) / t"""
+    tiempo_anos = _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tasa = (_razon_crecimiento(valor_presente, valor_futuro) - 1) / np.where(tiempo_anos > 0, tiempo_anos, np.nan)
+    return _resultado_valido(tasa)
+
+def tasa_implicita_compuesta(valor_presente, valor_futuro, tiempo, capitalizacion, unidad_tiempo="Años"):
+    """Tasa anual nominal que lleva VP a VF con Interés Compuesto: r = n((VF/VP)^(1/nt) - 1)"""
+    tiempo_anos = _tiempo_en_anos_lote(tiempo, unidad_tiempo)
+    n = _mapear_etiquetas(capitalizacion, FRECUENCIAS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponente = np.log(_razon_crecimiento(valor_presente, valor_futuro)) / np.where(tiempo_anos > 0, n * tiempo_anos, np.nan)
+        tasa = n * np.expm1(exponente)
+    return _resultado_valido(tasa)
+
+def tiempo_requerido_simple(valor_presente, valor_futuro, tasa_anual, unidad_tiempo="Años"):
+    """Tiempo (en `unidad_tiempo`) para llevar VP a VF con Interés Simple: t = (VF/VP - 1) / r"""
+    tasa_anual = np.asarray(tasa_anual, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tiempo_anos = (_razon_crecimiento(valor_presente, valor_futuro) - 1) / np.where(tasa_anual > 0, tasa_anual, np.nan)
+    tiempo_anos = np.where(tiempo_anos >= 0, tiempo_anos, np.nan)
+    return _resultado_valido(tiempo_anos * _mapear_etiquetas(unidad_tiempo, DIVISORES_TIEMPO, defecto=1))
+
+def tiempo_requerido_compuesto(valor_presente, valor_futuro, tasa_anual, capitalizacion, unidad_tiempo="Años"):
+    """Tiempo (en `unidad_tiempo`) para llevar VP a VF con Interés Compuesto: t = ln(VF/VP) / (n ln(1 + r/n))"""
+    tasa_anual = np.asarray(tasa_anual, dtype=float)
+    n = _mapear_etiquetas(capitalizacion, FRECUENCIAS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tiempo_anos = np.log(_razon_crecimiento(valor_presente, valor_futuro)) / (
+            n * np.log1p(np.where(tasa_anual > 0, tasa_anual, np.nan) / n)
+        )
+    tiempo_anos = np.where(tiempo_anos >= 0, tiempo_anos, np.nan)
+    return _resultado_valido(tiempo_anos * _mapear_etiquetas(unidad_tiempo, DIVISORES_TIEMPO, defecto=1))
+
+def newton_acotado(funcion, bajo, alto, x0=None, tolerancia=1e-12, max_iteraciones=100):
+    """Resuelve funcion(x) = 0 elemento a elemento con Newton protegido por bisección.
+
+    `funcion(x)` recibe un arreglo y devuelve (f, df). Cada elemento debe tener
+    su raíz dentro de [bajo, alto] (f con signos opuestos en los extremos).
+    Si el paso de Newton sale del intervalo o no mejora, se usa bisección.
+    Devuelve (x, convergio, iteraciones); sin cambio de signo, convergio=False.
+    """
+    bajo = np.asarray(bajo, dtype=float)
+    alto = np.asarray(alto, dtype=float)
+    f_bajo, _ = funcion(bajo)
+    f_alto, _ = funcion(alto)
+
+    # Los extremos pueden ser escalares aunque `funcion` trabaje sobre arreglos
+    forma = np.broadcast_shapes(bajo.shape, alto.shape, np.shape(f_bajo), np.shape(f_alto))
+    bajo, alto, f_bajo, f_alto = (np.broadcast_to(a, forma).astype(float) for a in (bajo, alto, f_bajo, f_alto))
+    x = (bajo + alto) / 2 if x0 is None else np.broadcast_to(np.asarray(x0, dtype=float), forma).astype(float)
+    acotado = np.sign(f_bajo) * np.sign(f_alto) <= 0
+    convergio = np.zeros(bajo.shape, dtype=bool)
+    paso_anterior = alto - bajo
+
+    iteraciones = 0
+    for iteraciones in range(1, max_iteraciones + 1):
+        f, df = funcion(x)
+        convergio |= acotado & (np.abs(f) <= tolerancia * np.maximum(1.0, np.abs(x)))
+        activos = acotado & ~convergio
+        if not activos.any():
+            break
+
+        # Mantener el intervalo que contiene el cambio de signo
+        mismo_signo = np.sign(f) == np.sign(f_bajo)
+        bajo = np.where(activos & mismo_signo, x, bajo)
+        f_bajo = np.where(activos & mismo_signo, f, f_bajo)
+        alto = np.where(activos & ~mismo_signo, x, alto)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_newton = x - f / df
+        # Newton solo si queda dentro y al menos reduce a la mitad el paso anterior
+        dentro = np.isfinite(x_newton) & (x_newton > bajo) & (x_newton < alto)
+        dentro &= np.abs(x_newton - x) <= np.abs(paso_anterior) / 2
+        x_nuevo = np.where(dentro, x_newton, (bajo + alto) / 2)
+        paso_anterior = np.where(activos, x_nuevo - x, paso_anterior)
+
+        convergio |= activos & (np.abs(x_nuevo - x) <= tolerancia * np.maximum(1.0, np.abs(x)))
+        x = np.where(activos, x_nuevo, x)
+
+    x = np.where(acotado, x, np.nan)
+    return x, convergio, iteraciones
@@ -0,0 +1,179 @@
+"""Valoración masiva de carteras de posiciones leídas por bloques.
+
+Los archivos CSV o Parquet se recorren bloque a bloque, cada bloque se valora
+con las funciones vectorizadas de ``calculos`` y el resultado se escribe de
+forma incremental, así el archivo completo nunca está en memoria.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from convenciones import dias_computables, fraccion_anual
+from calculos import (
+    DIVISORES_TIEMPO,
+    FRECUENCIAS,
+    interes_simple_vf_lote,
+    interes_simple_vp_lote,
+    interes_compuesto_vf_lote,
+    interes_compuesto_vp_lote,
+)
+
+# Columnas del archivo de entrada: "monto" es el capital (VF) o el valor futuro (VP)
+# y "tasa" es la tasa anual en decimal (0.08 = 8%)
+COLUMNAS_REQUERIDAS = ("monto", "tasa", "tiempo")
+VALORES_POR_DEFECTO = {"unidad": "Años", "capitalizacion": "Anual", "tipo": "compuesto", "calculo": "VF"}
+TAMANO_BLOQUE = 100_000
+FORMATOS = ("csv", "parquet")
+# Libro de facturas para el interés por mora: sin "pago" se usa la fecha de corte
+# y sin "tasa" (anual en decimal) la tasa de mora indicada
+COLUMNAS_MORA = ("monto", "vencimiento")
+
+# Función vectorizada para cada combinación de (tipo, cálculo)
+_FUNCIONES = {
+    ("simple", "VF"): lambda monto, tasa, tiempo, unidad, cap: interes_simple_vf_lote(monto, tasa, tiempo, unidad),
+    ("simple", "VP"): lambda monto, tasa, tiempo, unidad, cap: interes_simple_vp_lote(monto, tasa, tiempo, unidad),
+    ("compuesto", "VF"): lambda monto, tasa, tiempo, unidad, cap: interes_compuesto_vf_lote(monto, tasa, tiempo, cap, unidad),
+    ("compuesto", "VP"): lambda monto, tasa, tiempo, unidad, cap: interes_compuesto_vp_lote(monto, tasa, tiempo, cap, unidad),
+}
+
+def detectar_formato(nombre):
+    """Deduce el formato ("csv" o "parquet") a partir del nombre del archivo"""
+    extension = os.path.splitext(str(nombre))[1].lower().lstrip(".")
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    if extension in ("csv", "txt"):
+        return "csv"
+    raise ValueError(f"Formato de archivo no soportado: '{nombre}' (use CSV o Parquet)")
+
+def _etiquetas_canonicas(bloque, columna, validas):
+    """Lleva una columna de etiquetas a su forma canónica ("  meses" → "Meses"); falla con etiquetas desconocidas"""
+    canonicas = {etiqueta.casefold(): etiqueta for etiqueta in validas}
+    # Solo se normaliza una vez cada etiqueta distinta del bloque
+    codigos, distintas = pd.factorize(bloque[columna])
+    tabla = np.array([canonicas.get(str(etiqueta).strip().casefold()) for etiqueta in distintas], dtype=object)
+    desconocidas = np.equal(tabla, None)
+    if desconocidas.any():
+        etiqueta = distintas[int(np.argmax(desconocidas))]
+        fila = int(np.argmax(codigos == int(np.argmax(desconocidas))))
+        raise ValueError(
+            f"{columna} no válida en la fila {bloque.index[fila]}: '{etiqueta}' (use {', '.join(validas)})"
+        )
+    return tabla[codigos]
+
+def valorar_bloque(bloque):
+    """Añade las columnas 'resultado' e 'interes' a un bloque de posiciones"""
+    faltantes = [columna for columna in COLUMNAS_REQUERIDAS if columna not in bloque.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+    # Completar columnas opcionales ausentes o vacías
+    for columna, defecto in VALORES_POR_DEFECTO.items():
+        if columna in bloque.columns:
+            bloque[columna] = bloque[columna].fillna(defecto)
+        else:
+            bloque[columna] = defecto
+
+    tipos = bloque["tipo"].astype(str).str.strip().str.lower().to_numpy()
+    calculos = bloque["calculo"].astype(str).str.strip().str.upper().to_numpy()
+    monto = bloque["monto"].to_numpy(dtype=float)
+    tasa = bloque["tasa"].to_numpy(dtype=float)
+    tiempo = bloque["tiempo"].to_numpy(dtype=float)
+    # Una etiqueta desconocida no debe tomarse en silencio como años o capitalización anual
+    unidad = _etiquetas_canonicas(bloque, "unidad", DIVISORES_TIEMPO)
+    capitalizacion = _etiquetas_canonicas(bloque, "capitalizacion", FRECUENCIAS)
+
+    resultado = np.full(len(bloque), np.nan)
+    interes = np.full(len(bloque), np.nan)
+    cubiertas = np.zeros(len(bloque), dtype=bool)
+
+    # Una llamada vectorizada por combinación presente en el bloque
+    for (tipo, calculo), funcion in _FUNCIONES.items():
+        mascara = (tipos == tipo) & (calculos == calculo)
+        if not mascara.any():
+            continue
+        resultado[mascara], interes[mascara] = funcion(
+            monto[mascara], tasa[mascara], tiempo[mascara], unidad[mascara], capitalizacion[mascara]
+        )
+        cubiertas |= mascara
+
+    if not cubiertas.all():
+        fila = int(np.argmin(cubiertas))
+        raise ValueError(
+            f"Combinación no válida en la fila {bloque.index[fila]}: "
+            f"tipo='{bloque['tipo'].iloc[fila]}', calculo='{bloque['calculo'].iloc[fila]}' "
+            "(use tipo simple/compuesto y calculo VF/VP)"
+        )
+
+    bloque["resultado"] = resultado
+    bloque["interes"] = interes
+    return bloque
+
+def leer_por_bloques(archivo, formato="csv", tamano_bloque=TAMANO_BLOQUE):
+    """Genera (bloque, fracción leída) recorriendo un CSV o Parquet sin cargarlo entero"""
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(archivo)
+        total = max(parquet.metadata.num_rows, 1)
+        leidas = 0
+        for lote in parquet.iter_batches(batch_size=tamano_bloque):
+            leidas += lote.num_rows
+            yield lote.to_pandas(), leidas / total
+    elif formato == "csv":
+        # La posición en el archivo da una estimación del avance
+        total = _tamano_archivo(archivo)
+        for bloque in pd.read_csv(archivo, chunksize=tamano_bloque):
+            avance = min(archivo.tell() / total, 1.0) if total else 0.0
+            yield bloque, avance
+    else:
+        raise ValueError(f"Formato no soportado: '{formato}' (use {' o '.join(FORMATOS)})")
+
+def _tamano_archivo(archivo):
+    """Tamaño en bytes de un archivo abierto, o 0 si no se puede determinar"""
+    try:
+        posicion = archivo.tell()
+        total = archivo.seek(0, os.SEEK_END)
+        archivo.seek(posicion)
+        return total
+    except (AttributeError, OSError):
+        return 0
+
+def valorar_archivo(archivo, destino, formato="csv", tamano_bloque=TAMANO_BLOQUE, progreso=None):
+    """Valora un archivo de posiciones por bloques y escribe el resultado como CSV en `destino`.
+
+    `archivo` es un archivo binario abierto (o un UploadedFile de Streamlit) y
+    `destino` un archivo de texto abierto. `progreso(filas, fraccion)` se llama
+    tras cada bloque. Devuelve el número de filas valoradas.
+    """
+    filas = 0
+    for bloque, avance in leer_por_bloques(archivo, formato, tamano_bloque):
+        valorar_bloque(bloque).to_csv(destino, header=(filas == 0), index=False)
+        filas += len(bloque)
+        if progreso is not None:
+            progreso(filas, avance)
+    return filas
+
+def valorar_mora(facturas, fecha_corte, tasa_anual, convencion="Actual/365"):
+    """Añade días de mora, fracción de año, interés simple por mora y total a un libro de facturas.
+
+    Las fechas se convierten por columna y las fracciones de año se calculan en
+    una sola pasada vectorizada; las facturas pagadas a tiempo no generan interés.
+    """
+    faltantes = [columna for columna in COLUMNAS_MORA if columna not in facturas.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+    vencimiento = pd.to_datetime(facturas["vencimiento"]).to_numpy(dtype="datetime64[D]")
+    if "pago" in facturas.columns:
+        pago = pd.to_datetime(facturas["pago"]).fillna(pd.Timestamp(fecha_corte)).to_numpy(dtype="datetime64[D]")
+    else:
+        pago = np.full(len(facturas), np.datetime64(fecha_corte, "D"))
+    tasa = facturas["tasa"].fillna(tasa_anual).to_numpy(dtype=float) if "tasa" in facturas.columns else tasa_anual
+    monto = facturas["monto"].to_numpy(dtype=float)
+
+    dias = np.maximum(dias_computables(vencimiento, pago, convencion), 0)
+    fraccion = np.maximum(fraccion_anual(vencimiento, pago, convencion), 0.0)
+    interes = monto * tasa * fraccion
+    return facturas.assign(dias_mora=dias, fraccion_anual=fraccion, interes_mora=interes, total=monto + interes)
@@ -0,0 +1,83 @@
+"""Convenciones de conteo de días para cálculos con fechas.
+
+Las fechas se convierten a números de día con NumPy (``datetime64[D]``) y los
+datos de calendario (año, mes, día, inicio y longitud del año) se leen de una
+tabla precalculada indexada por número de día, así las fracciones de año de
+millones de pares de fechas se obtienen sin aritmética de fechas por fila.
+"""
+
+import functools
+
+import numpy as np
+
+CONVENCIONES = ("Actual/360", "Actual/365", "30/360", "Actual/Actual")
+# Rango de años cubierto por la tabla de días
+ANO_MIN, ANO_MAX = 1900, 2199
+
+_EPOCA = np.datetime64("1970-01-01", "D")
+
+@functools.lru_cache(maxsize=None)
+def tabla_dias():
+    """Tabla por día entre ANO_MIN y ANO_MAX: año, mes, día, inicio del año y días del año"""
+    dias = np.arange(np.datetime64(f"{ANO_MIN}-01-01"), np.datetime64(f"{ANO_MAX + 1}-01-01"))
+    anos = dias.astype("datetime64[Y]")
+    meses = dias.astype("datetime64[M]")
+    inicio_ano = anos.astype("datetime64[D]")
+    return {
+        "base": int((dias[0] - _EPOCA).astype(np.int64)),
+        "ano": (anos.astype(np.int64) + 1970).astype(np.int32),
+        "mes": ((meses - anos.astype("datetime64[M]")).astype(np.int64) + 1).astype(np.int32),
+        "dia": ((dias - meses.astype("datetime64[D]")).astype(np.int64) + 1).astype(np.int32),
+        "inicio_ano": (inicio_ano - _EPOCA).astype(np.int64),
+        "dias_ano": ((anos + 1).astype("datetime64[D]") - inicio_ano).astype(np.int64),
+    }
+
+def indices_dias(fechas):
+    """Número de día desde 1970-01-01 de una fecha o arreglo de fechas (texto ISO, date o datetime64)"""
+    fechas = np.asarray(fechas, dtype="datetime64[D]")
+    if np.any(np.isnat(fechas)):
+        raise ValueError("Hay fechas vacías o no válidas")
+    return (fechas - _EPOCA).astype(np.int64)
+
+def _filas(tabla, dias):
+    """Posición de cada número de día en la tabla, validando el rango"""
+    filas = dias - tabla["base"]
+    if np.any((filas < 0) | (filas >= len(tabla["ano"]))):
+        raise ValueError(f"Fechas fuera del rango soportado ({ANO_MIN}–{ANO_MAX})")
+    return filas
+
+def dias_computables(inicio, fin, convencion="Actual/365"):
+    """Días entre fechas según la convención: reales, o de meses de 30 días en 30/360"""
+    if convencion not in CONVENCIONES:
+        raise ValueError(f"Convención no válida: '{convencion}' (use {', '.join(CONVENCIONES)})")
+    d1, d2 = indices_dias(inicio), indices_dias(fin)
+    if convencion != "30/360":
+        return d2 - d1
+
+    # 30/360 (base de bonos ISDA): el día 31 cuenta como 30
+    tabla = tabla_dias()
+    f1, f2 = _filas(tabla, d1), _filas(tabla, d2)
+    dia1, dia2 = tabla["dia"][f1], tabla["dia"][f2]
+    dia1 = np.where(dia1 == 31, 30, dia1)
+    dia2 = np.where((dia2 == 31) & (dia1 == 30), 30, dia2)
+    return (360 * (tabla["ano"][f2] - tabla["ano"][f1]) + 30 * (tabla["mes"][f2] - tabla["mes"][f1])
+            + (dia2 - dia1)).astype(np.int64)
+
+def fraccion_anual(inicio, fin, convencion="Actual/365"):
+    """Fracción de año entre fechas según la convención (negativa si `fin` es anterior)"""
+    if convencion != "Actual/Actual":
+        base = 365 if convencion == "Actual/365" else 360
+        return dias_computables(inicio, fin, convencion) / base
+
+    # Actual/Actual (ISDA): los días de cada año natural se dividen entre la longitud de ese año
+    d1, d2 = indices_dias(inicio), indices_dias(fin)
+    signo = np.sign(d2 - d1)
+    d1, d2 = np.minimum(d1, d2), np.maximum(d1, d2)
+    tabla = tabla_dias()
+    f1, f2 = _filas(tabla, d1), _filas(tabla, d2)
+    inicio1, largo1 = tabla["inicio_ano"][f1], tabla["dias_ano"][f1]
+    inicio2, largo2 = tabla["inicio_ano"][f2], tabla["dias_ano"][f2]
+    mismo_ano = inicio1 == inicio2
+    partido = ((inicio1 + largo1 - d1) / largo1 + (tabla["ano"][f2] - tabla["ano"][f1] - 1)
+               + (d2 - inicio2) / largo2)
+    return signo * np.where(mismo_ano, (d2 - d1) / largo1, partido)
@@ -0,0 +1,233 @@
+"""Almacén de escenarios compartido entre sesiones, respaldado por SQLite.
+
+Cada cálculo se identifica por el hash de una forma canónica de sus entradas
+(tipo de cálculo, versión y entradas normalizadas), así un escenario ya
+calculado por cualquier usuario se sirve desde la base sin repetir el cálculo.
+Los escenarios con nombre guardan sus entradas y apuntan a ese hash. Los
+resultados sin nombre se desalojan por antigüedad de uso cuando la base supera
+el límite de filas o de bytes, y los resultados demasiado grandes no se guardan.
+
+La ruta de la base se toma de ARIANE_ESCENARIOS_DB (por defecto
+``escenarios.sqlite3`` junto a este módulo).
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from calculos import interes_simple_vf, interes_compuesto_vf, anualidad_vf, anualidad_simple_vf_lote, total_aportado_lote
+
+RUTA_POR_DEFECTO = os.environ.get("ARIANE_ESCENARIOS_DB") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "escenarios.sqlite3"
+)
+# Cambiar la versión invalida los resultados guardados con fórmulas anteriores
+VERSION_CALCULOS = 1
+# Límites de la base: resultado individual, filas y bytes de resultados sin nombre
+TAMANO_MAXIMO_RESULTADO = 256 * 1024
+MAXIMO_RESULTADOS = 10_000
+MAXIMO_BYTES = 64 * 1024 * 1024
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    hash TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    entradas TEXT NOT NULL,
+    resultado TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    creado REAL NOT NULL,
+    usado REAL NOT NULL,
+    usos INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+CREATE TABLE IF NOT EXISTS escenarios (
+    nombre TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    entradas TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    creado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS escenarios_hash ON escenarios (hash);
+"""
+
+# --- Cálculos registrados ---
+
+def calcular_comparacion(capital, tasa, tiempo, capitalizacion, volatilidad=None, modelo="normal", trayectorias=100_000,
+                         aporte=None, crecimiento=0.0, anticipada=False):
+    """Resultados de un escenario de comparación simple vs compuesto (con aportes o simulación, si los hay)"""
+    vf_simple, int_simple = interes_simple_vf(capital, tasa, tiempo)
+    vf_compuesto, int_compuesto = interes_compuesto_vf(capital, tasa, tiempo, capitalizacion)
+    if aporte:
+        vf_aportes, int_aportes = anualidad_simple_vf_lote(aporte, tasa, tiempo, capitalizacion, crecimiento, anticipada)
+        vf_simple, int_simple = vf_simple + float(vf_aportes), int_simple + float(int_aportes)
+        vf_aportes, int_aportes = anualidad_vf(aporte, tasa, tiempo, capitalizacion, crecimiento, anticipada)
+        vf_compuesto, int_compuesto = vf_compuesto + vf_aportes, int_compuesto + int_aportes
+    resultado = {
+        "vf_simple": vf_simple,
+        "interes_simple": int_simple,
+        "vf_compuesto": vf_compuesto,
+        "interes_compuesto": int_compuesto,
+        "diferencia": vf_compuesto - vf_simple,
+    }
+    if aporte:
+        resultado["total_aportado"] = capital + float(total_aportado_lote(aporte, tiempo, capitalizacion, crecimiento))
+    if volatilidad is not None:
+        from montecarlo import UMBRAL_PROCESOS, simular_tasas
+
+        trayectorias = int(trayectorias)
+        procesos = None if trayectorias >= UMBRAL_PROCESOS else 1
+        simulacion = simular_tasas(capital, tasa, tiempo, capitalizacion, volatilidad, modelo, trayectorias, procesos=procesos)
+        finales = simulacion["bandas"][:, -1]
+        resultado.update({f"p{percentil}": float(valor) for percentil, valor in zip(simulacion["percentiles"], finales)})
+        resultado["media_simulada"] = float(simulacion["media"][-1])
+    return resultado
+
+CALCULOS = {"comparacion": calcular_comparacion}
+
+# --- Forma canónica ---
+
+def _normalizar(valor):
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, (int, float)):
+        # 10, 10.0 y 10.00000000001 son la misma entrada
+        return round(float(valor), 10)
+    if isinstance(valor, str):
+        return valor.strip()
+    raise TypeError(f"Entrada no soportada: {valor!r}")
+
+def canonizar(tipo, entradas):
+    """Devuelve (entradas normalizadas en JSON, hash) de un cálculo"""
+    normalizadas = {clave: _normalizar(valor) for clave, valor in entradas.items() if valor is not None}
+    texto = json.dumps(normalizadas, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    clave = json.dumps([tipo, VERSION_CALCULOS, normalizadas], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return texto, hashlib.sha256(clave.encode("utf-8")).hexdigest()
+
+# --- Base de datos ---
+
+# Bases con el esquema creado y el modo WAL activado (persiste en el archivo) en este proceso
+_preparadas = set()
+_cerrojo_preparadas = threading.Lock()
+
+def _preparar(conexion, ruta):
+    """Crea el esquema y activa WAL la primera vez que el proceso abre `ruta`"""
+    # Cada conexión a ":memory:" es una base nueva: siempre se prepara
+    if ruta in _preparadas and ruta != ":memory:":
+        return
+    with _cerrojo_preparadas:
+        if ruta in _preparadas and ruta != ":memory:":
+            return
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.executescript(_ESQUEMA)
+        _preparadas.add(ruta)
+
+@contextlib.contextmanager
+def conectar(ruta=None):
+    """Abre la base en modo WAL (lectores concurrentes) y confirma la transacción al salir"""
+    ruta = ruta or RUTA_POR_DEFECTO
+    conexion = sqlite3.connect(ruta, timeout=10)
+    try:
+        _preparar(conexion, ruta)
+        with conexion:
+            yield conexion
+    finally:
+        conexion.close()
+
+def _desalojar(conexion, maximo_resultados=None, maximo_bytes=None):
+    """Elimina los resultados sin nombre usados hace más tiempo hasta cumplir los límites"""
+    maximo_resultados = maximo_resultados or MAXIMO_RESULTADOS
+    maximo_bytes = maximo_bytes or MAXIMO_BYTES
+    filas, bytes_totales = conexion.execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM resultados").fetchone()
+    if filas <= maximo_resultados and bytes_totales <= maximo_bytes:
+        return 0
+    candidatos = conexion.execute(
+        "SELECT hash, tamano FROM resultados WHERE hash NOT IN (SELECT hash FROM escenarios) ORDER BY usado"
+    )
+    eliminar = []
+    for hash_, tamano in candidatos:
+        if filas <= maximo_resultados and bytes_totales <= maximo_bytes:
+            break
+        eliminar.append((hash_,))
+        filas -= 1
+        bytes_totales -= tamano
+    conexion.executemany("DELETE FROM resultados WHERE hash = ?", eliminar)
+    return len(eliminar)
+
+def obtener_o_calcular(tipo, entradas, ruta=None):
+    """Devuelve (resultado, reutilizado): desde la base si ya existe, si no lo calcula y lo guarda"""
+    texto, hash_ = canonizar(tipo, entradas)
+    ahora = time.time()
+    with conectar(ruta) as conexion:
+        fila = conexion.execute("SELECT resultado FROM resultados WHERE hash = ?", (hash_,)).fetchone()
+        if fila is not None:
+            conexion.execute("UPDATE resultados SET usado = ?, usos = usos + 1 WHERE hash = ?", (ahora, hash_))
+            return json.loads(fila[0]), True
+
+    # El cálculo se hace fuera de la transacción para no bloquear a otras sesiones
+    resultado = CALCULOS[tipo](**json.loads(texto))
+    serializado = json.dumps(resultado, ensure_ascii=False)
+    if len(serializado) <= TAMANO_MAXIMO_RESULTADO:
+        with conectar(ruta) as conexion:
+            conexion.execute(
+                "INSERT OR IGNORE INTO resultados (hash, tipo, entradas, resultado, tamano, creado, usado) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (hash_, tipo, texto, serializado, len(serializado), ahora, ahora),
+            )
+            _desalojar(conexion)
+    return resultado, False
+
+def guardar_escenario(nombre, tipo, entradas, ruta=None):
+    """Guarda (o reemplaza) un escenario con nombre y devuelve su hash"""
+    nombre = nombre.strip()
+    if not nombre:
+        raise ValueError("El escenario necesita un nombre")
+    if tipo not in CALCULOS:
+        raise ValueError(f"Tipo de cálculo desconocido: '{tipo}' (use {', '.join(CALCULOS)})")
+    texto, hash_ = canonizar(tipo, entradas)
+    with conectar(ruta) as conexion:
+        conexion.execute(
+            "INSERT OR REPLACE INTO escenarios (nombre, tipo, entradas, hash, creado) VALUES (?, ?, ?, ?, ?)",
+            (nombre, tipo, texto, hash_, time.time()),
+        )
+    return hash_
+
+def cargar_escenario(nombre, ruta=None):
+    """Devuelve (tipo, entradas) de un escenario con nombre, o None si no existe"""
+    with conectar(ruta) as conexion:
+        fila = conexion.execute("SELECT tipo, entradas FROM escenarios WHERE nombre = ?", (nombre,)).fetchone()
+    return (fila[0], json.loads(fila[1])) if fila else None
+
+def listar_escenarios(tipo=None, ruta=None):
+    """Nombres de los escenarios guardados, del más reciente al más antiguo"""
+    with conectar(ruta) as conexion:
+        consulta = "SELECT nombre FROM escenarios" + (" WHERE tipo = ?" if tipo else "") + " ORDER BY creado DESC"
+        return [nombre for nombre, in conexion.execute(consulta, (tipo,) if tipo else ())]
+
+def eliminar_escenario(nombre, ruta=None):
+    """Elimina un escenario con nombre; su resultado queda sujeto al desalojo normal"""
+    with conectar(ruta) as conexion:
+        conexion.execute("DELETE FROM escenarios WHERE nombre = ?", (nombre,))
+
+def comparar_escenarios(nombres, ruta=None):
+    """Filas {nombre, entradas..., resultados...} de varios escenarios, reutilizando resultados guardados"""
+    filas = []
+    for nombre in nombres:
+        escenario = cargar_escenario(nombre, ruta)
+        if escenario is None:
+            continue
+        tipo, entradas = escenario
+        resultado, _ = obtener_o_calcular(tipo, entradas, ruta)
+        filas.append({"nombre": nombre, **entradas, **resultado})
+    return filas
+
+def estadisticas(ruta=None):
+    """Resultados guardados, bytes que ocupan, usos acumulados y escenarios con nombre"""
+    with conectar(ruta) as conexion:
+        resultados, bytes_totales, usos = conexion.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tamano), 0), COALESCE(SUM(usos), 0) FROM resultados"
+        ).fetchone()
+        escenarios, = conexion.execute("SELECT COUNT(*) FROM escenarios").fetchone()
+    return {"resultados": resultados, "bytes": bytes_totales, "usos": usos, "escenarios": escenarios}
@@ -0,0 +1,198 @@
+"""Valor presente neto y tasa interna de retorno de lotes de proyectos.
+
+Cada proyecto tiene sus propios flujos, en períodos regulares o con fechas
+irregulares. Los flujos de todos los proyectos se guardan en forma plana
+(estilo CSR): ``montos`` y ``tiempos`` concatenados y ``indptr`` con el
+inicio de cada proyecto, de modo que el flujo ``k`` del proyecto ``p`` es
+``montos[indptr[p] + k]``. También se acepta una matriz rellena
+(proyectos × flujos) con NaN en las celdas vacías.
+
+Los factores de descuento de todos los flujos se calculan en una sola pasada
+vectorizada y se suman por proyecto con ``np.bincount``; la TIR de todos los
+proyectos se resuelve a la vez con ``newton_acotado``.
+"""
+
+import numpy as np
+
+from calculos import newton_acotado
+from convenciones import CONVENCIONES, fraccion_anual
+
+# Archivo de flujos: una fila por flujo; "monto" negativo para desembolsos
+COLUMNAS_FLUJOS = ("proyecto", "fecha", "monto")
+# Intervalo de búsqueda de la TIR (por período o anual) y punto de partida
+TIR_MINIMA, TIR_MAXIMA, TIR_INICIAL = -0.99, 10.0, 0.1
+
+# --- Forma plana ---
+
+def aplanar(montos, valores=None, indptr=None):
+    """Lleva los flujos a forma plana: devuelve (montos, valores, indptr).
+
+    Sin `indptr`, `montos` es una matriz rellena con NaN (y `valores`, si se
+    da, una matriz de la misma forma con tiempos o fechas). Con `indptr` los
+    arreglos ya son planos y solo se validan.
+    """
+    montos = np.asarray(montos, dtype=float)
+    if indptr is None:
+        montos = np.atleast_2d(montos)
+        presentes = ~np.isnan(montos)
+        indptr = np.concatenate(([0], np.cumsum(presentes.sum(axis=1))))
+        if valores is not None:
+            valores = np.asarray(valores)
+            if valores.shape != montos.shape:
+                raise ValueError("Los tiempos o fechas deben tener la misma forma que los montos")
+            valores = valores[presentes]
+        return montos[presentes], valores, indptr
+
+    indptr = np.asarray(indptr, dtype=np.int64)
+    if indptr[0] != 0 or indptr[-1] != len(montos) or np.any(np.diff(indptr) < 0):
+        raise ValueError("indptr debe empezar en 0, no decrecer y terminar en el número de flujos")
+    if valores is not None and len(valores) != len(montos):
+        raise ValueError("Los tiempos o fechas deben tener un valor por flujo")
+    if np.any(np.isnan(montos)):
+        raise ValueError("Hay montos vacíos o no válidos")
+    return montos, valores, indptr
+
+def _filas(indptr):
+    """Proyecto de cada flujo"""
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+def _periodos(indptr):
+    """Posición de cada flujo dentro de su proyecto: 0, 1, 2, ..."""
+    return np.arange(indptr[-1]) - np.repeat(indptr[:-1], np.diff(indptr))
+
+def tiempos_fechas(fechas, indptr, convencion="Actual/365"):
+    """Fracción de año de cada flujo desde la primera fecha de su proyecto"""
+    if convencion not in CONVENCIONES:
+        raise ValueError(f"Convención no válida: '{convencion}' (use {', '.join(CONVENCIONES)})")
+    fechas = np.asarray(fechas, dtype="datetime64[D]")
+    if len(fechas) == 0:
+        return np.zeros(0)
+    conteos = np.diff(indptr)
+    iniciales = np.repeat(fechas[indptr[:-1][conteos > 0]], conteos[conteos > 0])
+    return np.asarray(fraccion_anual(iniciales, fechas, convencion), dtype=float)
+
+# --- Valor Presente Neto ---
+
+def vpn_plano(tasa, montos, tiempos, indptr):
+    """VPN de cada proyecto a partir de flujos planos y sus tiempos en períodos (o años)"""
+    filas = _filas(indptr)
+    tasa = np.broadcast_to(np.asarray(tasa, dtype=float), (len(indptr) - 1,))
+    # (1 + r)^-t = exp(-t·log(1 + r)) para todos los flujos a la vez
+    factores = np.exp(-np.asarray(tiempos, dtype=float) * np.log1p(tasa)[filas])
+    return np.bincount(filas, weights=montos * factores, minlength=len(indptr) - 1)
+
+def vpn_lote(tasa, montos, tiempos=None, indptr=None):
+    """VPN de un lote de proyectos con flujos en períodos regulares (el primero en t = 0).
+
+    `tasa` es la tasa por período, una para todos o una por proyecto. Sin
+    `tiempos`, el flujo k de cada proyecto ocurre en el período k.
+    """
+    montos, tiempos, indptr = aplanar(montos, tiempos, indptr)
+    if tiempos is None:
+        tiempos = _periodos(indptr)
+    return vpn_plano(tasa, montos, tiempos, indptr)
+
+def xvpn_lote(tasa, montos, fechas, indptr=None, convencion="Actual/365"):
+    """VPN de un lote de proyectos con flujos en fechas irregulares (tasa anual efectiva)"""
+    montos, fechas, indptr = aplanar(montos, fechas, indptr)
+    return vpn_plano(tasa, montos, tiempos_fechas(fechas, indptr, convencion), indptr)
+
+# --- Tasa Interna de Retorno ---
+
+def tir_plano(montos, tiempos, indptr, bajo=TIR_MINIMA, alto=TIR_MAXIMA, x0=TIR_INICIAL,
+              tolerancia=1e-10, max_iteraciones=100):
+    """TIR de cada proyecto a partir de flujos planos; devuelve (tir, convergio, iteraciones).
+
+    Solo se busca una raíz cuando el VPN cambia de signo entre `bajo` y
+    `alto`. Los proyectos sin ese cambio de signo (o sin flujos) quedan con
+    NaN y convergio=False, aunque tengan TIR dentro del intervalo: p. ej.
+    [-100, 230, -132] tiene TIR de 10% y 20% pero el mismo signo en ambos
+    extremos.
+    """
+    filas = _filas(indptr)
+    tiempos = np.asarray(tiempos, dtype=float)
+    proyectos = len(indptr) - 1
+    conteos = np.diff(indptr)
+    inicios = indptr[:-1][conteos > 0]
+
+    def funcion(x):
+        # Con tasas cercanas a -1 y horizontes largos (1 + r)^-t desborda: cada
+        # proyecto se escala por su mayor factor y luego por la suma de sus flujos
+        # descontados en valor absoluto. Así el VPN queda relativo (la tolerancia
+        # no se cumple solo porque los factores sean diminutos) sin cambiar su
+        # signo ni el paso de Newton f/f'
+        x = np.broadcast_to(x, (proyectos,))
+        exponentes = -tiempos * np.log1p(x)[filas]
+        escala = np.zeros(proyectos)
+        if len(inicios):
+            escala[conteos > 0] = np.maximum.reduceat(exponentes, inicios)
+        factores = np.exp(exponentes - escala[filas])
+        magnitud = np.bincount(filas, weights=np.abs(montos) * factores, minlength=proyectos)
+        magnitud[magnitud == 0] = 1.0
+        f = np.bincount(filas, weights=montos * factores, minlength=proyectos) / magnitud
+        df = np.bincount(filas, weights=-tiempos * montos * factores, minlength=proyectos) / ((1 + x) * magnitud)
+        return f, df
+
+    tir, convergio, iteraciones = newton_acotado(
+        funcion, np.full(proyectos, bajo), np.full(proyectos, alto), x0, tolerancia, max_iteraciones
+    )
+    # Sin flujos el VPN es 0 para cualquier tasa: no hay TIR
+    convergio &= conteos > 0
+    return np.where(convergio, tir, np.nan), convergio, iteraciones
+
+def tir_lote(montos, tiempos=None, indptr=None, **opciones):
+    """TIR por período de un lote de proyectos con flujos regulares; devuelve (tir, convergio, iteraciones)"""
+    montos, tiempos, indptr = aplanar(montos, tiempos, indptr)
+    if tiempos is None:
+        tiempos = _periodos(indptr)
+    return tir_plano(montos, tiempos, indptr, **opciones)
+
+def xtir_lote(montos, fechas, indptr=None, convencion="Actual/365", **opciones):
+    """TIR anual efectiva de un lote de proyectos con fechas irregulares; devuelve (tir, convergio, iteraciones)"""
+    montos, fechas, indptr = aplanar(montos, fechas, indptr)
+    return tir_plano(montos, tiempos_fechas(fechas, indptr, convencion), indptr, **opciones)
+
+# --- Archivos de flujos ---
+
+def leer_flujos(datos):
+    """Ordena un DataFrame de flujos por proyecto y fecha; devuelve (proyectos, montos, fechas, indptr)"""
+    import pandas as pd
+
+    faltantes = [columna for columna in COLUMNAS_FLUJOS if columna not in datos.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+    try:
+        fechas = pd.to_datetime(datos["fecha"]).to_numpy(dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        raise ValueError("La columna fecha tiene valores que no son fechas") from None
+    montos = pd.to_numeric(datos["monto"], errors="coerce").to_numpy(dtype=float)
+    if np.any(np.isnan(montos)) or np.any(np.isnat(fechas)):
+        raise ValueError("Hay filas con monto o fecha vacíos o no válidos")
+
+    # Proyectos en orden alfabético; dentro de cada uno, flujos por fecha
+    # pd.factorize agrupa por hash: ordenar millones de textos con np.unique es mucho más lento
+    codigos, proyectos = pd.factorize(datos["proyecto"].astype(str), sort=True)
+    proyectos = np.asarray(proyectos)
+    orden = np.lexsort((fechas, codigos))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(codigos, minlength=len(proyectos)))))
+    return proyectos, montos[orden], fechas[orden], indptr
+
+def evaluar_flujos(datos, tasa, convencion="Actual/365"):
+    """XVPN y XTIR de cada proyecto de un archivo de flujos, como DataFrame"""
+    import pandas as pd
+
+    proyectos, montos, fechas, indptr = leer_flujos(datos)
+    tiempos = tiempos_fechas(fechas, indptr, convencion)
+    filas = _filas(indptr)
+    tir, convergio, _ = tir_plano(montos, tiempos, indptr)
+    return pd.DataFrame({
+        "proyecto": proyectos,
+        "flujos": np.diff(indptr),
+        "fecha_inicial": fechas[indptr[:-1]],
+        "fecha_final": fechas[indptr[1:] - 1],
+        "invertido": -np.bincount(filas, weights=np.minimum(montos, 0), minlength=len(proyectos)),
+        "recibido": np.bincount(filas, weights=np.maximum(montos, 0), minlength=len(proyectos)),
+        "xvpn": vpn_plano(tasa, montos, tiempos, indptr),
+        "xtir": tir,
+        "convergio": convergio,
+    })
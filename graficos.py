@@ -0,0 +1,236 @@
+"""Gráficos de la Calculadora Financiera.
+
+Las series se calculan con las funciones vectorizadas de ``calculos``. En
+horizontes largos con resolución fina se reducen en el servidor a un número
+fijo de puntos y se dibujan con WebGL, así el navegador nunca recibe cientos
+de miles de marcadores.
+"""
+
+import numpy as np
+
+from calculos import (
+    FRECUENCIAS, interes_simple_vf_lote, interes_compuesto_vf_lote, interes_compuesto_vp_lote,
+    anualidad_vf_lote, anualidad_simple_vf_lote, total_aportado_lote,
+)
+
+# Puntos por año de cada resolución del gráfico
+PUNTOS_POR_ANO = {"Anual": 1, "Mensual": 12, "Diaria": 365}
+# Máximo de puntos enviados por serie y tamaño a partir del cual se usa WebGL
+PRESUPUESTO_PUNTOS = 2000
+UMBRAL_WEBGL = 1000
+# Puntos por eje del mapa de sensibilidad y puntos seleccionables por eje
+PUNTOS_SENSIBILIDAD = 500
+PUNTOS_SELECCION = 50
+
+def indices_min_max(valores, max_puntos):
+    """Índices que conservan la forma de una serie con como máximo `max_puntos` puntos.
+
+    Divide la serie en cubetas y de cada una guarda el mínimo y el máximo,
+    además del primer y último punto, de modo que los picos no se pierden.
+    """
+    total = len(valores)
+    if total <= max_puntos:
+        return np.arange(total)
+
+    # Dos puntos por cubeta, reservando el primero y el último
+    cubetas = max((max_puntos - 2) // 2, 1)
+    tamano = -(-total // cubetas)
+    relleno = np.pad(valores, (0, cubetas * tamano - total), mode="edge").reshape(cubetas, tamano)
+    base = np.arange(cubetas) * tamano
+    indices = np.concatenate((
+        [0, total - 1],
+        np.minimum(base + relleno.argmin(axis=1), total - 1),
+        np.minimum(base + relleno.argmax(axis=1), total - 1),
+    ))
+    return np.unique(indices)
+
+def _aportes_a_la_fecha(aporte, tasa, periodos, tiempo_max, capitalizacion, crecimiento=0.0, anticipada=False):
+    """Devuelve (aportado, simple, compuesto) de los aportes hechos hasta cada fecha de `periodos`.
+
+    Solo cuentan los aportes enteros ya realizados (vencidos al final de cada
+    período, anticipados al inicio); entre dos aportes lo acumulado sigue
+    ganando intereses.
+    """
+    n = FRECUENCIAS[capitalizacion]
+    # Períodos completos transcurridos; el redondeo evita que k/12·12 quede en k - ε
+    transcurridos = np.floor(np.round(periodos * n, 9))
+    if anticipada:
+        pagos = np.minimum(transcurridos + 1, np.floor(np.round(tiempo_max * n, 9)))
+        ultimo = pagos - 1
+    else:
+        pagos = ultimo = transcurridos
+    # Períodos desde el último aporte hasta cada fecha
+    espera = periodos * n - ultimo
+    tiempo = pagos / n
+    aportado = total_aportado_lote(aporte, tiempo, capitalizacion, crecimiento)
+    simple = anualidad_simple_vf_lote(aporte, tasa, tiempo, capitalizacion, crecimiento)[0] + tasa / n * espera * aportado
+    compuesto = anualidad_vf_lote(aporte, tasa, tiempo, capitalizacion, crecimiento)[0] * np.power(1 + tasa / n, espera)
+    return aportado, simple, compuesto
+
+def calcular_series_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual", resolucion="Anual",
+                                aporte=0.0, crecimiento=0.0, anticipada=False):
+    """Devuelve (años, simple, compuesto) a la resolución indicada en una sola pasada vectorizada.
+
+    Con `aporte` se suma un aporte por período de capitalización (anualidad
+    vencida o anticipada, creciente con `crecimiento`) a ambas series.
+    """
+    puntos_por_ano = PUNTOS_POR_ANO[resolucion]
+    periodos = np.arange(0, tiempo_max * puntos_por_ano + 1) / puntos_por_ano
+    valores_simple, _ = interes_simple_vf_lote(capital, tasa, periodos)
+    valores_compuesto, _ = interes_compuesto_vf_lote(capital, tasa, periodos, capitalizacion)
+    if aporte:
+        _, simple, compuesto = _aportes_a_la_fecha(aporte, tasa, periodos, tiempo_max, capitalizacion, crecimiento, anticipada)
+        valores_simple = valores_simple + simple
+        valores_compuesto = valores_compuesto + compuesto
+    return periodos, valores_simple, valores_compuesto
+
+def construir_tabla_comparacion(series, tiempo_max, resolucion="Anual", completa=False):
+    """Tabla comparativa con columnas numéricas a partir de (años, simple, compuesto)"""
+    # Importación diferida: pandas solo se carga cuando se arma una tabla
+    import pandas as pd
+
+    periodos, simples, compuestos = series
+    if not completa:
+        # Resumen: como máximo ~10 filas en años enteros
+        paso = max(1, tiempo_max // 10) * PUNTOS_POR_ANO[resolucion]
+        periodos, simples, compuestos = periodos[::paso], simples[::paso], compuestos[::paso]
+
+    diferencia = compuestos - simples
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ventaja = np.where(simples > 0, diferencia / simples, 0.0)
+
+    return pd.DataFrame({
+        "Año": periodos.astype(np.int64) if resolucion == "Anual" else periodos,
+        "Interés Simple": simples,
+        "Interés Compuesto": compuestos,
+        "Diferencia": diferencia,
+        "Ventaja": ventaja,
+    })
+
+def crear_grafico_comparacion(capital, tasa, tiempo_max, capitalizacion="Anual", resolucion="Anual",
+                              max_puntos=PRESUPUESTO_PUNTOS, aporte=0.0, crecimiento=0.0, anticipada=False):
+    """Crea gráfico comparativo interactivo"""
+    # Importación diferida: Plotly solo se carga cuando se dibuja un gráfico
+    import plotly.graph_objects as go
+
+    periodos, valores_simple, valores_compuesto = calcular_series_comparacion(
+        capital, tasa, tiempo_max, capitalizacion, resolucion, aporte, crecimiento, anticipada
+    )
+
+    # Series grandes: reducción en el servidor, solo líneas y trazas WebGL
+    grande = len(periodos) > UMBRAL_WEBGL
+    Traza = go.Scattergl if grande else go.Scatter
+    modo = 'lines' if grande else 'lines+markers'
+
+    # Crear gráfico con Plotly
+    fig = go.Figure()
+
+    for nombre, valores, color in (
+        ('Interés Simple', valores_simple, '#ff7f0e'),
+        ('Interés Compuesto', valores_compuesto, '#1f77b4'),
+    ):
+        indices = indices_min_max(valores, max_puntos)
+        fig.add_trace(Traza(
+            x=periodos[indices],
+            y=valores[indices],
+            mode=modo,
+            name=nombre,
+            line=dict(color=color, width=3),
+            marker=dict(size=6)
+        ))
+
+    if aporte:
+        # Flujo de aportes: capital inicial más lo aportado hasta cada fecha, sin intereses
+        aportado = capital + _aportes_a_la_fecha(aporte, tasa, periodos, tiempo_max, capitalizacion, crecimiento, anticipada)[0]
+        indices = indices_min_max(aportado, max_puntos)
+        fig.add_trace(Traza(
+            x=periodos[indices],
+            y=aportado[indices],
+            mode='lines',
+            name='Total Aportado',
+            line=dict(color='#7f7f7f', width=2, dash='dot', shape='hv')
+        ))
+
+    fig.update_layout(
+        title=f'Comparación de Crecimiento: Simple vs Compuesto',
+        xaxis_title='Tiempo (Años)',
+        yaxis_title='Valor ($)',
+        hovermode='x unified',
+        template='plotly_white',
+        height=500
+    )
+
+    return fig
+
+def agregar_abanico(fig, simulacion, max_puntos=PRESUPUESTO_PUNTOS):
+    """Devuelve una copia de `fig` con las bandas de percentiles de una simulación de tasas"""
+    import plotly.graph_objects as go
+
+    # Copia: la figura original puede estar compartida en la caché
+    fig = go.Figure(fig)
+    anos, bandas, percentiles = simulacion["anos"], simulacion["bandas"], simulacion["percentiles"]
+    Traza = go.Scattergl if len(anos) > UMBRAL_WEBGL else go.Scatter
+    mitad = len(percentiles) // 2
+    indices = indices_min_max(bandas[mitad], max_puntos)
+
+    # De la banda exterior a la interior; cada banda rellena hasta la traza anterior
+    for k in range(mitad):
+        opacidad = 0.12 + 0.12 * k
+        fig.add_trace(Traza(
+            x=anos[indices], y=bandas[-1 - k][indices], mode='lines',
+            line=dict(width=0, color='#2ca02c'), showlegend=False, hoverinfo='skip',
+        ))
+        fig.add_trace(Traza(
+            x=anos[indices], y=bandas[k][indices], mode='lines', fill='tonexty',
+            fillcolor=f'rgba(44, 160, 44, {opacidad:.2f})', line=dict(width=0, color='#2ca02c'),
+            name=f'P{percentiles[k]}–P{percentiles[-1 - k]}', hoverinfo='skip',
+        ))
+    if len(percentiles) % 2:
+        fig.add_trace(Traza(
+            x=anos[indices], y=bandas[mitad][indices], mode='lines',
+            name=f'Mediana simulada (P{percentiles[mitad]})', line=dict(color='#2ca02c', width=2, dash='dash'),
+        ))
+    return fig
+
+def calcular_sensibilidad(monto, tasas, tiempos, calculo="VF", capitalizaciones=tuple(FRECUENCIAS)):
+    """Evalúa VF o VP en la malla capitalización × tasa × tiempo con una sola operación vectorizada.
+
+    Devuelve un arreglo de forma (capitalizaciones, tasas, tiempos).
+    """
+    n = np.array([FRECUENCIAS[capitalizacion] for capitalizacion in capitalizaciones], dtype=float)[:, None, None]
+    tasas = np.asarray(tasas, dtype=float)[None, :, None]
+    tiempos = np.asarray(tiempos, dtype=float)[None, None, :]
+    funcion = interes_compuesto_vf_lote if calculo == "VF" else interes_compuesto_vp_lote
+    valores, _ = funcion(monto, tasas, tiempos, n)
+    return valores
+
+def crear_mapa_sensibilidad(tasas, tiempos, valores, calculo="VF", vista="mapa"):
+    """Mapa de calor (o superficie 3D) del valor según tasa y tiempo"""
+    import plotly.graph_objects as go
+
+    tasas_pct = np.asarray(tasas) * 100
+    titulo = f'{calculo} ($)'
+    if vista == "superficie":
+        fig = go.Figure(go.Surface(x=tiempos, y=tasas_pct, z=valores, colorscale='Viridis', colorbar=dict(title=titulo)))
+        fig.update_layout(scene=dict(xaxis_title='Tiempo (Años)', yaxis_title='Tasa Anual (%)', zaxis_title=titulo))
+    else:
+        fig = go.Figure(go.Heatmap(
+            x=tiempos, y=tasas_pct, z=valores, colorscale='Viridis', colorbar=dict(title=titulo),
+            hovertemplate='Tiempo: %{x:.2f} años<br>Tasa: %{y:.2f}%<br>' + calculo + ': $%{z:,.2f}<extra></extra>',
+        ))
+        # Marcadores invisibles: los mapas de calor no admiten selección, estos sí
+        paso_x = max(1, len(tiempos) // PUNTOS_SELECCION)
+        paso_y = max(1, len(tasas_pct) // PUNTOS_SELECCION)
+        malla_x, malla_y = np.meshgrid(tiempos[::paso_x], tasas_pct[::paso_y])
+        fig.add_trace(go.Scatter(
+            x=malla_x.ravel(), y=malla_y.ravel(), mode='markers', marker=dict(opacity=0),
+            hoverinfo='skip', showlegend=False,
+        ))
+        fig.update_layout(xaxis_title='Tiempo (Años)', yaxis_title='Tasa Anual (%)', dragmode='select')
+
+    fig.update_layout(
+        title=f'Sensibilidad del {calculo} a la Tasa y el Tiempo',
+        template='plotly_white',
+        height=550
+    )
+    return fig
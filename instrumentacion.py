@@ -0,0 +1,157 @@
+"""Instrumentación opcional de la Calculadora Financiera.
+
+Mide el tiempo de cada sección, de los cálculos y de la construcción y envío
+de gráficos y tablas, y cuenta las ejecuciones completas por sesión. Se activa
+con variables de entorno al arrancar el servidor:
+
+    ARIANE_PERFILADO=1                       activa la instrumentación
+    ARIANE_PERFILADO_ARCHIVO=ariane.prom     exporta tras cada ejecución
+                                             (Prometheus, o JSON si termina en .json)
+
+Desactivada, ``instrumentar`` devuelve la función original y ``medir`` un
+contexto vacío compartido, así el costo en cada ejecución es prácticamente nulo.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ACTIVA = os.environ.get("ARIANE_PERFILADO", "").strip().lower() in ("1", "true", "si", "sí")
+ARCHIVO_EXPORTACION = os.environ.get("ARIANE_PERFILADO_ARCHIVO") or None
+PREFIJO_METRICAS = "ariane"
+
+_NULO = contextlib.nullcontext()
+# Estado compartido por todas las sesiones del proceso
+_lock = threading.Lock()
+_llamadas = Counter()
+_segundos = Counter()
+_maximos = {}
+_ejecuciones = Counter()
+# Desglose de la ejecución en curso: cada sesión ejecuta el script en su propio hilo
+_hilo = threading.local()
+
+# --- Registro ---
+
+def registrar(nombre, segundos):
+    """Acumula una medición en el registro compartido y en la ejecución en curso"""
+    with _lock:
+        _llamadas[nombre] += 1
+        _segundos[nombre] += segundos
+        _maximos[nombre] = max(_maximos.get(nombre, 0.0), segundos)
+    detalle = getattr(_hilo, "detalle", None)
+    if detalle is not None:
+        detalle[nombre] += segundos
+
+@contextlib.contextmanager
+def _medir(nombre):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nombre, time.perf_counter() - inicio)
+
+def medir(nombre):
+    """Contexto que mide el bloque `nombre`; vacío si la instrumentación está desactivada"""
+    return _medir(nombre) if ACTIVA else _NULO
+
+def instrumentar(nombre):
+    """Decorador que mide cada llamada a la función como `nombre`"""
+    def decorador(funcion):
+        if not ACTIVA:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with _medir(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def iniciar_ejecucion():
+    """Marca el comienzo de una ejecución completa del script en este hilo"""
+    _hilo.detalle = Counter()
+    _hilo.inicio = time.perf_counter()
+
+def finalizar_ejecucion(sesion):
+    """Cierra la ejecución en curso y devuelve su desglose {sección: segundos}"""
+    detalle = getattr(_hilo, "detalle", None)
+    if detalle is None:
+        return {}
+    _hilo.detalle = None
+    total = time.perf_counter() - _hilo.inicio
+    registrar("ejecucion", total)
+    with _lock:
+        _ejecuciones[sesion] += 1
+    detalle["ejecucion"] = total
+    return dict(detalle)
+
+def reiniciar():
+    """Vacía el registro compartido"""
+    with _lock:
+        for contador in (_llamadas, _segundos, _maximos, _ejecuciones):
+            contador.clear()
+
+def instantanea():
+    """Copia consistente del registro: secciones y ejecuciones por sesión"""
+    with _lock:
+        return {
+            "secciones": {
+                nombre: {
+                    "llamadas": llamadas,
+                    "segundos": _segundos[nombre],
+                    "promedio_s": _segundos[nombre] / llamadas,
+                    "maximo_s": _maximos[nombre],
+                }
+                for nombre, llamadas in _llamadas.items()
+            },
+            "ejecuciones_por_sesion": dict(_ejecuciones),
+        }
+
+# --- Exportación ---
+
+def a_json(datos=None):
+    """Registro como texto JSON"""
+    return json.dumps(datos or instantanea(), indent=2, ensure_ascii=False)
+
+def _etiqueta(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def a_prometheus(datos=None):
+    """Registro en el formato de texto de Prometheus"""
+    datos = datos or instantanea()
+    secciones = datos["secciones"]
+    metricas = (
+        ("seccion_llamadas_total", "counter", "Llamadas medidas por sección", "llamadas"),
+        ("seccion_segundos_total", "counter", "Tiempo acumulado por sección", "segundos"),
+        ("seccion_segundos_max", "gauge", "Tiempo máximo de una llamada por sección", "maximo_s"),
+    )
+    lineas = []
+    for nombre, tipo, ayuda, campo in metricas:
+        lineas += [f"# HELP {PREFIJO_METRICAS}_{nombre} {ayuda}", f"# TYPE {PREFIJO_METRICAS}_{nombre} {tipo}"]
+        lineas += [
+            f'{PREFIJO_METRICAS}_{nombre}{{seccion="{_etiqueta(seccion)}"}} {valores[campo]:.9g}'
+            for seccion, valores in sorted(secciones.items())
+        ]
+    nombre = f"{PREFIJO_METRICAS}_ejecuciones_total"
+    lineas += [f"# HELP {nombre} Ejecuciones completas del script por sesión", f"# TYPE {nombre} counter"]
+    lineas += [
+        f'{nombre}{{sesion="{_etiqueta(sesion)}"}} {total}'
+        for sesion, total in sorted(datos["ejecuciones_por_sesion"].items())
+    ]
+    return "\n".join(lineas) + "\n"
+
+def exportar(ruta=None):
+    """Escribe el registro en `ruta` de forma atómica para que un recolector lo lea entero"""
+    ruta = ruta or ARCHIVO_EXPORTACION
+    if not ruta:
+        return
+    contenido = a_json() if ruta.endswith(".json") else a_prometheus()
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(ruta)), suffix=".tmp")
+    with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
@@ -0,0 +1,172 @@
+"""Procesamiento por lotes de solicitudes de cálculo en formato JSONL.
+
+Uso:
+    python -m ariane batch entrada.jsonl salida.jsonl [--procesos N] [--tamano-bloque N]
+
+Cada línea de entrada es un objeto JSON con la función a ejecutar y sus
+argumentos con los mismos nombres que en ``calculos``, por ejemplo:
+
+    {"id": 7, "funcion": "interes_compuesto_vf", "capital": 10000,
+     "tasa_anual": 0.08, "tiempo": 5, "capitalizacion": "Mensual"}
+
+Cada línea de salida conserva el "id" y añade "valor" e "interes", o bien
+"error" si la solicitud no se pudo resolver. El orden de salida es el de entrada.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calculos import (
+    interes_simple_vf,
+    interes_simple_vp,
+    interes_compuesto_vf,
+    interes_compuesto_vp,
+)
+
+FUNCIONES = {
+    "interes_simple_vf": interes_simple_vf,
+    "interes_simple_vp": interes_simple_vp,
+    "interes_compuesto_vf": interes_compuesto_vf,
+    "interes_compuesto_vp": interes_compuesto_vp,
+}
+TAMANO_BLOQUE = 1000
+
+def resolver_solicitud(linea):
+    """Ejecuta una solicitud JSON y devuelve el diccionario de respuesta"""
+    try:
+        solicitud = json.loads(linea)
+    except json.JSONDecodeError as error:
+        return {"error": f"JSON no válido: {error}"}
+    if not isinstance(solicitud, dict):
+        return {"error": "Cada línea debe ser un objeto JSON"}
+
+    respuesta = {"id": solicitud.pop("id")} if "id" in solicitud else {}
+    nombre = solicitud.pop("funcion", None)
+    funcion = FUNCIONES.get(nombre)
+    if funcion is None:
+        respuesta["error"] = f"Función desconocida: {nombre!r} (use {', '.join(FUNCIONES)})"
+        return respuesta
+
+    try:
+        valor, interes = funcion(**solicitud)
+    except KeyError as error:
+        respuesta["error"] = f"Capitalización no válida: {error}"
+    except (TypeError, ValueError, ArithmeticError) as error:
+        respuesta["error"] = str(error)
+    else:
+        # Potencias de bases negativas dan complejos; desbordes, infinitos
+        if all(isinstance(x, (int, float)) and math.isfinite(x) for x in (valor, interes)):
+            respuesta["valor"] = valor
+            respuesta["interes"] = interes
+        else:
+            respuesta["error"] = "El resultado no es un número finito con estos argumentos"
+    return respuesta
+
+def serializar_respuesta(respuesta):
+    """Serializa una respuesta como JSON estricto; devuelve (línea, con_error).
+
+    Si algo no es serializable (p. ej. un "id" NaN) la línea pasa a ser un
+    error, así ninguna solicitud puede interrumpir el lote.
+    """
+    try:
+        return json.dumps(respuesta, ensure_ascii=False, allow_nan=False), "error" in respuesta
+    except (TypeError, ValueError) as error:
+        fallo = {"error": f"Respuesta no serializable: {error}"}
+    try:
+        return json.dumps({"id": respuesta["id"], **fallo}, ensure_ascii=False, allow_nan=False), True
+    except (KeyError, TypeError, ValueError):
+        return json.dumps(fallo, ensure_ascii=False), True
+
+def procesar_bloque(lineas):
+    """Resuelve un bloque de líneas; devuelve sus respuestas serializadas y cuántas fallaron"""
+    serializadas = [serializar_respuesta(resolver_solicitud(linea)) for linea in lineas]
+    return [linea for linea, _ in serializadas], sum(con_error for _, con_error in serializadas)
+
+def leer_bloques(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """Agrupa las líneas no vacías de un archivo en bloques sin leerlo completo"""
+    bloque = []
+    for linea in archivo:
+        if linea.strip():
+            bloque.append(linea)
+            if len(bloque) >= tamano_bloque:
+                yield bloque
+                bloque = []
+    if bloque:
+        yield bloque
+
+def procesar_en_paralelo(bloques, procesos=None):
+    """Reparte los bloques en un grupo de procesos y entrega los resultados en orden.
+
+    Solo se mantienen en vuelo unos pocos bloques por proceso, así la memoria
+    no crece con el tamaño del archivo.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        yield from map(procesar_bloque, bloques)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        pendientes = deque()
+        for bloque in bloques:
+            pendientes.append(grupo.submit(procesar_bloque, bloque))
+            if len(pendientes) >= 2 * procesos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+def _abrir(ruta, modo):
+    """Abre una ruta de texto en UTF-8, o stdin/stdout si la ruta es '-'"""
+    if ruta == "-":
+        return open((sys.stdin if "r" in modo else sys.stdout).fileno(), modo, encoding="utf-8", closefd=False)
+    return open(ruta, modo, encoding="utf-8")
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="python -m ariane batch",
+        description="Procesa solicitudes de cálculo de interés en formato JSONL.",
+    )
+    parser.add_argument("entrada", help="archivo JSONL de solicitudes ('-' para stdin)")
+    parser.add_argument("salida", help="archivo JSONL de resultados ('-' para stdout)")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos de trabajo (por defecto, uno por CPU)")
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE, help=f"solicitudes por bloque (por defecto {TAMANO_BLOQUE})")
+    args = parser.parse_args(argv)
+    if args.tamano_bloque < 1 or (args.procesos is not None and args.procesos < 1):
+        parser.error("--procesos y --tamano-bloque deben ser mayores que cero")
+
+    # Un archivo inexistente o sin permisos es un error de uso, no una excepción
+    try:
+        entrada = _abrir(args.entrada, "r")
+    except OSError as error:
+        parser.error(f"no se pudo abrir la entrada '{args.entrada}': {error.strerror or error}")
+    try:
+        salida = _abrir(args.salida, "w")
+    except OSError as error:
+        entrada.close()
+        parser.error(f"no se pudo abrir la salida '{args.salida}': {error.strerror or error}")
+
+    inicio = time.perf_counter()
+    total = errores = 0
+    with entrada, salida:
+        for respuestas, fallidas in procesar_en_paralelo(leer_bloques(entrada, args.tamano_bloque), args.procesos):
+            for respuesta in respuestas:
+                salida.write(respuesta + "\n")
+            total += len(respuestas)
+            errores += fallidas
+
+    duracion = time.perf_counter() - inicio
+    velocidad = total / duracion if duracion > 0 else 0.0
+    print(
+        f"{total:,} solicitudes ({errores:,} con error) en {duracion:.2f} s: {velocidad:,.0f} solicitudes/s",
+        file=sys.stderr,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Presupuesto de memoria por sesión.
+
+Los objetos propios de una sesión (figuras y tablas que no se comparten entre
+sesiones) se retienen en un registro común con un espacio por tipo y sesión,
+así los reruns de un fragmento con las mismas entradas los reutilizan sin
+volver a copiarlos. Cada sesión tiene un presupuesto de bytes: al superarlo
+se liberan sus objetos usados hace más tiempo. Las sesiones sin actividad
+durante un tiempo liberan todos sus objetos.
+
+Configuración por variables de entorno: ARIANE_MEMORIA_SESION_MB (por defecto
+64) y ARIANE_INACTIVIDAD_SESION_S (por defecto 600).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+PRESUPUESTO_BYTES = int(float(os.environ.get("ARIANE_MEMORIA_SESION_MB") or 64) * 1024 * 1024)
+INACTIVIDAD_SEGUNDOS = float(os.environ.get("ARIANE_INACTIVIDAD_SESION_S") or 600)
+# Las sesiones inactivas se buscan como mucho una vez por intervalo (o por período de inactividad)
+INTERVALO_BARRIDO = 30.0
+
+def crear_registro():
+    """Registro compartido: objetos y última actividad de cada sesión, con su cerrojo"""
+    return {"lock": threading.Lock(), "sesiones": {}, "barrido": time.monotonic()}
+
+def estimar_bytes(valor):
+    """Bytes aproximados de un objeto: arreglos, DataFrames, figuras de Plotly o bytes"""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if hasattr(valor, "memory_usage"):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if hasattr(valor, "data") and hasattr(valor, "layout"):
+        # Figura: dominan los arreglos de las trazas
+        return sum(
+            np.asarray(datos).nbytes
+            for traza in valor.data
+            for datos in (getattr(traza, eje, None) for eje in ("x", "y", "z"))
+            if datos is not None
+        )
+    if isinstance(valor, (tuple, list)):
+        return sum(estimar_bytes(elemento) for elemento in valor)
+    return sys.getsizeof(valor)
+
+def _sesion(registro, sesion, ahora):
+    datos = registro["sesiones"].setdefault(sesion, {"activa": ahora, "objetos": OrderedDict(), "bytes": 0})
+    datos["activa"] = ahora
+    return datos
+
+def _liberar(datos, tipo):
+    _, _, tamano = datos["objetos"].pop(tipo)
+    datos["bytes"] -= tamano
+
+def tocar(registro, sesion, inactividad=None):
+    """Marca la actividad de la sesión y libera las inactivas; devuelve las sesiones liberadas"""
+    inactividad = INACTIVIDAD_SEGUNDOS if inactividad is None else inactividad
+    ahora = time.monotonic()
+    with registro["lock"]:
+        _sesion(registro, sesion, ahora)
+        if ahora - registro["barrido"] < min(INTERVALO_BARRIDO, inactividad):
+            return []
+        registro["barrido"] = ahora
+    return liberar_inactivas(registro, inactividad)
+
+def liberar_inactivas(registro, inactividad=None):
+    """Quita del registro las sesiones sin actividad reciente y devuelve sus identificadores"""
+    limite = time.monotonic() - (INACTIVIDAD_SEGUNDOS if inactividad is None else inactividad)
+    with registro["lock"]:
+        inactivas = [sesion for sesion, datos in registro["sesiones"].items() if datos["activa"] < limite]
+        for sesion in inactivas:
+            del registro["sesiones"][sesion]
+    return inactivas
+
+def recuperar(registro, sesion, tipo, entradas):
+    """Objeto retenido para `tipo` si se calculó con las mismas `entradas`, o None"""
+    with registro["lock"]:
+        datos = _sesion(registro, sesion, time.monotonic())
+        objeto = datos["objetos"].get(tipo)
+        if objeto is None or objeto[0] != entradas:
+            return None
+        datos["objetos"].move_to_end(tipo)
+        return objeto[1]
+
+def retener(registro, sesion, tipo, entradas, valor, presupuesto=None):
+    """Retiene `valor` en el espacio `tipo` de la sesión respetando su presupuesto; devuelve `valor`"""
+    presupuesto = PRESUPUESTO_BYTES if presupuesto is None else presupuesto
+    tamano = estimar_bytes(valor)
+    with registro["lock"]:
+        datos = _sesion(registro, sesion, time.monotonic())
+        if tipo in datos["objetos"]:
+            _liberar(datos, tipo)
+        # Un objeto mayor que el presupuesto se usa en esta ejecución pero no se retiene
+        if tamano > presupuesto:
+            return valor
+        while datos["objetos"] and datos["bytes"] + tamano > presupuesto:
+            _liberar(datos, next(iter(datos["objetos"])))
+        datos["objetos"][tipo] = (entradas, valor, tamano)
+        datos["bytes"] += tamano
+    return valor
+
+def uso(registro):
+    """Bytes retenidos por cada sesión"""
+    with registro["lock"]:
+        return {sesion: datos["bytes"] for sesion, datos in registro["sesiones"].items()}
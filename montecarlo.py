@@ -0,0 +1,153 @@
+"""Simulación Monte Carlo del interés compuesto con tasas estocásticas.
+
+Cada trayectoria aplica en cada período de capitalización una tasa perturbada
+por un choque normal (aditivo) o lognormal (multiplicativo). Las trayectorias
+se generan por bloques de memoria acotada, se reparten entre procesos y cada
+bloque solo devuelve un histograma del logaritmo del valor por período, de
+modo que ni el número de trayectorias ni el horizonte hacen crecer la memoria.
+Los percentiles se interpolan después sobre los histogramas acumulados.
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculos import FRECUENCIAS
+
+MODELOS = ("normal", "lognormal")
+PERCENTILES = (5, 25, 50, 75, 95)
+# Memoria de trabajo por bloque y resolución de los histogramas
+MEMORIA_BLOQUE = 64 * 1024 * 1024
+CUBETAS = 4096
+# Desviaciones típicas que cubre el rango de cada histograma
+AMPLITUD_SIGMAS = 10.0
+# Desde este número de trayectorias compensa repartir los bloques entre procesos
+UMBRAL_PROCESOS = 500_000
+
+def tasas_periodicas(tasa_anual, volatilidad, n, choques, modelo="normal"):
+    """Tasa de cada período a partir de choques normales estándar, sobrescribiendo `choques`.
+
+    normal: r = tasa + volatilidad·z. lognormal: r = tasa·exp(volatilidad·z - volatilidad²/2),
+    que conserva la tasa media y nunca es negativa.
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo no válido: '{modelo}' (use {' o '.join(MODELOS)})")
+    # Operaciones en el mismo arreglo: un bloque no crea temporales de su tamaño
+    choques *= volatilidad
+    if modelo == "normal":
+        choques += tasa_anual
+    else:
+        choques -= volatilidad ** 2 / 2
+        np.exp(choques, out=choques)
+        choques *= tasa_anual
+    choques /= n
+    # Un período no puede perder más que todo el capital
+    return np.maximum(choques, -1 + 1e-6, out=choques)
+
+def _rango_histogramas(tasa_anual, volatilidad, n, periodos, modelo, semilla):
+    """Límites del log-crecimiento acumulado de cada período, estimados con una muestra piloto"""
+    piloto = np.log1p(tasas_periodicas(tasa_anual, volatilidad, n,
+                                       np.random.default_rng(semilla).standard_normal(100_000), modelo))
+    k = np.arange(1, periodos + 1)
+    # Teorema central del límite: media k·μ y desviación √k·σ
+    centro = k * piloto.mean()
+    radio = AMPLITUD_SIGMAS * np.sqrt(k) * max(piloto.std(), 1e-12)
+    return centro - radio, centro + radio
+
+def _simular_bloque(trayectorias, tasa_anual, volatilidad, n, periodos, modelo, semilla, bajo, alto):
+    """Simula un bloque y devuelve (histogramas periodos×CUBETAS, suma de valores por período)"""
+    rng = np.random.default_rng(semilla)
+    choques = rng.standard_normal((trayectorias, periodos), dtype=np.float32)
+    # Log-crecimiento acumulado, en el mismo arreglo para no duplicar memoria
+    log_valor = np.log1p(tasas_periodicas(tasa_anual, volatilidad, n, choques, modelo), out=choques)
+    np.cumsum(log_valor, axis=1, out=log_valor)
+    suma = np.exp(log_valor).sum(axis=0, dtype=np.float64)
+
+    log_valor -= bajo.astype(np.float32)
+    log_valor /= ((alto - bajo) / CUBETAS).astype(np.float32)
+    cubeta = log_valor.astype(np.int32)
+    np.clip(cubeta, 0, CUBETAS - 1, out=cubeta)
+    cubeta += np.arange(periodos, dtype=np.int32) * CUBETAS
+    conteos = np.bincount(cubeta.ravel(), minlength=periodos * CUBETAS).reshape(periodos, CUBETAS)
+    return conteos, suma
+
+def _percentiles_histograma(conteos, bajo, alto, percentiles):
+    """Interpola los percentiles de cada fila de histogramas; devuelve percentiles×periodos"""
+    acumulado = np.cumsum(conteos, axis=1)
+    total = acumulado[:, -1:]
+    ancho = (alto - bajo) / conteos.shape[1]
+    resultado = np.empty((len(percentiles), conteos.shape[0]))
+    filas = np.arange(conteos.shape[0])
+    for j, percentil in enumerate(percentiles):
+        objetivo = total[:, 0] * percentil / 100
+        cubeta = np.minimum((acumulado < objetivo[:, None]).sum(axis=1), conteos.shape[1] - 1)
+        anterior = np.where(cubeta > 0, acumulado[filas, cubeta - 1], 0)
+        en_cubeta = np.maximum(conteos[filas, cubeta], 1)
+        fraccion = np.clip((objetivo - anterior) / en_cubeta, 0.0, 1.0)
+        resultado[j] = bajo + (cubeta + fraccion) * ancho
+    return resultado
+
+def simular_tasas(capital, tasa_anual, tiempo, capitalizacion, volatilidad, modelo="normal",
+                  trayectorias=100_000, percentiles=PERCENTILES, semilla=0, procesos=1, tamano_bloque=None):
+    """Distribución del valor futuro con tasas estocásticas.
+
+    Devuelve un diccionario con los años de cada período, el valor medio, los
+    percentiles por período (filas en el orden de `percentiles`) y el
+    valor determinista con la tasa fija, todos como arreglos de periodos + 1
+    puntos comenzando en el capital inicial.
+    """
+    if trayectorias < 1:
+        raise ValueError("Se necesita al menos una trayectoria")
+    n = FRECUENCIAS[capitalizacion]
+    periodos = int(round(tiempo * n))
+    if periodos < 1:
+        raise ValueError("El plazo debe cubrir al menos un período de capitalización")
+
+    semillas = np.random.SeedSequence(semilla)
+    piloto, *_ = semillas.spawn(1)
+    bajo, alto = _rango_histogramas(tasa_anual, volatilidad, n, periodos, modelo, piloto)
+
+    # Bloques que caben en MEMORIA_BLOQUE: unos 16 bytes por elemento en el pico
+    # (choques float32, cubetas int32 y su copia int64 en bincount)
+    tamano_bloque = tamano_bloque or max(1, MEMORIA_BLOQUE // (16 * periodos))
+    tamanos = [min(tamano_bloque, trayectorias - inicio) for inicio in range(0, trayectorias, tamano_bloque)]
+    tareas = [
+        (tamano, tasa_anual, volatilidad, n, periodos, modelo, semilla_bloque, bajo, alto)
+        for tamano, semilla_bloque in zip(tamanos, semillas.spawn(len(tamanos)))
+    ]
+
+    conteos = np.zeros((periodos, CUBETAS), dtype=np.int64)
+    suma = np.zeros(periodos)
+    for conteos_bloque, suma_bloque in _ejecutar_bloques(tareas, procesos):
+        conteos += conteos_bloque
+        suma += suma_bloque
+
+    inicial = np.full((len(percentiles), 1), float(capital))
+    return {
+        "anos": np.arange(periodos + 1) / n,
+        "percentiles": tuple(percentiles),
+        "bandas": np.hstack((inicial, capital * np.exp(_percentiles_histograma(conteos, bajo, alto, percentiles)))),
+        "media": np.concatenate(([capital], capital * suma / trayectorias)),
+        "determinista": capital * (1 + tasa_anual / n) ** np.arange(periodos + 1),
+    }
+
+def _ejecutar_bloques(tareas, procesos=1):
+    """Ejecuta los bloques en serie o en un grupo de procesos, con pocos en vuelo a la vez"""
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(tareas) == 1:
+        for tarea in tareas:
+            yield _simular_bloque(*tarea)
+        return
+
+    # "spawn": los procesos no heredan los hilos del servidor de Streamlit
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn")) as grupo:
+        pendientes = deque()
+        for tarea in tareas:
+            pendientes.append(grupo.submit(_simular_bloque, *tarea))
+            if len(pendientes) >= 2 * procesos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
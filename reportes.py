@@ -0,0 +1,234 @@
+"""Reportes de escenarios generados en segundo plano.
+
+Un reporte es un ZIP con un libro (Excel, o CSV si openpyxl no está
+instalado) que reúne el resumen de todos los escenarios y la tabla
+comparativa de cada uno, más una imagen estática de su gráfico comparativo
+(requiere kaleido). Los trabajos se ejecutan en un grupo acotado de procesos,
+con un límite de trabajos en espera, así un lote de cientos de escenarios no
+bloquea la ejecución del script ni a las demás sesiones.
+"""
+
+import importlib.util
+import io
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from calculos import FRECUENCIAS
+from graficos import calcular_series_comparacion, construir_tabla_comparacion, crear_grafico_comparacion
+
+FORMATOS_REPORTE = ("xlsx", "csv")
+# Columnas de un lote de escenarios: "tasa" es la tasa anual en decimal (0.08 = 8%)
+COLUMNAS_ESCENARIOS = ("capital", "tasa", "tiempo")
+# Opcionales: aporte por período de capitalización y su crecimiento anual en decimal
+COLUMNAS_APORTES = ("aporte", "crecimiento")
+MAXIMO_ESCENARIOS = 1000
+# Procesos del grupo (ARIANE_REPORTES_PROCESOS) y trabajos admitidos sin terminar
+PROCESOS = int(os.environ.get("ARIANE_REPORTES_PROCESOS") or 2)
+MAXIMO_PENDIENTES = 8
+# Los reportes terminados se descartan pasado este tiempo
+RETENCION_SEGUNDOS = 3600
+TAMANO_IMAGEN = (1000, 500)
+
+def formatos_disponibles():
+    """Formatos de libro que se pueden generar con las dependencias instaladas"""
+    if importlib.util.find_spec("openpyxl") is None:
+        return ("csv",)
+    return FORMATOS_REPORTE
+
+def imagenes_disponibles():
+    """Indica si kaleido está instalado para exportar gráficos como imagen"""
+    return importlib.util.find_spec("kaleido") is not None
+
+# --- Lotes de escenarios ---
+
+def leer_escenarios(datos):
+    """Valida un DataFrame de escenarios y devuelve una lista de diccionarios"""
+    faltantes = [columna for columna in COLUMNAS_ESCENARIOS if columna not in datos.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+    if len(datos) > MAXIMO_ESCENARIOS:
+        raise ValueError(f"Un reporte admite como máximo {MAXIMO_ESCENARIOS:,} escenarios")
+
+    # Celdas vacías como None para aplicar los valores por defecto
+    datos = datos.astype(object).where(datos.notna(), None)
+    escenarios = []
+    for posicion, fila in enumerate(datos.to_dict("records"), start=1):
+        capitalizacion = fila.get("capitalizacion") or "Anual"
+        if capitalizacion not in FRECUENCIAS:
+            raise ValueError(f"Fila {posicion}: capitalización no válida '{capitalizacion}'")
+        try:
+            capital, tasa, tiempo = float(fila["capital"]), float(fila["tasa"]), int(fila["tiempo"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Fila {posicion}: capital, tasa y tiempo deben ser números") from None
+        if capital <= 0 or tasa <= 0 or tiempo < 1:
+            raise ValueError(f"Fila {posicion}: capital y tasa deben ser positivos y el tiempo de al menos un año")
+        try:
+            aporte, crecimiento = (float(fila.get(columna) or 0.0) for columna in COLUMNAS_APORTES)
+        except (TypeError, ValueError):
+            raise ValueError(f"Fila {posicion}: aporte y crecimiento deben ser números") from None
+        escenarios.append({
+            "nombre": str(fila.get("nombre") or f"Escenario {posicion}"),
+            "capital": capital,
+            "tasa": tasa,
+            "tiempo": tiempo,
+            "capitalizacion": capitalizacion,
+            "aporte": aporte,
+            "crecimiento": crecimiento,
+            "anticipada": str(fila.get("anticipada") or "").strip().lower() in ("1", "1.0", "true", "si", "sí"),
+        })
+    return escenarios
+
+def _nombres_unicos(nombres, largo_maximo, reservados=()):
+    """Nombres de hoja o archivo sin caracteres reservados, recortados y sin repetir"""
+    usados, resultado = {nombre.lower() for nombre in reservados}, []
+    for nombre in nombres:
+        base = re.sub(r"[\[\]:*?/\\]", "_", nombre).strip() or "Escenario"
+        candidato, sufijo = base[:largo_maximo], 1
+        while candidato.lower() in usados:
+            sufijo += 1
+            candidato = f"{base[:largo_maximo - len(str(sufijo)) - 1]}~{sufijo}"
+        usados.add(candidato.lower())
+        resultado.append(candidato)
+    return resultado
+
+# --- Generación ---
+
+def _aportes(escenario):
+    """(aporte, crecimiento, anticipada) de un escenario; los lotes anteriores no los traen"""
+    return escenario.get("aporte", 0.0), escenario.get("crecimiento", 0.0), escenario.get("anticipada", False)
+
+def generar_reporte(escenarios, formato="xlsx", imagenes=True):
+    """Genera el ZIP del reporte y devuelve (bytes, avisos)"""
+    import pandas as pd
+
+    if formato not in FORMATOS_REPORTE:
+        raise ValueError(f"Formato no válido: '{formato}' (use {' o '.join(FORMATOS_REPORTE)})")
+    avisos = []
+    resumen, tablas = [], []
+    for escenario in escenarios:
+        capital, tasa, tiempo, capitalizacion = (escenario[clave] for clave in ("capital", "tasa", "tiempo", "capitalizacion"))
+        aportes = _aportes(escenario)
+        series = calcular_series_comparacion(capital, tasa, tiempo, capitalizacion, "Anual", *aportes)
+        # El último punto de la serie anual es el valor final
+        vf_simple, vf_compuesto = float(series[1][-1]), float(series[2][-1])
+        resumen.append({
+            "Escenario": escenario["nombre"],
+            "Capital": capital,
+            "Tasa": tasa,
+            "Tiempo (años)": tiempo,
+            "Capitalización": capitalizacion,
+            "Aporte por Período": aportes[0],
+            # Sin ellos, planes distintos darían el mismo resumen
+            "Crecimiento del Aporte": aportes[1],
+            "Momento del Aporte": "Inicio del período" if aportes[2] else "Fin del período",
+            "Simple - Valor Final": vf_simple,
+            "Compuesto - Valor Final": vf_compuesto,
+            "Diferencia": vf_compuesto - vf_simple,
+        })
+        tablas.append(construir_tabla_comparacion(series, tiempo, completa=True))
+
+    salida = io.BytesIO()
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as archivo:
+        nombres = [escenario["nombre"] for escenario in escenarios]
+        if formato == "xlsx":
+            libro = io.BytesIO()
+            with pd.ExcelWriter(libro, engine="openpyxl") as escritor:
+                pd.DataFrame(resumen).to_excel(escritor, sheet_name="Resumen", index=False)
+                # Excel limita los nombres de hoja a 31 caracteres
+                for hoja, tabla in zip(_nombres_unicos(nombres, 31, reservados=("Resumen",)), tablas):
+                    tabla.to_excel(escritor, sheet_name=hoja, index=False)
+            archivo.writestr("reporte.xlsx", libro.getvalue())
+        else:
+            archivo.writestr("resumen.csv", pd.DataFrame(resumen).to_csv(index=False))
+            for nombre, tabla in zip(_nombres_unicos(nombres, 100), tablas):
+                archivo.writestr(f"tablas/{nombre}.csv", tabla.to_csv(index=False))
+
+        if imagenes:
+            for nombre, escenario in zip(_nombres_unicos(nombres, 100), escenarios):
+                aporte, crecimiento, anticipada = _aportes(escenario)
+                fig = crear_grafico_comparacion(escenario["capital"], escenario["tasa"], escenario["tiempo"], escenario["capitalizacion"],
+                                                aporte=aporte, crecimiento=crecimiento, anticipada=anticipada)
+                try:
+                    imagen = fig.to_image(format="png", width=TAMANO_IMAGEN[0], height=TAMANO_IMAGEN[1])
+                except Exception as error:  # kaleido ausente o sin navegador: el resto del reporte sigue siendo útil
+                    avisos.append(f"No se pudieron exportar los gráficos: {error}")
+                    break
+                archivo.writestr(f"graficos/{nombre}.png", imagen)
+    return salida.getvalue(), avisos
+
+# --- Cola de trabajos ---
+
+def crear_cola(procesos=PROCESOS, maximo_pendientes=MAXIMO_PENDIENTES):
+    """Cola de trabajos compartida: grupo de procesos, registro de trabajos y su cerrojo"""
+    # "spawn": los procesos no heredan los hilos del servidor de Streamlit
+    grupo = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"))
+    return {"grupo": grupo, "lock": threading.Lock(), "trabajos": {}, "maximo_pendientes": maximo_pendientes}
+
+def _purgar(cola, ahora):
+    """Descarta los trabajos terminados hace más de RETENCION_SEGUNDOS (con el cerrojo tomado)"""
+    vencidos = [
+        clave for clave, trabajo in cola["trabajos"].items()
+        if trabajo["futuro"].done() and ahora - trabajo["creado"] > RETENCION_SEGUNDOS
+    ]
+    for clave in vencidos:
+        del cola["trabajos"][clave]
+
+def enviar_reporte(cola, sesion, descripcion, escenarios, formato="xlsx", imagenes=True):
+    """Encola un reporte para la sesión y devuelve el identificador del trabajo"""
+    if not escenarios:
+        raise ValueError("El reporte no tiene escenarios")
+    with cola["lock"]:
+        ahora = time.time()
+        _purgar(cola, ahora)
+        pendientes = sum(not trabajo["futuro"].done() for trabajo in cola["trabajos"].values())
+        if pendientes >= cola["maximo_pendientes"]:
+            raise RuntimeError("Hay demasiados reportes en curso; inténtelo en unos minutos")
+        clave = uuid.uuid4().hex[:8]
+        cola["trabajos"][clave] = {
+            "sesion": sesion,
+            "descripcion": descripcion,
+            "escenarios": len(escenarios),
+            "formato": formato,
+            "creado": ahora,
+            "futuro": cola["grupo"].submit(generar_reporte, escenarios, formato, imagenes),
+        }
+    return clave
+
+def trabajos_sesion(cola, sesion):
+    """Estado de los trabajos de una sesión, del más reciente al más antiguo"""
+    with cola["lock"]:
+        propios = [(clave, trabajo) for clave, trabajo in cola["trabajos"].items() if trabajo["sesion"] == sesion]
+    estados = []
+    for clave, trabajo in sorted(propios, key=lambda par: par[1]["creado"], reverse=True):
+        futuro = trabajo["futuro"]
+        estado = {"id": clave, "descripcion": trabajo["descripcion"], "escenarios": trabajo["escenarios"],
+                  "formato": trabajo["formato"], "creado": trabajo["creado"]}
+        if not futuro.done():
+            estado["estado"] = "generando" if futuro.running() else "en cola"
+        elif futuro.exception() is not None:
+            estado.update(estado="error", error=str(futuro.exception()))
+        else:
+            estado["estado"] = "listo"
+            estado["datos"], estado["avisos"] = futuro.result()
+        estados.append(estado)
+    return estados
+
+def descartar(cola, clave):
+    """Quita un trabajo del registro, cancelándolo si aún no empezó"""
+    with cola["lock"]:
+        trabajo = cola["trabajos"].pop(clave, None)
+    if trabajo is not None:
+        trabajo["futuro"].cancel()
+
+def descartar_sesion(cola, sesion):
+    """Descarta todos los trabajos de una sesión"""
+    with cola["lock"]:
+        claves = [clave for clave, trabajo in cola["trabajos"].items() if trabajo["sesion"] == sesion]
+    for clave in claves:
+        descartar(cola, clave)
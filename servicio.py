@@ -0,0 +1,315 @@
+"""Servicio HTTP asíncrono con los cálculos de interés.
+
+Uso:
+    python -m ariane serve [--host 127.0.0.1] [--puerto 8502] [--ventana-ms 2] [--lote-maximo 1024]
+
+Rutas (JSON en el cuerpo y en la respuesta):
+
+    POST /interes_simple_vf      {"capital", "tasa_anual", "tiempo", "unidad_tiempo"}
+    POST /interes_simple_vp      {"valor_futuro", "tasa_anual", "tiempo", "unidad_tiempo"}
+    POST /interes_compuesto_vf   {"capital", "tasa_anual", "tiempo", "capitalizacion", "unidad_tiempo"}
+    POST /interes_compuesto_vp   {"valor_futuro", "tasa_anual", "tiempo", "capitalizacion", "unidad_tiempo"}
+    POST /series_comparacion     {"capital", "tasa", "tiempo_max", "capitalizacion", "resolucion"}
+    GET  /salud
+
+Los argumentos tienen los mismos nombres que en ``calculos``. Las solicitudes
+concurrentes a una misma función se agrupan durante una ventana corta y se
+resuelven con una sola llamada a la versión vectorizada (``*_lote``).
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from calculos import (
+    DIVISORES_TIEMPO,
+    FRECUENCIAS,
+    interes_simple_vf,
+    interes_simple_vp,
+    interes_compuesto_vf,
+    interes_compuesto_vp,
+    interes_simple_vf_lote,
+    interes_simple_vp_lote,
+    interes_compuesto_vf_lote,
+    interes_compuesto_vp_lote,
+)
+from graficos import PUNTOS_POR_ANO, calcular_series_comparacion
+
+# Función escalar (define los argumentos) y su versión vectorizada
+FUNCIONES = {
+    "interes_simple_vf": (interes_simple_vf, interes_simple_vf_lote),
+    "interes_simple_vp": (interes_simple_vp, interes_simple_vp_lote),
+    "interes_compuesto_vf": (interes_compuesto_vf, interes_compuesto_vf_lote),
+    "interes_compuesto_vp": (interes_compuesto_vp, interes_compuesto_vp_lote),
+}
+# Valores permitidos de los argumentos de texto
+ETIQUETAS = {"capitalizacion": FRECUENCIAS, "unidad_tiempo": DIVISORES_TIEMPO, "resolucion": PUNTOS_POR_ANO}
+VENTANA_MS = 2.0
+LOTE_MAXIMO = 1024
+TAMANO_MAXIMO_CUERPO = 64 * 1024
+# Puntos máximos de una serie de comparación servida por la API
+PUNTOS_MAXIMOS_SERIE = 100_000
+# Bytes máximos de la caché de series: una serie de 100.000 puntos ocupa unos 6 MB
+CACHE_SERIES_BYTES = 64 * 1024 * 1024
+
+# Series serializadas por entradas, de la menos a la más usada recientemente.
+# Solo se usa desde el bucle de eventos, así que no necesita cerrojo.
+_cache_series = {"entradas": OrderedDict(), "bytes": 0}
+
+# --- Validación ---
+
+def _numero(nombre, valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ValueError(f"'{nombre}' debe ser un número finito")
+    try:
+        # Un entero JSON enorme no cabe en un float
+        valor = float(valor)
+    except OverflowError:
+        raise ValueError(f"'{nombre}' debe ser un número finito") from None
+    if not math.isfinite(valor):
+        raise ValueError(f"'{nombre}' debe ser un número finito")
+    return valor
+
+def _etiqueta(nombre, valor):
+    # Listas u objetos JSON no se pueden buscar en las etiquetas (no son hashables)
+    if not isinstance(valor, str) or valor not in ETIQUETAS[nombre]:
+        raise ValueError(f"'{nombre}' no válido: {valor!r} (use {', '.join(ETIQUETAS[nombre])})")
+    return valor
+
+def validar_argumentos(funcion, datos):
+    """Asocia el JSON a la firma de `funcion` y devuelve los argumentos en orden"""
+    if not isinstance(datos, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON")
+    try:
+        enlazados = inspect.signature(funcion).bind(**datos)
+    except TypeError as error:
+        raise ValueError(str(error)) from None
+    enlazados.apply_defaults()
+    return tuple(
+        _etiqueta(nombre, valor) if nombre in ETIQUETAS else _numero(nombre, valor)
+        for nombre, valor in enlazados.arguments.items()
+    )
+
+# --- Agrupación en micro-lotes ---
+
+def crear_agrupador(funcion_lote, ventana_ms=VENTANA_MS, lote_maximo=LOTE_MAXIMO):
+    """Devuelve una corrutina `calcular(argumentos)` que agrupa llamadas concurrentes.
+
+    Las llamadas se acumulan hasta que pasa `ventana_ms` desde la primera o se
+    reúnen `lote_maximo`; entonces se resuelven todas con una llamada vectorizada.
+    """
+    pendientes = []
+    temporizador = None
+
+    def vaciar():
+        nonlocal temporizador
+        if temporizador is not None:
+            temporizador.cancel()
+            temporizador = None
+        lote = pendientes[:]
+        pendientes.clear()
+        try:
+            columnas = [np.asarray(columna) for columna in zip(*(argumentos for argumentos, _ in lote))]
+            # Los valores no finitos se rechazan abajo, uno por solicitud
+            with np.errstate(all="ignore"):
+                valores, intereses = funcion_lote(*columnas)
+        except Exception as error:  # el error se entrega a cada solicitud del lote
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(error)
+            return
+        # NumPy no lanza excepciones con tasas como -1: devuelve inf o NaN, que no son JSON válido
+        finitos = np.isfinite(valores) & np.isfinite(intereses)
+        for (_, futuro), valor, interes, finito in zip(lote, valores.tolist(), intereses.tolist(), finitos.tolist()):
+            if futuro.done():
+                continue
+            if finito:
+                futuro.set_result((valor, interes))
+            else:
+                futuro.set_exception(ValueError("El resultado no es un número finito con estos argumentos"))
+
+    async def calcular(argumentos):
+        nonlocal temporizador
+        bucle = asyncio.get_running_loop()
+        futuro = bucle.create_future()
+        pendientes.append((argumentos, futuro))
+        if len(pendientes) >= lote_maximo:
+            vaciar()
+        elif temporizador is None:
+            temporizador = bucle.call_later(ventana_ms / 1000, vaciar)
+        return await futuro
+
+    return calcular
+
+def _serializar_series(capital, tasa, tiempo_max, capitalizacion, resolucion):
+    """Calcula y serializa las series, rechazando valores no finitos"""
+    with np.errstate(all="ignore"):
+        anos, simple, compuesto = calcular_series_comparacion(capital, tasa, tiempo_max, capitalizacion, resolucion)
+    if not (np.isfinite(simple).all() and np.isfinite(compuesto).all()):
+        raise ValueError("La serie tiene valores que no son números finitos con estos argumentos")
+    return json.dumps({"anos": anos.tolist(), "simple": simple.tolist(), "compuesto": compuesto.tolist()}, allow_nan=False).encode()
+
+def series_comparacion_json(capital, tasa, tiempo_max, capitalizacion, resolucion):
+    """Series de comparación serializadas, con caché por entradas limitada a CACHE_SERIES_BYTES"""
+    clave = (capital, tasa, tiempo_max, capitalizacion, resolucion)
+    entradas = _cache_series["entradas"]
+    if clave in entradas:
+        entradas.move_to_end(clave)
+        return entradas[clave]
+
+    cuerpo = _serializar_series(*clave)
+    if len(cuerpo) <= CACHE_SERIES_BYTES:
+        entradas[clave] = cuerpo
+        _cache_series["bytes"] += len(cuerpo)
+        while _cache_series["bytes"] > CACHE_SERIES_BYTES:
+            _, desalojado = entradas.popitem(last=False)
+            _cache_series["bytes"] -= len(desalojado)
+    return cuerpo
+
+def _series_comparacion(datos):
+    if not isinstance(datos, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON")
+    tiempo_max = datos.get("tiempo_max")
+    if isinstance(tiempo_max, bool) or not isinstance(tiempo_max, int) or tiempo_max < 1:
+        raise ValueError("'tiempo_max' debe ser un entero positivo de años")
+    resolucion = _etiqueta("resolucion", datos.get("resolucion", "Anual"))
+    if tiempo_max * PUNTOS_POR_ANO[resolucion] > PUNTOS_MAXIMOS_SERIE:
+        raise ValueError(f"La serie superaría {PUNTOS_MAXIMOS_SERIE:,} puntos")
+    return series_comparacion_json(
+        _numero("capital", datos.get("capital")),
+        _numero("tasa", datos.get("tasa")),
+        tiempo_max,
+        _etiqueta("capitalizacion", datos.get("capitalizacion", "Anual")),
+        resolucion,
+    )
+
+# --- HTTP ---
+
+ESTADOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+def _respuesta(estado, cuerpo, mantener=True):
+    if not isinstance(cuerpo, bytes):
+        cuerpo = json.dumps(cuerpo, ensure_ascii=False, allow_nan=False).encode()
+    cabeceras = (
+        f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+    )
+    return cabeceras.encode("latin-1") + cuerpo
+
+async def atender(ruta, metodo, cuerpo, agrupadores):
+    """Resuelve una solicitud y devuelve (estado, cuerpo)"""
+    if ruta == "/salud":
+        return 200, {"estado": "ok", "funciones": [*FUNCIONES, "series_comparacion"]}
+    nombre = ruta.lstrip("/")
+    if nombre not in FUNCIONES and nombre != "series_comparacion":
+        return 404, {"error": f"Ruta desconocida: {ruta}"}
+    if metodo != "POST":
+        return 405, {"error": "Use POST"}
+
+    try:
+        datos = json.loads(cuerpo or b"{}")
+        if nombre == "series_comparacion":
+            return 200, _series_comparacion(datos)
+        argumentos = validar_argumentos(FUNCIONES[nombre][0], datos)
+    except json.JSONDecodeError as error:
+        return 400, {"error": f"JSON no válido: {error}"}
+    except ValueError as error:
+        return 400, {"error": str(error)}
+
+    try:
+        valor, interes = await agrupadores[nombre](argumentos)
+    except ValueError as error:
+        # Argumentos válidos por separado pero sin resultado finito (p. ej. tasa -1)
+        return 400, {"error": f"No se pudo calcular: {error}"}
+    except ArithmeticError as error:
+        return 500, {"error": f"No se pudo calcular: {error}"}
+    return 200, {"valor": valor, "interes": interes}
+
+async def manejar_conexion(lector, escritor, agrupadores):
+    """Atiende solicitudes HTTP/1.1 en una conexión, con keep-alive"""
+    try:
+        while True:
+            linea = await lector.readline()
+            if not linea:
+                break
+            try:
+                metodo, ruta, version = linea.decode("latin-1").split()
+            except ValueError:
+                escritor.write(_respuesta(400, {"error": "Línea de solicitud no válida"}, mantener=False))
+                break
+
+            cabeceras = {}
+            while (cabecera := await lector.readline()) not in (b"\r\n", b"\n", b""):
+                clave, _, valor = cabecera.decode("latin-1").partition(":")
+                cabeceras[clave.strip().lower()] = valor.strip()
+
+            mantener = cabeceras.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            try:
+                longitud = int(cabeceras.get("content-length", 0) or 0)
+            except ValueError:
+                longitud = -1
+            if longitud < 0:
+                # Sin una longitud válida no se sabe dónde empieza la siguiente solicitud
+                escritor.write(_respuesta(400, {"error": "Content-Length no válido"}, mantener=False))
+                break
+            if longitud > TAMANO_MAXIMO_CUERPO:
+                escritor.write(_respuesta(413, {"error": "Cuerpo demasiado grande"}, mantener=False))
+                break
+            cuerpo = await lector.readexactly(longitud) if longitud else b""
+
+            estado, respuesta = await atender(ruta.split("?", 1)[0], metodo, cuerpo, agrupadores)
+            escritor.write(_respuesta(estado, respuesta, mantener))
+            await escritor.drain()
+            if not mantener:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        escritor.close()
+
+async def servir(host="127.0.0.1", puerto=8502, ventana_ms=VENTANA_MS, lote_maximo=LOTE_MAXIMO, listo=None):
+    """Arranca el servicio y atiende hasta que se cancela"""
+    agrupadores = {
+        nombre: crear_agrupador(funcion_lote, ventana_ms, lote_maximo)
+        for nombre, (_, funcion_lote) in FUNCIONES.items()
+    }
+    servidor = await asyncio.start_server(
+        lambda lector, escritor: manejar_conexion(lector, escritor, agrupadores), host, puerto
+    )
+    direccion = servidor.sockets[0].getsockname()
+    print(f"Sirviendo en http://{direccion[0]}:{direccion[1]}", file=sys.stderr, flush=True)
+    if listo is not None:
+        listo(direccion)
+    async with servidor:
+        await servidor.serve_forever()
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog="python -m ariane serve",
+        description="Servicio HTTP asíncrono con los cálculos de interés.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="dirección de escucha (por defecto 127.0.0.1)")
+    parser.add_argument("--puerto", type=int, default=8502, help="puerto de escucha (por defecto 8502)")
+    parser.add_argument("--ventana-ms", type=float, default=VENTANA_MS, help=f"ventana de agrupación en milisegundos (por defecto {VENTANA_MS})")
+    parser.add_argument("--lote-maximo", type=int, default=LOTE_MAXIMO, help=f"solicitudes máximas por lote (por defecto {LOTE_MAXIMO})")
+    args = parser.parse_args(argv)
+    if args.ventana_ms < 0 or args.lote_maximo < 1:
+        parser.error("--ventana-ms no puede ser negativa y --lote-maximo debe ser mayor que cero")
+
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.ventana_ms, args.lote_maximo))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
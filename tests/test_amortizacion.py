@@ -0,0 +1,70 @@
+import io
+
+import numpy as np
+import pytest
+
+import amortizacion
+from calculos import interes_compuesto_vf
+
+
+@pytest.mark.parametrize("tiempo", [6, 18, 30])
+def test_plazo_sin_periodos_enteros_es_error(tiempo):
+    with pytest.raises(ValueError, match="número entero de períodos"):
+        amortizacion.numero_periodos(tiempo, "Anual", "Meses")
+
+
+def test_numero_periodos_exacto():
+    assert amortizacion.numero_periodos(24, "Anual", "Meses") == 2
+    assert amortizacion.numero_periodos(365, "Mensual", "Días") == 12
+    assert amortizacion.numero_periodos(0.5, "Semestral") == 1
+
+
+def test_unidad_desconocida_no_se_toma_como_anos():
+    with pytest.raises(KeyError):
+        amortizacion.numero_periodos(3, "Anual", "Semanas")
+
+
+def test_resumen_frances():
+    cuota, total, interes = amortizacion.resumen_amortizacion(20000, 0.05, 3, "Anual")
+    assert cuota == pytest.approx(7344.1712926249)
+    assert total == pytest.approx(3 * cuota)
+    assert interes == pytest.approx(total - 20000)
+
+
+def test_resumen_aleman():
+    assert amortizacion.resumen_amortizacion(12000, 0.12, 12, "Mensual", "Meses", "aleman") == pytest.approx(
+        (1120.0, 12780.0, 780.0)
+    )
+
+
+def test_acumulacion_coincide_con_interes_compuesto():
+    tabla = amortizacion.tabla_amortizacion(20000, 0.05, 24, "Anual", "Meses", "acumulacion")
+    valor_futuro, _ = interes_compuesto_vf(20000, 0.05, 24, "Anual", "Meses")
+    assert tabla["saldo_final"][-1] == pytest.approx(valor_futuro)
+    assert valor_futuro == pytest.approx(22050)
+
+
+@pytest.mark.parametrize("tipo", ["frances", "aleman"])
+def test_tabla_cierra_en_cero_y_cuadra_con_resumen(tipo):
+    tabla = amortizacion.tabla_amortizacion(10000, 0.06, 2, "Mensual", tipo=tipo)
+    _, total, interes = amortizacion.resumen_amortizacion(10000, 0.06, 2, "Mensual", tipo=tipo)
+    assert tabla["saldo_final"][-1] == 0.0
+    np.testing.assert_allclose(tabla["saldo_inicial"][1:], tabla["saldo_final"][:-1])
+    assert tabla["pago"].sum() == pytest.approx(total)
+    assert tabla["interes"].sum() == pytest.approx(interes)
+
+
+def test_bloques_coinciden_con_tabla_completa():
+    completa = amortizacion.tabla_amortizacion(5000, 0.08, 10, "Mensual")
+    bloques = list(amortizacion.bloques_amortizacion(5000, 0.08, 10, "Mensual", tamano_bloque=7))
+    assert len(bloques) == 18
+    for columna in amortizacion.COLUMNAS:
+        np.testing.assert_allclose(np.concatenate([bloque[columna] for bloque in bloques]), completa[columna])
+
+
+def test_guardar_tabla_por_bloques():
+    destino = io.StringIO()
+    assert amortizacion.guardar_tabla_amortizacion(destino, 1000, 0.1, 1, "Trimestral", tamano_bloque=3) == 4
+    lineas = destino.getvalue().splitlines()
+    assert lineas[0] == ",".join(amortizacion.COLUMNAS)
+    assert lineas[-1].startswith("4,") and lineas[-1].endswith(",0.00")
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from calculos import (
+    anualidad_simple_vf_lote,
+    anualidad_vf,
+    anualidad_vp,
+    interes_compuesto_vf,
+    interes_compuesto_vf_lote,
+    interes_compuesto_vp_lote,
+    interes_simple_vf,
+    interes_simple_vf_lote,
+    interes_simple_vp_lote,
+    newton_acotado,
+    tasa_implicita_compuesta,
+    tasa_implicita_simple,
+    tiempo_requerido_compuesto,
+    tiempo_requerido_simple,
+    total_aportado_lote,
+)
+
+
+def _vpn(montos):
+    """VPN de flujos en períodos 0, 1, 2, ... y su derivada respecto a la tasa"""
+    tiempos = np.arange(len(montos), dtype=float)
+
+    def funcion(x):
+        factores = (1 + x[:, None]) ** -tiempos
+        return factores @ montos, (-tiempos * factores / (1 + x[:, None])) @ montos
+
+    return funcion
+
+
+def test_newton_acotado_converge_en_curva_empinada():
+    # 359 pagos de 1 sobre 1000: TIR negativa donde el VPN es muy empinado y Newton avanza muy poco
+    montos = np.array([-1000.0] + [1.0] * 359)
+    x, convergio, iteraciones = newton_acotado(_vpn(montos), np.array([-0.5]), np.array([10.0]), x0=0.1,
+                                               tolerancia=1e-10, max_iteraciones=100)
+    assert convergio.all()
+    assert iteraciones < 60
+    assert abs(_vpn(montos)(x)[0][0]) < 1e-6
+
+
+def test_newton_acotado_sin_cambio_de_signo():
+    x, convergio, _ = newton_acotado(lambda x: (x ** 2 + 1, 2 * x), np.array([-1.0]), np.array([1.0]))
+    assert not convergio.any()
+    assert np.isnan(x).all()
+
+
+def test_newton_acotado_por_elemento():
+    objetivos = np.array([0.5, 2.0, 9.0])
+    x, convergio, _ = newton_acotado(lambda x: (x ** 2 - objetivos, 2 * x), 0.0, 10.0)
+    assert convergio.all()
+    np.testing.assert_allclose(x, np.sqrt(objetivos), rtol=1e-10)
+
+
+def test_lotes_coinciden_con_las_funciones_escalares():
+    capital = np.array([1000.0, 2500.0, 100.0])
+    tasa = np.array([0.05, 0.12, 0.0])
+    tiempo = np.array([3.0, 18.0, 365.0])
+    unidades = np.array(["Años", "Meses", "Días"])
+    capitalizaciones = np.array(["Anual", "Mensual", "Diario"])
+    esperados = [interes_compuesto_vf(*fila) for fila in zip(capital, tasa, tiempo, capitalizaciones, unidades)]
+    valores, intereses = interes_compuesto_vf_lote(capital, tasa, tiempo, capitalizaciones, unidades)
+    assert valores.tolist() == pytest.approx([valor for valor, _ in esperados])
+    assert intereses.tolist() == pytest.approx([interes for _, interes in esperados])
+    assert interes_simple_vf_lote(capital, tasa, tiempo, unidades)[0].tolist() == pytest.approx(
+        [interes_simple_vf(*fila)[0] for fila in zip(capital, tasa, tiempo, unidades)]
+    )
+
+
+def test_vp_lote_invierte_vf_lote():
+    valores, _ = interes_compuesto_vf_lote(1000.0, 0.08, np.arange(1, 6), "Trimestral")
+    presentes, intereses = interes_compuesto_vp_lote(valores, 0.08, np.arange(1, 6), "Trimestral")
+    assert presentes.tolist() == pytest.approx([1000.0] * 5)
+    assert interes_simple_vp_lote(1210.0, 0.1, 24, "Meses")[0] == pytest.approx(1210 / 1.2)
+
+
+def test_capitalizacion_desconocida_es_error():
+    with pytest.raises(KeyError):
+        interes_compuesto_vf_lote(1000.0, 0.08, 1.0, np.array(["Anual", "Quincenal"]))
+
+
+def test_tasa_y_tiempo_implicitos():
+    tasa, valido = tasa_implicita_compuesta([1000.0, 1000.0, -5.0], [1331.0, 500.0, 100.0], [3.0, 2.0, 1.0], "Anual")
+    assert tasa[:2].tolist() == pytest.approx([0.1, 0.5 ** 0.5 - 1])
+    assert valido.tolist() == [True, True, False] and np.isnan(tasa[2])
+    assert tasa_implicita_simple(1000.0, 1060.0, 6.0, "Meses")[0] == pytest.approx(0.12)
+    assert tiempo_requerido_simple(1000.0, 1060.0, 0.12, "Meses")[0] == pytest.approx(6.0)
+    tiempo, valido = tiempo_requerido_compuesto([1000.0, 1000.0], [1000.0 * 1.01 ** 24, 900.0], 0.12, "Mensual", "Meses")
+    assert tiempo[0] == pytest.approx(24.0)
+    assert not valido[1]
+
+
+def _aportes_uno_a_uno(aporte, tasa, periodos, crecimiento=0.0, anticipada=False):
+    """VF sumando cada aporte (1 + g)^k capitalizado por los períodos que le quedan"""
+    k = np.arange(periodos)
+    return float(np.sum(aporte * (1 + crecimiento) ** k * (1 + tasa) ** (periodos - k - 1 + anticipada)))
+
+
+@pytest.mark.parametrize("crecimiento", [0.0, 0.03])
+@pytest.mark.parametrize("anticipada", [False, True])
+def test_anualidades_coinciden_con_la_suma_de_aportes(crecimiento, anticipada):
+    valor, interes = anualidad_vf(100.0, 0.06, 5, "Mensual", crecimiento, anticipada)
+    esperado = _aportes_uno_a_uno(100.0, 0.005, 60, crecimiento / 12, anticipada)
+    aportado = float(np.sum(100.0 * (1 + crecimiento / 12) ** np.arange(60)))
+    assert valor == pytest.approx(esperado)
+    assert interes == pytest.approx(esperado - aportado)
+    assert float(total_aportado_lote(100.0, 5, "Mensual", crecimiento)) == pytest.approx(aportado)
+    assert anualidad_vp(100.0, 0.06, 5, "Mensual", crecimiento, anticipada)[0] == pytest.approx(esperado / 1.005 ** 60)
+
+
+def test_anualidad_sin_tasa_es_lo_aportado():
+    assert anualidad_vf(100.0, 0.0, 2, "Trimestral", 0.04)[0] == pytest.approx(sum(100.0 * 1.01 ** k for k in range(8)))
+
+
+@pytest.mark.parametrize("crecimiento", [0.0, 0.05])
+@pytest.mark.parametrize("anticipada", [False, True])
+def test_anualidad_simple_suma_intereses_lineales(crecimiento, anticipada):
+    k = np.arange(10)
+    aportes = 100.0 * (1 + crecimiento) ** k
+    esperado = float(np.sum(aportes * (1 + 0.08 * (10 - k - 1 + anticipada))))
+    valor, interes = anualidad_simple_vf_lote(100.0, 0.08, 10, "Anual", crecimiento, anticipada)
+    assert float(valor) == pytest.approx(esperado)
+    assert float(interes) == pytest.approx(esperado - aportes.sum())
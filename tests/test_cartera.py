@@ -0,0 +1,61 @@
+import io
+
+import pandas as pd
+import pytest
+
+import cartera
+
+
+def test_etiquetas_de_unidad_sin_distinguir_mayusculas_ni_espacios():
+    bloque = pd.DataFrame({"monto": [1000.0] * 3, "tasa": [0.12] * 3, "tiempo": [6.0] * 3,
+                           "unidad": ["meses", " Meses", "MESES"], "tipo": ["simple"] * 3})
+    assert cartera.valorar_bloque(bloque)["resultado"].tolist() == pytest.approx([1060.0] * 3)
+
+
+def test_unidad_desconocida_es_error():
+    bloque = pd.DataFrame({"monto": [1000.0, 1000.0], "tasa": [0.12, 0.12], "tiempo": [6.0, 6.0],
+                           "unidad": ["Años", "semanas"]})
+    with pytest.raises(ValueError, match="unidad no válida en la fila 1: 'semanas'"):
+        cartera.valorar_bloque(bloque)
+
+
+def test_capitalizacion_desconocida_es_error():
+    bloque = pd.DataFrame({"monto": [1000.0], "tasa": [0.12], "tiempo": [1.0], "capitalizacion": ["quincenal"]})
+    with pytest.raises(ValueError, match="capitalizacion no válida"):
+        cartera.valorar_bloque(bloque)
+
+
+def test_valorar_bloque_mezcla_tipos_y_calculos():
+    bloque = pd.DataFrame({
+        "monto": [1000.0, 1100.0, 1000.0, 1210.0],
+        "tasa": [0.1] * 4,
+        "tiempo": [2.0, 1.0, 2.0, 2.0],
+        "tipo": ["compuesto", "simple", "simple", "Compuesto "],
+        "calculo": ["VF", "vp", "VF", "VP"],
+        "capitalizacion": ["anual", None, "Anual", "Anual"],
+    })
+    valorado = cartera.valorar_bloque(bloque)
+    assert valorado["resultado"].tolist() == pytest.approx([1210.0, 1000.0, 1200.0, 1000.0])
+    assert valorado["interes"].tolist() == pytest.approx([210.0, 100.0, 200.0, 210.0])
+
+
+def test_valorar_archivo_por_bloques():
+    archivo = io.BytesIO(b"monto,tasa,tiempo,unidad\n" + b"1000,0.12,12,Meses\n" * 5)
+    destino = io.StringIO()
+    assert cartera.valorar_archivo(archivo, destino, "csv", tamano_bloque=2) == 5
+    resultado = pd.read_csv(io.StringIO(destino.getvalue()))
+    assert len(resultado) == 5
+    assert resultado["resultado"].tolist() == pytest.approx([1120.0] * 5)
+
+
+def test_valorar_mora():
+    facturas = pd.DataFrame({
+        "monto": [1000.0, 1000.0, 1000.0],
+        "vencimiento": ["2024-01-31", "2024-01-31", "2024-03-31"],
+        "pago": ["2024-03-31", None, "2024-03-15"],
+        "tasa": [None, 0.12, None],
+    })
+    resultado = cartera.valorar_mora(facturas, "2024-02-29", 0.36, "30/360")
+    assert resultado["dias_mora"].tolist() == [60, 29, 0]
+    assert resultado["interes_mora"].tolist() == pytest.approx([60.0, 1000 * 0.12 * 29 / 360, 0.0])
+    assert resultado["total"].tolist() == pytest.approx(1000 + resultado["interes_mora"])
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from convenciones import dias_computables, fraccion_anual
+
+
+@pytest.mark.parametrize("inicio, fin, dias", [
+    ("2024-01-31", "2024-02-29", 29),   # el 31 inicial cuenta como 30; febrero no se ajusta
+    ("2024-01-30", "2024-03-31", 60),   # el 31 final cuenta como 30 si el inicio es 30 o 31
+    ("2024-01-15", "2024-03-31", 76),   # ... pero no si el inicio es anterior al 30
+    ("2023-02-28", "2023-03-31", 33),
+    ("2024-03-31", "2024-04-30", 30),
+])
+def test_30_360_fin_de_mes(inicio, fin, dias):
+    assert dias_computables(inicio, fin, "30/360") == dias
+
+
+def test_dias_reales_vectorizados():
+    inicios = np.array(["2024-01-01", "2023-01-01"], dtype="datetime64[D]")
+    fines = np.array(["2024-12-31", "2024-01-01"], dtype="datetime64[D]")
+    assert dias_computables(inicios, fines, "Actual/365").tolist() == [365, 365]
+    assert fraccion_anual(inicios, fines, "Actual/360").tolist() == [365 / 360, 365 / 360]
+
+
+def test_actual_actual_reparte_por_ano_natural():
+    assert fraccion_anual("2023-07-01", "2024-07-01", "Actual/Actual") == pytest.approx(184 / 365 + 182 / 366)
+    assert fraccion_anual("2024-02-01", "2024-03-01", "Actual/Actual") == pytest.approx(29 / 366)
+    assert fraccion_anual(["2024-01-01", "2023-01-01"], ["2025-01-01", "2024-01-01"], "Actual/Actual").tolist() == [1.0, 1.0]
+
+
+def test_actual_actual_invertida_es_negativa():
+    assert fraccion_anual("2024-07-01", "2023-07-01", "Actual/Actual") == pytest.approx(-(184 / 365 + 182 / 366))
+
+
+def test_fechas_no_validas():
+    with pytest.raises(ValueError, match="fuera del rango"):
+        dias_computables("1899-12-31", "2000-01-01", "30/360")
+    with pytest.raises(ValueError, match="vacías"):
+        fraccion_anual(np.array(["NaT"], dtype="datetime64[D]"), "2000-01-01")
+    with pytest.raises(ValueError, match="Convención no válida"):
+        dias_computables("2000-01-01", "2000-02-01", "Actual/364")
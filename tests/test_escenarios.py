@@ -0,0 +1,71 @@
+import pytest
+
+import escenarios
+
+ENTRADAS = {"capital": 1000, "tasa": 0.08, "tiempo": 3, "capitalizacion": "Anual"}
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "escenarios.sqlite3")
+
+
+def test_canonizar_ignora_diferencias_de_forma():
+    texto, hash_ = escenarios.canonizar("comparacion", ENTRADAS)
+    otro = {"capitalizacion": " Anual ", "tiempo": 3.0, "tasa": 0.08000000000001, "capital": 1000, "aporte": None}
+    assert escenarios.canonizar("comparacion", otro) == (texto, hash_)
+    assert escenarios.canonizar("comparacion", {**ENTRADAS, "tiempo": 4})[1] != hash_
+
+
+def test_calcular_comparacion_con_aportes():
+    resultado = escenarios.calcular_comparacion(1000, 0.1, 2, "Anual", aporte=100)
+    assert resultado["vf_simple"] == pytest.approx(1200 + 100 * 2 + 100 * 0.1)
+    assert resultado["vf_compuesto"] == pytest.approx(1210 + 210)
+    assert resultado["total_aportado"] == pytest.approx(1200)
+
+
+def test_obtener_o_calcular_reutiliza(ruta):
+    primero, reutilizado = escenarios.obtener_o_calcular("comparacion", ENTRADAS, ruta)
+    assert not reutilizado
+    assert primero["vf_compuesto"] == pytest.approx(1000 * 1.08 ** 3)
+    segundo, reutilizado = escenarios.obtener_o_calcular("comparacion", {**ENTRADAS, "tiempo": 3.0}, ruta)
+    assert reutilizado and segundo == primero
+    estadisticas = escenarios.estadisticas(ruta)
+    assert (estadisticas["resultados"], estadisticas["usos"], estadisticas["escenarios"]) == (1, 2, 0)
+    assert estadisticas["bytes"] > 0
+
+
+def test_guardar_listar_y_eliminar(ruta):
+    escenarios.guardar_escenario("  Base ", "comparacion", ENTRADAS, ruta)
+    escenarios.guardar_escenario("Largo", "comparacion", {**ENTRADAS, "tiempo": 10}, ruta)
+    assert escenarios.listar_escenarios(ruta=ruta) == ["Largo", "Base"]
+    assert escenarios.listar_escenarios("otro", ruta=ruta) == []
+    assert escenarios.cargar_escenario("Base", ruta) == ("comparacion", ENTRADAS)
+    filas = escenarios.comparar_escenarios(["Base", "No existe", "Largo"], ruta)
+    assert [fila["nombre"] for fila in filas] == ["Base", "Largo"]
+    escenarios.eliminar_escenario("Base", ruta)
+    assert escenarios.cargar_escenario("Base", ruta) is None
+
+
+@pytest.mark.parametrize("nombre, tipo, mensaje", [("  ", "comparacion", "nombre"), ("A", "otro", "desconocido")])
+def test_guardar_escenario_no_valido(ruta, nombre, tipo, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        escenarios.guardar_escenario(nombre, tipo, ENTRADAS, ruta)
+
+
+def test_desalojo_conserva_escenarios_con_nombre(ruta):
+    escenarios.guardar_escenario("Base", "comparacion", ENTRADAS, ruta)
+    for tiempo in (3, 4, 5):
+        escenarios.obtener_o_calcular("comparacion", {**ENTRADAS, "tiempo": tiempo}, ruta)
+    with escenarios.conectar(ruta) as conexion:
+        assert escenarios._desalojar(conexion, maximo_resultados=1) == 2
+    _, reutilizado = escenarios.obtener_o_calcular("comparacion", ENTRADAS, ruta)
+    assert reutilizado
+
+
+def test_conectar_prepara_la_base_una_vez(ruta):
+    with escenarios.conectar(ruta) as conexion:
+        assert conexion.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert ruta in escenarios._preparadas
+    with escenarios.conectar(":memory:") as conexion:
+        assert conexion.execute("SELECT COUNT(*) FROM escenarios").fetchone() == (0,)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import flujos
+
+
+def test_aplanar_matriz_rellena():
+    montos, tiempos, indptr = flujos.aplanar([[-100, 110, np.nan], [-100, 60, 60.5]], [[0, 1, 0], [0, 1, 2]])
+    assert montos.tolist() == [-100, 110, -100, 60, 60.5]
+    assert tiempos.tolist() == [0, 1, 0, 1, 2]
+    assert indptr.tolist() == [0, 2, 5]
+
+
+def test_aplanar_rechaza_indptr_no_valido():
+    with pytest.raises(ValueError, match="indptr"):
+        flujos.aplanar([1.0, 2.0], indptr=[0, 3])
+
+
+def test_vpn_por_periodos():
+    vpn = flujos.vpn_lote(0.1, [[-100, 110, np.nan], [-100, 60, 60.5]])
+    assert vpn.tolist() == pytest.approx([0.0, -100 + 60 / 1.1 + 60.5 / 1.21])
+
+
+def test_tir_por_periodos():
+    tir, convergio, _ = flujos.tir_lote([[-100, 110, np.nan], [-100, 60, 60.5]])
+    assert convergio.all()
+    assert tir[0] == pytest.approx(0.1)
+    assert flujos.vpn_lote(tir[1], [[-100, 60, 60.5]])[0] == pytest.approx(0.0, abs=1e-8)
+
+
+@pytest.mark.parametrize("montos", [[-100, 230, -132], [-100, -50, np.nan]])
+def test_tir_sin_cambio_de_signo(montos):
+    tir, convergio, _ = flujos.tir_lote([montos])
+    assert np.isnan(tir[0]) and not convergio[0]
+
+
+def test_xvpn_y_xtir_con_fechas():
+    montos = np.array([-1000.0, 1100.0])
+    fechas = np.array(["2024-01-01", "2025-01-01"], dtype="datetime64[D]")
+    # 2024 es bisiesto: 366 días son 366/365 años en Actual/365 y exactamente un año en Actual/Actual
+    assert flujos.xvpn_lote(0.1, montos, fechas, [0, 2])[0] == pytest.approx(-1000 + 1100 / 1.1 ** (366 / 365))
+    assert flujos.xtir_lote(montos, fechas, [0, 2])[0][0] == pytest.approx(1.1 ** (365 / 366) - 1)
+    assert flujos.xtir_lote(montos, fechas, [0, 2], "Actual/Actual")[0][0] == pytest.approx(0.1)
+
+
+def test_xtir_sin_cambio_de_signo():
+    fechas = np.array(["2024-01-01", "2024-06-30", "2025-01-01"], dtype="datetime64[D]")
+    tir, convergio, _ = flujos.xtir_lote(np.array([-100.0, 230.0, -132.0]), fechas, [0, 3])
+    assert np.isnan(tir[0]) and not convergio[0]
+
+
+def test_tir_cerca_de_menos_cien_por_ciento_no_desborda():
+    # Casi todo se pierde durante 30 años: TIR muy negativa sin overflow en (1 + r)^-t
+    montos = [[-1000.0] + [0.0] * 29 + [1e-20]]
+    tir, convergio, _ = flujos.tir_lote(montos)
+    assert convergio[0]
+    assert tir[0] == pytest.approx((1e-23) ** (1 / 30) - 1)
+
+
+def test_evaluar_flujos_ordena_por_proyecto_y_fecha():
+    datos = pd.DataFrame({
+        "proyecto": ["B", "A", "A", "B"],
+        "fecha": ["2024-01-01", "2025-01-01", "2024-01-01", "2024-07-01"],
+        "monto": [-100, 121, -100, 50],
+    })
+    resultado = flujos.evaluar_flujos(datos, 0.1, "Actual/Actual")
+    assert resultado["proyecto"].tolist() == ["A", "B"]
+    assert resultado["invertido"].tolist() == [100.0, 100.0]
+    assert resultado["recibido"].tolist() == [121.0, 50.0]
+    assert resultado["xtir"][0] == pytest.approx(0.21)
+    assert resultado["xvpn"][0] == pytest.approx(10.0)
+
+
+def test_leer_flujos_rechaza_montos_vacios():
+    datos = pd.DataFrame({"proyecto": ["A"], "fecha": ["2024-01-01"], "monto": [None]})
+    with pytest.raises(ValueError, match="vacíos"):
+        flujos.leer_flujos(datos)
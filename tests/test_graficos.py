@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from calculos import anualidad_simple_vf_lote, anualidad_vf
+from graficos import calcular_series_comparacion
+
+
+@pytest.mark.parametrize("anticipada", [False, True])
+def test_vf_simple_mensual_no_baja_del_total_aportado(anticipada):
+    # Aportes anuales vistos mes a mes: antes del primer aporte no hay interés negativo
+    anos, simple, _ = calcular_series_comparacion(1000.0, 0.08, 5, "Anual", "Mensual", aporte=100.0, anticipada=anticipada)
+    aportado = 1000.0 + 100.0 * np.minimum(np.floor(np.round(anos, 9)) + anticipada, 5)
+    assert np.all(simple >= aportado - 1e-9)
+
+
+@pytest.mark.parametrize("anticipada", [False, True])
+def test_series_mensuales_coinciden_al_final_del_plazo(anticipada):
+    anos, simple, compuesto = calcular_series_comparacion(0.0, 0.08, 5, "Trimestral", "Mensual",
+                                                          aporte=100.0, crecimiento=0.03, anticipada=anticipada)
+    assert anos[-1] == 5
+    assert simple[-1] == pytest.approx(float(anualidad_simple_vf_lote(100.0, 0.08, 5, "Trimestral", 0.03, anticipada)[0]))
+    assert compuesto[-1] == pytest.approx(anualidad_vf(100.0, 0.08, 5, "Trimestral", 0.03, anticipada)[0])
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import lotes
+
+
+def test_resolver_solicitud_conserva_id():
+    linea = json.dumps({"id": 7, "funcion": "interes_simple_vf", "capital": 1000, "tasa_anual": 0.1, "tiempo": 2})
+    respuesta = lotes.resolver_solicitud(linea)
+    assert respuesta["id"] == 7
+    assert respuesta["valor"] == pytest.approx(1200)
+    assert respuesta["interes"] == pytest.approx(200)
+
+
+def test_resultado_complejo_es_error_de_linea():
+    linea = json.dumps({"id": 1, "funcion": "interes_compuesto_vf", "capital": 100, "tasa_anual": -3,
+                        "tiempo": 0.5, "capitalizacion": "Anual"})
+    assert "finito" in lotes.resolver_solicitud(linea)["error"]
+
+
+def test_desborde_es_error_de_linea():
+    linea = json.dumps({"funcion": "interes_compuesto_vf", "capital": 1, "tasa_anual": 1, "tiempo": 1e6,
+                        "capitalizacion": "Anual"})
+    assert "error" in lotes.resolver_solicitud(linea)
+
+
+def test_id_no_serializable_no_interrumpe_el_bloque():
+    lineas = ['{"id": NaN, "funcion": "interes_simple_vf", "capital": 1, "tasa_anual": 0, "tiempo": 1}',
+              '{"id": 2, "funcion": "interes_simple_vf", "capital": 1, "tasa_anual": 0, "tiempo": 1}']
+    respuestas, errores = lotes.procesar_bloque(lineas)
+    assert errores == 1
+    assert json.loads(respuestas[0]) == {"error": json.loads(respuestas[0])["error"]}
+    assert json.loads(respuestas[1]) == {"id": 2, "valor": 1.0, "interes": 0.0}
+
+
+def test_main_escribe_todas_las_lineas(tmp_path):
+    entrada = tmp_path / "entrada.jsonl"
+    salida = tmp_path / "salida.jsonl"
+    entrada.write_text("\n".join([
+        json.dumps({"id": 1, "funcion": "interes_compuesto_vf", "capital": 100, "tasa_anual": -3,
+                    "tiempo": 0.5, "capitalizacion": "Anual"}),
+        json.dumps({"id": 2, "funcion": "interes_simple_vf", "capital": 100, "tasa_anual": 0.1, "tiempo": 1}),
+        "no es json",
+    ]) + "\n", encoding="utf-8")
+    assert lotes.main([str(entrada), str(salida), "--procesos", "1"]) == 0
+    respuestas = [json.loads(linea) for linea in salida.read_text(encoding="utf-8").splitlines()]
+    assert [respuesta.get("id") for respuesta in respuestas] == [1, 2, None]
+    assert "error" in respuestas[0] and "error" in respuestas[2]
+    assert respuestas[1]["valor"] == pytest.approx(110)
+
+
+def test_entrada_inexistente_es_error_de_uso(tmp_path):
+    with pytest.raises(SystemExit) as salida:
+        lotes.main([str(tmp_path / "no_existe.jsonl"), str(tmp_path / "salida.jsonl")])
+    assert salida.value.code == 2
@@ -0,0 +1,50 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import memoria
+
+
+def test_estimar_bytes():
+    assert memoria.estimar_bytes(np.zeros(100)) == 800
+    assert memoria.estimar_bytes(b"abc") == 3
+    assert memoria.estimar_bytes((np.zeros(10), bytearray(5))) == 85
+    assert memoria.estimar_bytes(pd.DataFrame({"a": np.zeros(10)})) >= 80
+
+
+def test_recuperar_solo_con_las_mismas_entradas():
+    registro = memoria.crear_registro()
+    valor = np.arange(10)
+    assert memoria.retener(registro, "s1", "tabla", (1, 2), valor) is valor
+    assert memoria.recuperar(registro, "s1", "tabla", (1, 2)) is valor
+    assert memoria.recuperar(registro, "s1", "tabla", (1, 3)) is None
+    assert memoria.recuperar(registro, "s2", "tabla", (1, 2)) is None
+
+
+def test_presupuesto_libera_lo_usado_hace_mas_tiempo():
+    registro = memoria.crear_registro()
+    for tipo in ("a", "b", "c"):
+        memoria.retener(registro, "s1", tipo, (), np.zeros(100), presupuesto=2400)
+    memoria.recuperar(registro, "s1", "a", ())
+    memoria.retener(registro, "s1", "d", (), np.zeros(100), presupuesto=2400)
+    assert memoria.recuperar(registro, "s1", "b", ()) is None
+    assert memoria.recuperar(registro, "s1", "a", ()) is not None
+    assert memoria.uso(registro) == {"s1": 2400}
+
+
+def test_objeto_mayor_que_el_presupuesto_no_se_retiene():
+    registro = memoria.crear_registro()
+    memoria.retener(registro, "s1", "a", (), np.zeros(10), presupuesto=100)
+    memoria.retener(registro, "s1", "a", (), np.zeros(100), presupuesto=100)
+    assert memoria.recuperar(registro, "s1", "a", ()) is None
+    assert memoria.uso(registro) == {"s1": 0}
+
+
+def test_sesiones_inactivas_se_liberan():
+    registro = memoria.crear_registro()
+    memoria.retener(registro, "vieja", "a", (), np.zeros(10))
+    time.sleep(0.02)
+    registro["barrido"] = 0.0
+    assert memoria.tocar(registro, "nueva", inactividad=0.01) == ["vieja"]
+    assert list(memoria.uso(registro)) == ["nueva"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import montecarlo
+
+
+def test_tasas_periodicas_normal_y_lognormal():
+    choques = np.array([-1.0, 0.0, 1.0])
+    assert montecarlo.tasas_periodicas(0.12, 0.06, 12, choques.copy()).tolist() == pytest.approx([0.005, 0.01, 0.015])
+    lognormal = montecarlo.tasas_periodicas(0.12, 0.5, 12, choques.copy(), "lognormal")
+    assert lognormal.tolist() == pytest.approx(0.01 * np.exp(0.5 * choques - 0.125))
+    # Un período nunca pierde todo el capital
+    assert montecarlo.tasas_periodicas(0.0, 100.0, 1, np.array([-1.0]))[0] > -1
+
+
+def test_modelo_no_valido():
+    with pytest.raises(ValueError, match="Modelo no válido"):
+        montecarlo.tasas_periodicas(0.1, 0.1, 1, np.zeros(1), "uniforme")
+
+
+def test_sin_volatilidad_coincide_con_la_tasa_fija():
+    resultado = montecarlo.simular_tasas(1000, 0.08, 10, "Anual", 0.0, trayectorias=1000)
+    assert resultado["determinista"][-1] == pytest.approx(1000 * 1.08 ** 10)
+    np.testing.assert_allclose(resultado["bandas"], np.broadcast_to(resultado["determinista"], resultado["bandas"].shape), rtol=1e-6)
+    np.testing.assert_allclose(resultado["media"], resultado["determinista"], rtol=1e-6)
+
+
+def test_distribucion_con_volatilidad():
+    resultado = montecarlo.simular_tasas(1000, 0.08, 10, "Mensual", 0.05, trayectorias=200_000, tamano_bloque=50_000)
+    assert resultado["anos"][-1] == 10 and resultado["bandas"].shape == (5, 121)
+    assert np.all(np.diff(resultado["bandas"][:, 1:], axis=0) > 0)
+    # Choques independientes de media cero: la media es el valor determinista
+    assert resultado["media"][-1] == pytest.approx(resultado["determinista"][-1], rel=5e-3)
+    # Mediana ≈ exp(N·E[log(1 + r)]) con E[log(1 + r)] ≈ μ - σ²/2 por período
+    mu, sigma = 0.08 / 12, 0.05 / 12
+    assert resultado["bandas"][2, -1] == pytest.approx(1000 * np.exp(120 * (mu - sigma ** 2 / 2)), rel=1e-2)
+
+
+def test_misma_semilla_mismo_resultado():
+    primero = montecarlo.simular_tasas(1000, 0.08, 5, "Trimestral", 0.1, "lognormal", trayectorias=20_000, semilla=7)
+    segundo = montecarlo.simular_tasas(1000, 0.08, 5, "Trimestral", 0.1, "lognormal", trayectorias=20_000, semilla=7)
+    np.testing.assert_array_equal(primero["bandas"], segundo["bandas"])
+
+
+def test_plazo_sin_periodos_es_error():
+    with pytest.raises(ValueError, match="al menos un período"):
+        montecarlo.simular_tasas(1000, 0.08, 0.1, "Anual", 0.1)
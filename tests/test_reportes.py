@@ -0,0 +1,67 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+import reportes
+
+
+def _resumen(escenarios):
+    datos, avisos = reportes.generar_reporte(escenarios, "csv", imagenes=False)
+    assert avisos == []
+    with zipfile.ZipFile(io.BytesIO(datos)) as archivo:
+        return pd.read_csv(archivo.open("resumen.csv")), archivo.namelist()
+
+
+def test_leer_escenarios_aplica_valores_por_defecto():
+    datos = pd.DataFrame({"capital": [1000, 2000], "tasa": [0.08, 0.05], "tiempo": [3, 10],
+                          "aporte": [None, 50], "anticipada": [None, "Sí"]})
+    primero, segundo = reportes.leer_escenarios(datos)
+    assert primero == {"nombre": "Escenario 1", "capital": 1000.0, "tasa": 0.08, "tiempo": 3, "capitalizacion": "Anual",
+                       "aporte": 0.0, "crecimiento": 0.0, "anticipada": False}
+    assert segundo["aporte"] == 50.0 and segundo["anticipada"] is True
+
+
+@pytest.mark.parametrize("fila, mensaje", [
+    ({"capital": 1000, "tasa": 0.08, "tiempo": 3, "capitalizacion": "Quincenal"}, "capitalización no válida"),
+    ({"capital": 1000, "tasa": 0.08, "tiempo": "tres"}, "deben ser números"),
+    ({"capital": -1, "tasa": 0.08, "tiempo": 3}, "positivos"),
+])
+def test_leer_escenarios_rechaza_filas_no_validas(fila, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        reportes.leer_escenarios(pd.DataFrame([fila]))
+
+
+def test_resumen_distingue_crecimiento_y_momento_del_aporte():
+    base = {"capital": 1000.0, "tasa": 0.08, "tiempo": 3, "capitalizacion": "Anual", "aporte": 100.0}
+    resumen, nombres = _resumen([
+        {**base, "nombre": "Vencido", "crecimiento": 0.0, "anticipada": False},
+        {**base, "nombre": "Anticipado", "crecimiento": 0.0, "anticipada": True},
+        {**base, "nombre": "Creciente", "crecimiento": 0.02, "anticipada": False},
+    ])
+    assert resumen["Crecimiento del Aporte"].tolist() == [0.0, 0.0, 0.02]
+    assert resumen["Momento del Aporte"].tolist() == ["Fin del período", "Inicio del período", "Fin del período"]
+    assert resumen["Compuesto - Valor Final"].tolist() == pytest.approx([1000 * 1.08 ** 3 + 100 * (1.08 ** 3 - 1) / 0.08,
+                                                                         1000 * 1.08 ** 3 + 100 * (1.08 ** 3 - 1) / 0.08 * 1.08,
+                                                                         1000 * 1.08 ** 3 + 100 * (1.08 ** 2 + 1.08 * 1.02 + 1.02 ** 2)])
+    assert sorted(nombres) == ["resumen.csv", "tablas/Anticipado.csv", "tablas/Creciente.csv", "tablas/Vencido.csv"]
+
+
+def test_nombres_unicos_sin_caracteres_reservados():
+    assert reportes._nombres_unicos(["a/b", "A_B", "Resumen"], 31, reservados=("Resumen",)) == ["a_b", "A_B~2", "Resumen~2"]
+
+
+def test_cola_limita_trabajos_pendientes():
+    cola = reportes.crear_cola(procesos=1, maximo_pendientes=1)
+    escenario = {"nombre": "A", "capital": 1000.0, "tasa": 0.08, "tiempo": 3, "capitalizacion": "Anual"}
+    try:
+        clave = reportes.enviar_reporte(cola, "sesion", "uno", [escenario], "csv", imagenes=False)
+        with pytest.raises(RuntimeError, match="demasiados"):
+            reportes.enviar_reporte(cola, "sesion", "dos", [escenario], "csv", imagenes=False)
+        cola["trabajos"][clave]["futuro"].result(timeout=60)
+        estado, = reportes.trabajos_sesion(cola, "sesion")
+        assert estado["estado"] == "listo" and estado["datos"].startswith(b"PK")
+        assert reportes.trabajos_sesion(cola, "otra") == []
+    finally:
+        cola["grupo"].shutdown(cancel_futures=True)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import servicio
+
+
+def _atender(ruta, datos):
+    async def principal():
+        agrupadores = {nombre: servicio.crear_agrupador(lote) for nombre, (_, lote) in servicio.FUNCIONES.items()}
+        return await servicio.atender(ruta, "POST", json.dumps(datos).encode(), agrupadores)
+    return asyncio.run(principal())
+
+
+def test_resultado_infinito_es_error_de_solicitud():
+    estado, cuerpo = _atender("/interes_simple_vp", {"valor_futuro": 100, "tasa_anual": -1, "tiempo": 1})
+    assert estado == 400
+    assert "finito" in cuerpo["error"]
+
+
+def test_resultado_nan_es_error_de_solicitud():
+    datos = {"capital": 100, "tasa_anual": -3, "tiempo": 0.5, "capitalizacion": "Anual"}
+    estado, _ = _atender("/interes_compuesto_vf", datos)
+    assert estado == 400
+
+
+def test_serie_no_finita_es_error_de_solicitud():
+    estado, _ = _atender("/series_comparacion", {"capital": 100, "tasa": -3, "tiempo_max": 2, "resolucion": "Mensual"})
+    assert estado == 400
+
+
+def test_resultado_finito():
+    estado, cuerpo = _atender("/interes_simple_vf", {"capital": 100, "tasa_anual": 0.1, "tiempo": 1})
+    assert estado == 200
+    assert abs(cuerpo["valor"] - 110) < 1e-9
+
+
+def _solicitud_cruda(cabecera_longitud):
+    async def principal():
+        agrupadores = {nombre: servicio.crear_agrupador(lote) for nombre, (_, lote) in servicio.FUNCIONES.items()}
+        servidor = await asyncio.start_server(
+            lambda lector, escritor: servicio.manejar_conexion(lector, escritor, agrupadores), "127.0.0.1", 0
+        )
+        puerto = servidor.sockets[0].getsockname()[1]
+        async with servidor:
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            escritor.write(f"POST /interes_simple_vf HTTP/1.1\r\nContent-Length: {cabecera_longitud}\r\n\r\n".encode())
+            await escritor.drain()
+            respuesta = await asyncio.wait_for(lector.read(), timeout=5)
+            escritor.close()
+            return respuesta
+    return asyncio.run(principal())
+
+
+def test_content_length_no_numerico():
+    assert _solicitud_cruda("abc").startswith(b"HTTP/1.1 400")
+
+
+def test_content_length_negativo():
+    assert _solicitud_cruda("-5").startswith(b"HTTP/1.1 400")
+
+
+def test_content_length_excesivo():
+    assert _solicitud_cruda(str(servicio.TAMANO_MAXIMO_CUERPO + 1)).startswith(b"HTTP/1.1 413")
+
+
+def test_cache_de_series_limitada_por_bytes(monkeypatch):
+    monkeypatch.setattr(servicio, "CACHE_SERIES_BYTES", 200_000)
+    monkeypatch.setattr(servicio, "_cache_series", {"entradas": servicio.OrderedDict(), "bytes": 0})
+    for capital in range(1, 40):
+        servicio.series_comparacion_json(float(capital), 0.05, 30, "Anual", "Mensual")
+    cache = servicio._cache_series
+    assert 0 < cache["bytes"] <= 200_000
+    assert cache["bytes"] == sum(len(cuerpo) for cuerpo in cache["entradas"].values())
+    # La más reciente sigue en la caché y la primera se desalojó
+    assert (39.0, 0.05, 30, "Anual", "Mensual") in cache["entradas"]
+    assert (1.0, 0.05, 30, "Anual", "Mensual") not in cache["entradas"]
+
+
+def test_entero_enorme_es_error_de_solicitud():
+    estado, cuerpo = _atender("/interes_simple_vf", {"capital": 10 ** 400, "tasa_anual": 0.1, "tiempo": 1})
+    assert estado == 400
+    assert "capital" in cuerpo["error"]
+
+
+def test_etiqueta_no_textual_es_error_de_solicitud():
+    datos = {"capital": 100, "tasa_anual": 0.1, "tiempo": 1, "capitalizacion": ["Anual"]}
+    estado, cuerpo = _atender("/interes_compuesto_vf", datos)
+    assert estado == 400
+    assert "capitalizacion" in cuerpo["error"]